@@ -0,0 +1,11 @@
+"""Simulated liquidctl devices used by the benchmarks (no hardware needed)"""
+import os
+import sys
+
+# the app is run from inside liquidctl_qt/ and imports its modules directly
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "liquidctl_qt")
+)
+
+# pylint: disable=wrong-import-position,unused-import
+from liquidctl_api.simulated import SimulatedDevice, simulated_devices  # noqa: E402,F401
@@ -0,0 +1,139 @@
+"""
+IPC server load test: simulated devices served by an IpcServer to hundreds
+of subscribers plus clients asking for statuses as fast as they can,
+reports push latency and how many get_status() calls the devices got
+(coalescing: about one per device per interval, whatever the client count)
+
+usage: python benchmarks/ipc_load.py [--devices N] [--subscribers N]
+       [--pollers N] [--interval SECONDS] [--duration SECONDS]
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+from fake_devices import SimulatedDevice
+from liquidctl_api import ipc, status_engine
+from liquidctl_api.liquidctl_api import LiquidctlApi
+
+
+class CountingDevice(SimulatedDevice):
+    reads = 0
+    _lock = threading.Lock()
+
+    def get_status(self, **kwargs):
+        with CountingDevice._lock:
+            CountingDevice.reads += 1
+        return super().get_status(**kwargs)
+
+
+async def subscriber(socket_path, stop, latencies, counts):
+    reader, writer = await asyncio.open_unix_connection(
+        socket_path, limit=1024 * 1024
+    )
+    writer.write(b'{"id": 0, "op": "subscribe"}\n')
+    await writer.drain()
+    received = 0
+    while not stop.is_set():
+        try:
+            line = await asyncio.wait_for(reader.readline(), 0.5)
+        except asyncio.TimeoutError:
+            continue
+        if not line:
+            break
+        message = json.loads(line)
+        if "event" in message:
+            received += 1
+            latencies.append(time.time() - message["status"]["sent"])
+    counts.append(received)
+    writer.close()
+
+
+async def poller(socket_path, stop, devices, counts):
+    reader, writer = await asyncio.open_unix_connection(
+        socket_path, limit=1024 * 1024
+    )
+    requests = 0
+    while not stop.is_set():
+        writer.write(json.dumps({
+            "id": requests, "op": "status", "dev_index": requests % devices,
+        }).encode() + b"\n")
+        await writer.drain()
+        response = json.loads(await reader.readline())
+        assert "result" in response, response
+        requests += 1
+    counts.append(requests)
+    writer.close()
+
+
+async def clients(args, socket_path):
+    stop = asyncio.Event()
+    latencies, pushes, requests = [], [], []
+    tasks = [
+        asyncio.create_task(subscriber(socket_path, stop, latencies, pushes))
+        for _ in range(args.subscribers)
+    ] + [
+        asyncio.create_task(poller(socket_path, stop, args.devices, requests))
+        for _ in range(args.pollers)
+    ]
+    await asyncio.sleep(args.duration)
+    stop.set()
+    await asyncio.gather(*tasks)
+    return latencies, pushes, requests
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--devices", type=int, default=8)
+    parser.add_argument("--subscribers", type=int, default=300)
+    parser.add_argument("--pollers", type=int, default=20)
+    parser.add_argument("--interval", type=float, default=0.5)
+    parser.add_argument("--duration", type=float, default=5)
+    args = parser.parse_args()
+
+    api = LiquidctlApi(find_devices=lambda: [
+        CountingDevice(index, latency=0.005)
+        for index in range(args.devices)
+    ])
+    socket_path = os.path.join(tempfile.mkdtemp(), "load.sock")
+    server = None
+
+    def on_status(dev_index, parsed_info):
+        # pushes are stamped to measure how long they take to arrive
+        server.publish(dev_index, dict(parsed_info, sent=time.time()))
+
+    engine = status_engine.StatusEngine(
+        api, interval=args.interval, callback=on_status, workers=args.devices
+    )
+    server = ipc.IpcServer(api, engine, socket_path)
+    server.run_in_thread()
+    while not os.path.exists(socket_path):
+        time.sleep(0.01)
+    engine.start()
+
+    latencies, pushes, requests = asyncio.run(clients(args, socket_path))
+    engine.stop(timeout=1)
+    server.close()
+
+    expected_reads = args.devices * (args.duration / args.interval + 1)
+    print(f"devices: {args.devices}, subscribers: {args.subscribers}, "
+          f"pollers: {args.pollers}, {args.duration:g}s")
+    print(f"status requests served: {sum(requests)} "
+          f"({sum(requests) / args.duration:.0f}/s)")
+    print(f"get_status() calls:     {CountingDevice.reads} "
+          f"(~{expected_reads:.0f} expected at one per device per interval)")
+    print(f"pushes received:        {sum(pushes)} "
+          f"(min {min(pushes, default=0)} per subscriber)")
+    if latencies:
+        latencies.sort()
+        print(f"push latency:           "
+              f"median {statistics.median(latencies) * 1000:.2f} ms, "
+              f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
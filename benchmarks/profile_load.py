@@ -0,0 +1,153 @@
+"""
+Loading N duty profiles (steps + their CompiledCurve) in every format:
+    legacy_pandas   version 1 files through pd.read_csv, like the app did
+                    (skipped without pandas)
+    legacy_reader   version 1 files through profile_format.steps_from_csv
+    json_arrays     version 2 files (steps as JSON arrays)
+    sqlite_packed   DutyProfileDatabase (packed steps)
+the caches are cold, every profile is read and compiled once
+
+usage: python benchmarks/profile_load.py [--profiles N] [--steps N]
+"""
+import argparse
+from io import StringIO
+import json
+import os
+import random
+import tempfile
+import time
+
+import fake_devices  # pylint: disable=unused-import  # sets sys.path
+from liquidctl_api import curve_engine
+import profile_db
+import profile_format
+import utils
+
+
+class _Root:
+    """Stands in for Profiles (DutyProfiles only needs mkdirs())"""
+
+    @staticmethod
+    def mkdirs(str_path):
+        os.makedirs(str_path, exist_ok=True)
+
+
+def _profiles(count, steps_count):
+    rng = random.Random(0)
+    for index in range(count):
+        temps = sorted(rng.sample(range(101), steps_count))
+        yield {
+            "name": f"profile{index:05d}",
+            "device_info": {"vendor_id": 0x1E71, "product_id": 0x2006},
+            "static_duty": None,
+            "steps": [[temp, rng.randrange(101)] for temp in temps],
+        }
+
+
+def _legacy(profile_settings):
+    """The version 1 file of a profile (what frame_to_str wrote)"""
+    legacy = dict(profile_settings)
+    legacy["data_frame"] = "Temperature,Duty;" + "".join(
+        f"{temp},{duty};" for temp, duty in legacy.pop("steps")
+    )
+    return legacy
+
+
+def _write(directory, profiles, convert=None):
+    os.makedirs(directory)
+    for profile_settings in profiles:
+        if convert:
+            profile_settings = convert(profile_settings)
+        with open(
+            os.path.join(directory, profile_settings["name"] + ".json"), "w",
+            encoding="utf-8",
+        ) as profile_file:
+            profile_file.write(json.dumps(profile_settings))
+
+
+def _timed(load_all) -> dict:
+    start = time.perf_counter()
+    count = load_all()
+    elapsed = time.perf_counter() - start
+    return {
+        "total_ms": elapsed * 1000,
+        "us_per_profile": elapsed / count * 1e6,
+    }
+
+
+def bench_legacy_pandas(directory):
+    import pandas as pd  # pylint: disable=import-outside-toplevel
+
+    def load_all():
+        names = sorted(os.listdir(directory))
+        for file_name in names:
+            with open(
+                os.path.join(directory, file_name), encoding="utf-8"
+            ) as profile_file:
+                profile_settings = json.loads(profile_file.read())
+            df = pd.read_csv(
+                StringIO(profile_settings["data_frame"].replace(";", "\n"))
+            )
+            curve_engine.CompiledCurve(zip(df["Temperature"], df["Duty"]))
+        return len(names)
+    return _timed(load_all)
+
+
+def bench_duty_profiles(directory):
+    duty_profiles = utils.DutyProfiles(_Root(), directory)
+
+    def load_all():
+        names = duty_profiles.get_profiles()
+        for name in names:
+            duty_profiles.load_curve(name)
+        return len(names)
+    return _timed(load_all)
+
+
+def bench_sqlite_packed(db_path):
+    database = profile_db.DutyProfileDatabase(db_path)
+
+    def load_all():
+        names = database.get_profiles()
+        for name in names:
+            database.load_curve(name)
+        return len(names)
+    try:
+        return _timed(load_all)
+    finally:
+        database.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--profiles", type=int, default=10000)
+    parser.add_argument("--steps", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        legacy_dir = os.path.join(root, "legacy")
+        json_dir = os.path.join(root, "json")
+        db_path = os.path.join(root, "profiles.sqlite3")
+        profiles = list(_profiles(args.profiles, args.steps))
+        _write(legacy_dir, profiles, _legacy)
+        _write(json_dir, profiles, profile_format.upgrade)
+        profile_db.DutyProfileDatabase(db_path).import_profiles(profiles)
+
+        print(f"{args.profiles} profiles, {args.steps} steps each")
+        results = {}
+        try:
+            results["legacy_pandas"] = bench_legacy_pandas(legacy_dir)
+        except ImportError:
+            print("legacy_pandas: skipped, pandas isn't installed")
+        results["legacy_reader"] = bench_duty_profiles(legacy_dir)
+        results["json_arrays"] = bench_duty_profiles(json_dir)
+        results["sqlite_packed"] = bench_sqlite_packed(db_path)
+        for name, result in results.items():
+            print(
+                f"{name:14} {result['total_ms']:9.1f} ms"
+                f"  {result['us_per_profile']:7.1f} us/profile"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Startup benchmark: serial device initialization (LiquidctlApi()) vs
+background parallel initialization (LiquidctlApi(initialize=False) +
+initialize_async()) with simulated devices, each of their calls
+(connect, initialize) takes --init-latency seconds
+
+usage: python benchmarks/startup.py [--devices N] [--init-latency SECONDS]
+"""
+import argparse
+import threading
+import time
+
+from fake_devices import simulated_devices
+from liquidctl_api.liquidctl_api import LiquidctlApi
+
+
+def serial_startup(count, init_latency):
+    start = time.perf_counter()
+    LiquidctlApi(find_devices=simulated_devices(count, latency=init_latency))
+    end = time.perf_counter()
+    return end - start, end - start
+
+
+def parallel_startup(count, init_latency):
+    start = time.perf_counter()
+    api = LiquidctlApi(
+        initialize=False,
+        find_devices=simulated_devices(count, latency=init_latency),
+    )
+    usable = time.perf_counter() - start  # when the window could be built
+    done = threading.Semaphore(0)
+    api.initialize_async(callback=lambda dev_index, error: done.release())
+    for _ in range(count):
+        done.acquire()
+    return usable, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--devices", type=int, default=5)
+    parser.add_argument("--init-latency", type=float, default=0.5)
+    args = parser.parse_args()
+
+    for name, func in (("serial", serial_startup), ("parallel", parallel_startup)):
+        usable, all_ready = func(args.devices, args.init_latency)
+        print(
+            f"{name:>8}: window can be built after {usable * 1000:8.1f} ms, "
+            f"all devices ready after {all_ready * 1000:8.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
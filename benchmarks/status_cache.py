@@ -0,0 +1,84 @@
+"""
+Status cache benchmark: several consumers (poller, UI, curve engine, ...)
+reading the same simulated devices, direct device.get_status() calls vs
+LiquidctlApi.get_status() (TTL cache + single-flight)
+
+usage: python benchmarks/status_cache.py [--devices N] [--consumers N]
+       [--interval SECONDS] [--duration SECONDS] [--ttl SECONDS]
+"""
+import argparse
+import threading
+import time
+
+from fake_devices import SimulatedDevice
+from liquidctl_api.liquidctl_api import LiquidctlApi
+
+
+class CountingDevice(SimulatedDevice):
+    reads = 0
+    _lock = threading.Lock()
+
+    def get_status(self, **kwargs):
+        with CountingDevice._lock:
+            CountingDevice.reads += 1
+        return super().get_status(**kwargs)
+
+
+def run(api, read, consumers, interval, duration):
+    CountingDevice.reads = 0
+    stop = threading.Event()
+    requests = []
+
+    def consumer():
+        count = 0
+        while not stop.is_set():
+            for dev_index, _ in enumerate(api.devices_list):
+                read(dev_index)
+                count += 1
+            stop.wait(interval)
+        requests.append(count)
+
+    threads = [threading.Thread(target=consumer) for _ in range(consumers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return sum(requests), CountingDevice.reads
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--devices", type=int, default=4)
+    parser.add_argument("--consumers", type=int, default=8)
+    parser.add_argument("--interval", type=float, default=0.1)
+    parser.add_argument("--duration", type=float, default=3)
+    parser.add_argument("--ttl", type=float, default=0.5)
+    args = parser.parse_args()
+
+    api = LiquidctlApi(
+        find_devices=lambda: [
+            CountingDevice(index, latency=0.01)
+            for index in range(args.devices)
+        ],
+        status_ttl=args.ttl,
+    )
+
+    def direct(dev_index):
+        with api.device_locks[dev_index]:
+            dev_status = api.devices_list[dev_index].get_status()
+        return api.to_dict(dev_status)
+
+    for name, read in (("direct", direct), ("cached", api.get_status)):
+        requests, reads = run(
+            api, read, args.consumers, args.interval, args.duration
+        )
+        print(f"{name}: {requests} status requests, {reads} device reads")
+    cache = api.status_cache
+    print(f"cache: {cache.hits} hits, {cache.coalesced} coalesced, "
+          f"{cache.reads} reads")
+
+
+if __name__ == "__main__":
+    main()
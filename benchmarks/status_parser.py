@@ -0,0 +1,78 @@
+"""
+Micro-benchmark of StatusParser.parse against the string scanning
+LiquidctlApi.to_dict it replaced
+
+usage: python benchmarks/status_parser.py [--fans N] [--runs N]
+"""
+import argparse
+import timeit
+
+from fake_devices import SimulatedDevice
+from liquidctl_api.status_parser import StatusParser
+
+
+def _in_str(in_str, checked_str):
+    if isinstance(in_str, str) and in_str in checked_str:
+        return True
+    elif isinstance(in_str, tuple):
+        for string in in_str:
+            if string in checked_str:
+                return True
+    return False
+
+
+def legacy_to_dict(dev_status):
+    """LiquidctlApi.to_dict before the StatusParser"""
+    dev_hw_info = {}
+    curr_hw = ""
+    for line in dev_status:
+        line = list(line)
+        if (
+            ("Fan" in line[0])
+            and ("Noise" or "Firmware" not in line[0])
+            and (("—" not in str(line[1])) and "" == line[2])
+        ):
+            curr_hw, mode = line[0:2]
+            dev_hw_info[curr_hw] = {}
+            dev_hw_info[curr_hw]["Mode"] = {
+                "value": mode, "measurement": ""}
+            continue
+        if (
+            curr_hw in line[0] and "Fan" in curr_hw
+        ):
+            if _in_str(("current", "speed", "voltage"), line[0]):
+                new_info = line[0].replace(curr_hw, "").strip().capitalize()
+                data, measurement = line[1:3]
+                dev_hw_info[curr_hw][new_info] = {
+                    "value": round(data, 2),
+                    "measurement": measurement.upper(),
+                }
+    return dev_hw_info
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fans", type=int, default=3)
+    parser.add_argument("--runs", type=int, default=100000)
+    args = parser.parse_args()
+
+    dev_status = SimulatedDevice(0, fans=args.fans).get_status()
+    status_parser = StatusParser()
+    parsed = status_parser.parse(dev_status)
+    # the parser also knows pumps, temperatures, duties and leds
+    for hw_name, hw_info in legacy_to_dict(dev_status).items():
+        for field, field_info in hw_info.items():
+            assert parsed[hw_name][field] == field_info, (hw_name, field)
+
+    for name, func in (
+        ("legacy to_dict", legacy_to_dict),
+        ("StatusParser", status_parser.parse),
+    ):
+        seconds = min(timeit.repeat(
+            lambda: func(dev_status), number=args.runs, repeat=5
+        ))
+        print(f"{name:>15}: {seconds / args.runs * 1e6:6.2f} µs per status")
+
+
+if __name__ == "__main__":
+    main()
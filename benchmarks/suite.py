@@ -0,0 +1,317 @@
+"""
+End-to-end benchmark suite of the monitoring pipeline against simulated
+devices, results are written as JSON (to compare releases):
+    startup            window shown -> first paint -> device widgets built
+    poll_to_label      status read -> HwInfoUpdater -> update_dev_hw_signal
+                       -> FanWidget.on_update (label set), in the GUI thread
+    cpu_per_cycle      CPU time of reading + processing every device once
+                       (StatusEngine -> HwInfoUpdater -> widgets)
+    memory_growth      allocations kept after the history retention (6 h)
+                       of polling, replayed through HwInfoUpdater as fast
+                       as possible, with fake timestamps
+    temp_duty_model    TempDutyModel (profile editor) operations
+every benchmark runs the app's own classes (a MainWindow with simulated
+devices), benchmarks which need PyQt5 (or liquidctl) are reported as
+skipped without them, the GUI runs on Qt's offscreen platform
+
+usage: python benchmarks/suite.py [--devices N] [--duration SECONDS]
+       [--only NAME ...] [--output FILE]
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import fake_devices  # noqa: F401  (sets sys.path)
+from liquidctl_api import simulated
+
+
+class Skipped(Exception):
+    pass
+
+
+def _percentiles(values) -> dict:
+    if not values:
+        return {}
+    values = sorted(values)
+    return {
+        "count": len(values),
+        "median_ms": statistics.median(values) * 1000,
+        "p95_ms": values[int(len(values) * 0.95)] * 1000,
+        "p99_ms": values[int(len(values) * 0.99)] * 1000,
+        "max_ms": values[-1] * 1000,
+    }
+
+
+def _qt():
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    try:
+        # pylint: disable=import-outside-toplevel
+        from PyQt5 import QtCore, QtWidgets
+    except ImportError as error:
+        raise Skipped(f"PyQt5 isn't installed ({error})") from error
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(
+        sys.argv[:1]
+    )
+    return app, QtCore
+
+
+def _window(args, app, qt_core, latency=0.002):
+    """MainWindow with simulated devices, returns (window, timings)"""
+    started = time.perf_counter()
+    from window import MainWindow  # pylint: disable=import-outside-toplevel
+    imported = time.perf_counter()
+    main_window = MainWindow(
+        find_devices=simulated.simulated_devices(args.devices, latency=latency)
+    )
+    timings = {"imports_ms": (imported - started) * 1000}
+    loop = qt_core.QEventLoop()
+
+    def mark(name):
+        timings[name] = (time.perf_counter() - started) * 1000
+
+    main_window.first_paint_signal.connect(lambda: mark("first_paint_ms"))
+    main_window.built_signal.connect(lambda: mark("built_ms"))
+    main_window.built_signal.connect(loop.quit)
+    main_window.show()
+    mark("shown_ms")
+    qt_core.QTimer.singleShot(30000, loop.quit)  # don't hang on a bug
+    loop.exec_()
+    return main_window, timings
+
+
+def _close(main_window):
+    info = main_window.info
+    if info.hotplug_watcher is not None:
+        info.hotplug_watcher.stop()
+    info.dev_info_updater.stop()
+    main_window.hide()
+
+
+def bench_startup(args) -> dict:
+    app, qt_core = _qt()
+    main_window, timings = _window(args, app, qt_core)
+    _close(main_window)
+    return timings
+
+
+def bench_poll_to_label(args) -> dict:
+    app, qt_core = _qt()
+    main_window, _ = _window(args, app, qt_core)
+    info = main_window.info
+    updater = info.dev_info_updater
+    engine = updater.engine
+    read_at = {}  # dev_index: when its last status was read
+    latencies = []
+
+    def on_status(dev_index, parsed_info):
+        read_at[dev_index] = time.perf_counter()
+        updater._on_status(dev_index, parsed_info)  # pylint: disable=protected-access
+
+    engine.callback = on_status
+    loop = qt_core.QEventLoop()
+    # wait for the widgets, connected after them so labels are set first
+    deadline = time.monotonic() + 30
+    while (
+        not all(info.control_device_widgets[:args.devices])
+        and time.monotonic() < deadline
+    ):
+        qt_core.QTimer.singleShot(50, loop.quit)
+        loop.exec_()
+    for dev_index in range(args.devices):
+        page = info.main_right.stack_frame.page(dev_index)
+        page.update_dev_hw_signal.connect(
+            lambda _, dev_index=dev_index: latencies.append(
+                time.perf_counter() - read_at[dev_index]
+            )
+        )
+        engine.set_interval(dev_index, 0.1)
+    qt_core.QTimer.singleShot(int(args.duration * 1000), loop.quit)
+    loop.exec_()
+    _close(main_window)
+    return _percentiles(latencies)
+
+
+def _uncached(main_window, args):
+    """Every status is read from the devices (they are all ready)"""
+    api = main_window.info.liquidctl_api
+    api.status_cache.ttl = 0
+    for dev_index in range(args.devices):
+        api.wait_ready(dev_index, timeout=30)
+    return api
+
+
+def bench_cpu_per_cycle(args) -> dict:
+    app, qt_core = _qt()
+    main_window, _ = _window(args, app, qt_core)
+    _uncached(main_window, args)
+    engine = main_window.info.dev_info_updater.engine
+    on_status = engine.callback  # HwInfoUpdater._on_status
+    reads = []
+
+    def counted(dev_index, parsed_info):
+        on_status(dev_index, parsed_info)
+        reads.append(dev_index)
+
+    engine.callback = counted
+    interval = 0.1
+    for dev_index in range(args.devices):
+        engine.set_interval(dev_index, interval)
+    loop = qt_core.QEventLoop()
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    # the widgets are updated by this loop, their CPU time counts too
+    qt_core.QTimer.singleShot(int(args.duration * 1000), loop.quit)
+    loop.exec_()
+    engine.callback = on_status
+    cpu = time.process_time() - cpu_start
+    wall = time.perf_counter() - wall_start
+    _close(main_window)
+    cycles = len(reads) / args.devices
+    return {
+        "devices": args.devices,
+        "interval_s": interval,
+        "cycles": cycles,
+        "cpu_ms_per_cycle": cpu / cycles * 1000 if cycles else None,
+        "cpu_us_per_read": cpu / len(reads) * 1e6 if reads else None,
+        "cpu_percent": cpu / wall * 100,
+    }
+
+
+def bench_memory_growth(args) -> dict:
+    app, qt_core = _qt()
+    # no read latency, hours of reads are replayed
+    main_window, _ = _window(args, app, qt_core, latency=0)
+    api = _uncached(main_window, args)
+    updater = main_window.info.dev_info_updater
+    updater.stop()  # the statuses are replayed below instead
+    # a read every interval until the history is full
+    cycles = int(updater.HISTORY_RETENTION / updater.pause)
+    warmup = 60
+    start = time.time()
+    tracemalloc.start()
+    for cycle in range(cycles):
+        if cycle == warmup:
+            after_warmup, _ = tracemalloc.get_traced_memory()
+        for dev_index in range(args.devices):
+            # pylint: disable=protected-access
+            updater._on_status(
+                dev_index, api.get_status(dev_index),
+                start + cycle * updater.pause,
+            )
+        app.processEvents()  # queued updates of the widgets
+    end, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    _close(main_window)
+    return {
+        "devices": args.devices,
+        "cycles": cycles,
+        "after_warmup_kib": after_warmup / 1024,
+        "end_kib": end / 1024,
+        "growth_kib": (end - after_warmup) / 1024,
+        "peak_kib": peak / 1024,
+    }
+
+
+def bench_temp_duty_model(args) -> dict:
+    _qt()
+    try:
+        # pylint: disable=import-outside-toplevel
+        from ui_widgets.profile_editor import TempDutyModel
+    except ImportError as error:
+        raise Skipped(str(error)) from error
+    rng = random.Random(0)
+    runs = 200
+    results = {}
+
+    def timed(name, func):
+        start = time.perf_counter()
+        for _ in range(runs):
+            func()
+        results[f"{name}_us"] = (time.perf_counter() - start) / runs * 1e6
+
+    def fill():
+        model = TempDutyModel()
+        for temp in rng.sample(range(101), 50):
+            model.addRow(temp, rng.randrange(101))
+        return model
+
+    model = fill()
+    timed("fill_50_steps", fill)
+    timed(
+        "update_step",
+        lambda: model.updateRow(
+            model.step(25)[0], rng.randrange(101), 25
+        ),
+    )
+    timed("to_curve", model.to_curve)
+
+    def add_remove():
+        temps = set(model.temps)
+        temp = next(temp for temp in range(101) if temp not in temps)
+        model.removeRow(model.addRow(temp, 50))
+    timed("add_remove_step", add_remove)
+    return results
+
+
+BENCHMARKS = {
+    "startup": bench_startup,
+    "poll_to_label": bench_poll_to_label,
+    "cpu_per_cycle": bench_cpu_per_cycle,
+    "memory_growth": bench_memory_growth,
+    "temp_duty_model": bench_temp_duty_model,
+}
+
+
+def _commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--devices", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=5)
+    parser.add_argument("--only", nargs="+", choices=BENCHMARKS)
+    parser.add_argument("--output", help="JSON file (default: stdout)")
+    args = parser.parse_args()
+
+    report = {
+        "meta": {
+            "commit": _commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.time(),
+            "devices": args.devices,
+            "duration_s": args.duration,
+        },
+        "results": {},
+    }
+    for name in args.only or BENCHMARKS:
+        print(f"running {name}...", file=sys.stderr, flush=True)
+        try:
+            report["results"][name] = BENCHMARKS[name](args)
+        except Skipped as reason:
+            report["results"][name] = {"skipped": str(reason)}
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            output_file.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
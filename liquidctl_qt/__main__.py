@@ -1,7 +1,6 @@
 #!/usr/bin/env python
 
-from PyQt5 import QtWidgets
-from window import MainWindow
+import argparse
 import sys
 
 print("""
@@ -11,8 +10,174 @@ If you need ANY help or if you would report an issue use:
 - Discord server:\t\t https://discord.gg/D4tegR
 """)
 
-if __name__ == "__main__":
-    app = QtWidgets.QApplication(sys.argv)
-    main_window = MainWindow()
+
+def parse_args():
+    parser = argparse.ArgumentParser(prog="liquidctl_qt")
+    parser.add_argument(
+        "--log-sensors",
+        action="store_true",
+        help="log sensor history to ~/.config/Liquidctl-Qt/SensorLog",
+    )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="run without a GUI (and without Qt), apply profiles from --config",
+    )
+    parser.add_argument(
+        "--config",
+        help="daemon config file (default: ~/.config/Liquidctl-Qt/daemon.json)",
+    )
+    parser.add_argument(
+        "--attach",
+        action="store_true",
+        help="use the devices of a running --daemon instead of opening them",
+    )
+    parser.add_argument(
+        "--socket",
+        help="IPC socket of --daemon/--attach "
+        "(default: ~/.config/Liquidctl-Qt/liquidctl-qt.sock)",
+    )
+    parser.add_argument(
+        "--profile-db",
+        metavar="FILE",
+        help="keep duty profiles in an SQLite file instead of a JSON file each",
+    )
+    parser.add_argument(
+        "--migrate-profiles",
+        action="store_true",
+        help="copy the JSON duty profiles into --profile-db and exit",
+    )
+    parser.add_argument(
+        "--import-profiles",
+        metavar="FILE",
+        help="save the profiles of a JSON file (a list of profiles) and exit",
+    )
+    parser.add_argument(
+        "--export-profiles",
+        metavar="FILE",
+        help="write every duty profile to a JSON file and exit",
+    )
+    parser.add_argument(
+        "--simulate",
+        type=int,
+        metavar="N",
+        help="use N simulated devices instead of real ones (no hardware needed)",
+    )
+    parser.add_argument(
+        "--instrument",
+        action="store_true",
+        help="time status reads, parsing and widget updates "
+        "(Ctrl+Shift+D shows them)",
+    )
+    parser.add_argument(
+        "--startup-profile",
+        action="store_true",
+        help="print import times and startup phases to stderr",
+    )
+    # Qt's own arguments (-style, ...) are left to QApplication
+    return parser.parse_known_args()
+
+
+def find_devices(args):
+    """find_devices for LiquidctlApi, None means liquidctl's own"""
+    if args.simulate is None:
+        return None
+    # pylint: disable=import-outside-toplevel
+    from liquidctl_api import simulated
+    return simulated.simulated_devices(args.simulate)
+
+
+def run_profile_tools(args) -> bool:
+    """--migrate/import/export-profiles, True if one was run"""
+    if not (args.migrate_profiles or args.import_profiles or args.export_profiles):
+        return False
+    # pylint: disable=import-outside-toplevel
+    import json
+    import utils
+    profiles = utils.Profiles(args.profile_db)
+    if args.migrate_profiles:
+        if not args.profile_db:
+            sys.exit("--migrate-profiles needs --profile-db")
+        import profile_db
+        count = profile_db.migrate(
+            utils.Profiles().duty_profiles, profiles.duty_profiles
+        )
+        print(f"Migrated {count} profiles to {args.profile_db}")
+    if args.import_profiles:
+        with open(args.import_profiles, "r", encoding="utf-8") as import_file:
+            count = profiles.duty_profiles.import_profiles(
+                json.loads(import_file.read())
+            )
+        print(f"Imported {count} profiles")
+    if args.export_profiles:
+        exported = profiles.duty_profiles.export_profiles()
+        utils.atomic_write(args.export_profiles, json.dumps(exported, indent=2))
+        print(f"Exported {len(exported)} profiles")
+    return True
+
+
+def run_daemon(args):
+    # pylint: disable=import-outside-toplevel
+    import daemon
+    daemon.Daemon(
+        config_path=args.config or daemon.DAEMON_CONFIG,
+        log_sensors=args.log_sensors,
+        socket=args.socket,
+        find_devices=find_devices(args),
+        profile_db=args.profile_db,
+    ).run()
+
+
+def main():
+    args, qt_args = parse_args()
+    if run_profile_tools(args):
+        return
+    if args.daemon:
+        run_daemon(args)
+        return
+    profiler = None
+    if args.startup_profile:
+        # pylint: disable=import-outside-toplevel
+        from startup_profile import StartupProfiler
+        profiler = StartupProfiler()
+        profiler.install()
+
+    # imported here so the profiler sees them
+    # pylint: disable=import-outside-toplevel
+    from PyQt5 import QtWidgets
+    from window import MainWindow
+
+    if profiler:
+        profiler.mark("imports done")
+    app = QtWidgets.QApplication(sys.argv[:1] + qt_args)
+    attach = None
+    if args.attach:
+        # pylint: disable=import-outside-toplevel
+        from liquidctl_api import ipc
+        attach = args.socket or ipc.SOCKET_PATH
+    main_window = MainWindow(
+        log_sensors=args.log_sensors,
+        attach=attach,
+        find_devices=find_devices(args),
+        instrument=args.instrument,
+        profile_db=args.profile_db,
+    )
     main_window.show()
+
+    if profiler:
+        profiler.mark("main window shown")
+
+        def built():
+            profiler.mark("device widgets built")
+            profiler.uninstall()
+            profiler.report()
+
+        main_window.first_paint_signal.connect(
+            lambda: profiler.mark("first paint")
+        )
+        main_window.built_signal.connect(built)
     app.exec_()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+from functools import partial
+from os import path
+import json
+import signal
+import sys
+import threading
+
+from liquidctl_api import (
+    curve_engine, hotplug, ipc, liquidctl_api, sensor_log, status_engine
+)
+import utils
+
+DAEMON_CONFIG = path.expanduser("~/.config/Liquidctl-Qt/daemon.json")
+SENSOR_LOG_PATH = path.expanduser("~/.config/Liquidctl-Qt/SensorLog")
+
+
+class Daemon:
+    """
+    Headless mode (no Qt), polls the devices, applies duty profiles
+    (in software if a device doesn't support them), logs sensors and
+    serves the devices to other processes (ipc.IpcServer)
+    config = {
+        "interval": float,  # seconds between status reads of a device
+        "log_sensors": bool,
+        "socket": str or null,  # IPC socket path, null disables the server
+        "profile_db": str or null,  # SQLite profiles instead of JSON files
+        "profiles": [
+            {
+                # device index, without it the profile is applied to the
+                # devices its "device_info" matches (DeviceRegistry.match)
+                "device": int,
+                "hw_name": str,  # e.g. "Fan 1"
+                "profile": str,  # name of a duty profile
+            },
+        ],
+    }
+    """
+
+    __slots__ = (
+        "config",
+        "liquidctl_api",
+        "engine",
+        "curve_engine",
+        "profiles",
+        "logger",
+        "server",
+        "hotplug_watcher",
+        "find_devices",
+        "_stop",
+    )
+
+    def __init__(
+        self,
+        config_path: str = DAEMON_CONFIG,
+        log_sensors=False,
+        socket=None,
+        find_devices=None,
+        profile_db=None,
+    ):
+        self.config = self._load_config(config_path)
+        self.find_devices = find_devices  # e.g. simulated devices
+        if log_sensors:
+            self.config["log_sensors"] = True
+        if socket:
+            self.config["socket"] = socket
+        if profile_db:
+            self.config["profile_db"] = profile_db
+        self._stop = threading.Event()
+
+    @staticmethod
+    def _load_config(config_path) -> dict:
+        if not path.exists(config_path):
+            return {}
+        with open(config_path, "r", encoding="utf-8") as config_file:
+            return json.loads(config_file.read())
+
+    def _init(self):
+        self.liquidctl_api = liquidctl_api.LiquidctlApi(
+            find_devices=self.find_devices
+        )
+        self.engine = status_engine.StatusEngine(
+            self.liquidctl_api,
+            interval=self.config.get("interval", 1),
+            callback=self._on_status,
+            workers=status_engine.StatusEngine.MAX_WORKERS,
+        )
+        self.curve_engine = curve_engine.CurveEngine(
+            self.liquidctl_api, latest=self.engine.latest
+        )
+        self.profiles = utils.Profiles(self.config.get("profile_db"))
+        self.logger = None
+        if self.config.get("log_sensors"):
+            self.logger = sensor_log.SensorLogger(SENSOR_LOG_PATH)
+        self.server = None
+        socket_path = self.config.get("socket", ipc.SOCKET_PATH)
+        if socket_path:
+            self.server = ipc.IpcServer(
+                self.liquidctl_api, self.engine, path.expanduser(socket_path)
+            )
+        self.hotplug_watcher = hotplug.HotplugWatcher(
+            self.liquidctl_api,
+            on_added=self._on_added,
+            on_removed=self._on_removed,
+            on_initialized=self._on_initialized,
+        )
+
+    def _on_added(self, dev_index):
+        self.engine.add_device(dev_index)
+        print(
+            f"Added {dev_index}: "
+            f"{self.liquidctl_api.devices_list[dev_index].description}",
+            flush=True,
+        )
+
+    def _on_removed(self, dev_index):
+        self.engine.remove_device(dev_index)
+        self.curve_engine.remove_device(dev_index)
+        print(f"Removed {dev_index}", flush=True)
+
+    def _on_initialized(self, dev_index, error):
+        if error is not None:
+            print(f"Couldn't initialize {dev_index}: {error}", file=sys.stderr)
+            return
+        # a power cycled device lost its settings
+        self._apply_profiles(dev_index)
+
+    def _log_name(self, dev_index):
+        device_obj = self.liquidctl_api.devices_list[dev_index]
+        return f"{device_obj.description} {device_obj.serial_number}"
+
+    def _on_status(self, dev_index, parsed_info):
+        self.curve_engine.tick(dev_index, parsed_info)
+        if self.logger is not None:
+            self.logger.log(self._log_name(dev_index), parsed_info)
+        if self.server is not None:
+            self.server.publish(dev_index, parsed_info)
+
+    def apply_profile(self, dev_index, hw_name, profile_name):
+        # pylint: disable=import-outside-toplevel
+        from liquidctl.error import NotSupportedByDevice
+
+        duty_profiles = self.profiles.duty_profiles
+        device_obj = self.liquidctl_api.devices_list[dev_index]
+        curve = duty_profiles.load_curve(profile_name)
+        with self.liquidctl_api.device_locks[dev_index]:
+            if curve is None:
+                static_duty = duty_profiles.load_profile(
+                    profile_name).get("static_duty")
+                try:
+                    duty_profiles.set_duty(
+                        device_obj, hw_name, static_duty=static_duty
+                    )
+                    return
+                except NotSupportedByDevice:
+                    pass
+                # no fixed speeds, so no software curve either, a flat
+                # profile is the same duty at every temperature
+                try:
+                    duty_profiles.set_duty(
+                        device_obj, hw_name, curve=curve_engine.CompiledCurve(
+                            [(0, static_duty), (100, static_duty)]
+                        ),
+                    )
+                except NotSupportedByDevice:
+                    print(
+                        f"Couldn't apply {profile_name}: {hw_name} supports"
+                        " neither fixed speeds nor speed profiles",
+                        file=sys.stderr,
+                    )
+                return
+            try:
+                duty_profiles.set_duty(device_obj, hw_name, curve=curve)
+                return
+            except NotSupportedByDevice:
+                pass
+        self.curve_engine.set_curve(
+            dev_index, hw_name, curve,
+            on_unsupported=partial(
+                print,
+                f"Couldn't apply {profile_name}: {hw_name} supports"
+                " neither fixed speeds nor speed profiles",
+                file=sys.stderr,
+            ),
+        )
+        print(f"{profile_name}: applied in software to {hw_name}")
+
+    def _profile_devices(self, entry) -> list:
+        if "device" in entry:
+            return [entry["device"]]
+        device_info = self.profiles.duty_profiles.load_profile(
+            entry["profile"]
+        ).get("device_info") or {}
+        return self.liquidctl_api.registry.match(device_info)
+
+    def _apply_profiles(self, only_dev_index=None):
+        # pylint: disable=import-outside-toplevel
+        from liquidctl.error import LiquidctlError
+
+        for entry in self.config.get("profiles", ()):
+            try:
+                for dev_index in self._profile_devices(entry):
+                    if only_dev_index not in (None, dev_index):
+                        continue
+                    self.apply_profile(
+                        dev_index, entry["hw_name"], entry["profile"]
+                    )
+            except (
+                OSError, KeyError, IndexError, ValueError, LiquidctlError
+            ) as error:
+                print(f"Couldn't apply {entry}: {error}", file=sys.stderr)
+
+    def stop(self, *args):  # pylint: disable=unused-argument
+        self._stop.set()
+
+    def run(self):
+        self._init()
+        print(
+            "Devices:\n" + "\n".join(
+                f"{dev_index}: {device.description}"
+                for dev_index, device in self.liquidctl_api.present()
+            ),
+            flush=True,
+        )
+        self._apply_profiles()
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        if self.logger is not None:
+            self.logger.start()
+        if self.server is not None:
+            self.server.run_in_thread()
+        self.engine.start()
+        self.hotplug_watcher.start()
+        self._stop.wait()
+        self.hotplug_watcher.stop()
+        if self.server is not None:
+            self.server.close()
+        self.engine.stop(timeout=1)
+        if self.logger is not None:
+            self.logger.stop()
+        self.liquidctl_api.on_quit()
@@ -0,0 +1,226 @@
+from array import array
+import json
+import threading
+import time
+
+# metric: what it measures
+METRICS = {
+    "get_status": "device.get_status() (USB)",
+    "parse": "StatusParser.parse()",
+    "pipeline": "HwInfoUpdater._on_status() (history, curves, diff, emit)",
+    "signal": "update_dev_hw_signal emitted -> delivered in the GUI thread",
+    "widget_update": "SensorWidget.on_update()",
+}
+
+
+class Histogram:
+    """
+    Durations (seconds) of a metric, the last capacity samples are kept
+    for the percentiles, count/total/max cover every sample
+    """
+
+    __slots__ = ("samples", "capacity", "count", "total", "maximum")
+
+    def __init__(self, capacity: int = 4096):
+        self.samples = array("d")
+        self.capacity = capacity
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+    def add(self, seconds: float):
+        if len(self.samples) < self.capacity:
+            self.samples.append(seconds)
+        else:
+            self.samples[self.count % self.capacity] = seconds
+        self.count += 1
+        self.total += seconds
+        self.maximum = max(self.maximum, seconds)
+
+    def summary(self) -> dict:
+        """Milliseconds"""
+        samples = sorted(self.samples)
+        if not samples:
+            return {"count": 0}
+
+        def percentile(fraction):
+            return samples[min(int(len(samples) * fraction), len(samples) - 1)]
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count * 1000,
+            "p50_ms": percentile(0.5) * 1000,
+            "p95_ms": percentile(0.95) * 1000,
+            "p99_ms": percentile(0.99) * 1000,
+            "max_ms": self.maximum * 1000,
+        }
+
+
+class Instrumentation:
+    """
+    Opt-in (liquidctl_qt --instrument) timings of every status read,
+    parse, signal emission and widget update, per device
+    nothing is measured until enable() (and enable_widgets()) is called:
+    the measured functions are wrapped then and disable() puts the
+    originals back, code paths without instrumentation are left as they
+    are, so it costs nothing when it's disabled
+    """
+
+    __slots__ = (
+        "histograms", "_lock", "_local", "_emitted", "_patches", "_wrappers",
+    )
+
+    def __init__(self):
+        self.histograms = {}  # (metric, dev_index): Histogram
+        self._lock = threading.Lock()
+        self._local = threading.local()  # dev_index being read
+        self._emitted = {}  # dev_index: when its update was emitted
+        self._patches = []  # (owner, attribute name, original)
+        # PyQt doesn't keep connected slots alive, widgets connected to a
+        # wrapper keep calling it after disable()
+        self._wrappers = []
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._patches)
+
+    def record(self, metric: str, dev_index: int, seconds: float):
+        key = (metric, dev_index)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.add(seconds)
+
+    def _patch(self, owner, name, wrapper):
+        self._patches.append((owner, name, getattr(owner, name)))
+        self._wrappers.append(wrapper)
+        setattr(owner, name, wrapper)
+
+    def enable(self, liquidctl_api, hw_info_updater):
+        """Times the status reads of liquidctl_api and their processing"""
+        self._enable_api(liquidctl_api)
+        self._enable_updater(hw_info_updater)
+
+    def disable(self):
+        """Puts every wrapped function back (the histograms are kept)"""
+        while self._patches:
+            owner, name, original = self._patches.pop()
+            setattr(owner, name, original)
+        self._emitted.clear()
+
+    def _enable_api(self, liquidctl_api):
+        """
+        Times status reads (StatusCache) and their parsing, the classes
+        of the instances are patched (they have __slots__)
+        """
+        cache_class = type(liquidctl_api.status_cache)
+        api_class = type(liquidctl_api)
+        read = cache_class._read  # pylint: disable=protected-access
+        to_dict = api_class.to_dict
+        local = self._local
+        instrumentation = self
+
+        def timed_read(status_cache, dev_index, entry, flight):
+            local.dev_index = dev_index
+            local.parse_time = 0.0
+            start = time.perf_counter()
+            try:
+                return read(status_cache, dev_index, entry, flight)
+            finally:
+                elapsed = time.perf_counter() - start
+                local.dev_index = None
+                instrumentation.record(
+                    "get_status", dev_index, elapsed - local.parse_time
+                )
+
+        def timed_to_dict(api, dev_status):
+            start = time.perf_counter()
+            try:
+                return to_dict(api, dev_status)
+            finally:
+                elapsed = time.perf_counter() - start
+                dev_index = getattr(local, "dev_index", None)
+                if dev_index is not None:
+                    local.parse_time = elapsed
+                    instrumentation.record("parse", dev_index, elapsed)
+
+        self._patch(cache_class, "_read", timed_read)
+        self._patch(api_class, "to_dict", timed_to_dict)
+
+    def _enable_updater(self, hw_info_updater):
+        """Times the processing of every status and when it was emitted"""
+        engine = hw_info_updater.engine
+        on_status = engine.callback
+
+        def timed_on_status(dev_index, parsed_info):
+            start = time.perf_counter()
+            emitted = on_status(dev_index, parsed_info)
+            end = time.perf_counter()
+            if emitted:
+                # update_dev_hw_signal is the last thing emitted
+                self._emitted[dev_index] = end
+            self.record("pipeline", dev_index, end - start)
+
+        self._patch(engine, "callback", timed_on_status)
+
+    def enable_widgets(self):
+        """
+        Times SensorWidget.on_update (and the signal delivery before it),
+        must be called before the widgets are created (they connect the
+        method when they are), they keep calling the wrapper after
+        disable(), it doesn't measure anything then
+        """
+        # pylint: disable=import-outside-toplevel
+        from ui_widgets import control, right
+
+        on_update = control.SensorWidget.on_update
+        instrumentation = self
+
+        def dev_index_of(widget):
+            parent = widget.parentWidget()
+            while parent is not None and not isinstance(parent, right.StackPage):
+                parent = parent.parentWidget()
+            return None if parent is None else parent.dev_index
+
+        def timed_on_update(widget, dev_hw_info):
+            if not instrumentation.enabled:
+                on_update(widget, dev_hw_info)
+                return
+            start = time.perf_counter()
+            on_update(widget, dev_hw_info)
+            end = time.perf_counter()
+            dev_index = dev_index_of(widget)
+            emitted = instrumentation._emitted.pop(dev_index, None)
+            # the first widget of the update, which was emitted before it
+            if emitted is not None and emitted <= start:
+                instrumentation.record("signal", dev_index, start - emitted)
+            instrumentation.record("widget_update", dev_index, end - start)
+
+        self._patch(control.SensorWidget, "on_update", timed_on_update)
+
+    def summary(self) -> dict:
+        """{metric: {dev_index: Histogram.summary()}}"""
+        with self._lock:
+            items = sorted(
+                self.histograms.items(),
+                key=lambda item: (item[0][0], str(item[0][1])),
+            )
+            summary = {}
+            for (metric, dev_index), histogram in items:
+                summary.setdefault(metric, {})[dev_index] = histogram.summary()
+        return summary
+
+    def export(self, file_path: str):
+        with open(file_path, "w", encoding="utf-8") as export_file:
+            export_file.write(json.dumps(
+                {
+                    "timestamp": time.time(),
+                    "metrics": METRICS,
+                    "summary": self.summary(),
+                },
+                indent=2,
+            ))
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
@@ -0,0 +1,300 @@
+from bisect import bisect_right
+from functools import partial
+import threading
+import time
+
+
+def channel_name(hw_name: str) -> str:
+    """"Fan 1" -> "fan1", the channel name liquidctl drivers expect"""
+    return hw_name.replace(" ", "").lower()
+
+
+def status_key(dev_hw_info: dict, hw_name: str):
+    """Key of the channel hw_name in a parsed status, None if it has none"""
+    channel = channel_name(hw_name)
+    for key in dev_hw_info:
+        if channel_name(key) == channel:
+            return key
+    return None
+
+
+def temperature_channels(dev_hw_info: dict) -> list:
+    """Returns hw names of a parsed status which have a temperature"""
+    return [
+        hw_name for hw_name, hw_info in dev_hw_info.items()
+        if "Temperature" in hw_info
+    ]
+
+
+class CompiledCurve:
+    """
+    Immutable temperature/duty curve compiled once from profile steps
+    duties from 0 to 100 °C are precomputed (TABLE_TEMPS), so a duty is
+    found in O(1), temperatures outside of the steps get the first/last duty
+    """
+
+    __slots__ = ("_steps", "_table")
+
+    TABLE_TEMPS = 101  # 0 - 100 °C
+
+    def __init__(self, steps):
+        steps = tuple(sorted(
+            (int(temp), int(duty)) for temp, duty in steps
+        ))
+        if not steps:
+            raise ValueError("a curve needs at least one step")
+        object.__setattr__(self, "_steps", steps)
+        object.__setattr__(self, "_table", self._compile(steps))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("CompiledCurve is immutable")
+
+    def __eq__(self, other):
+        return isinstance(other, CompiledCurve) and self._steps == other._steps
+
+    def __hash__(self):
+        return hash(self._steps)
+
+    def __repr__(self):
+        return f"CompiledCurve({list(self._steps)})"
+
+    @staticmethod
+    def _interpolate(steps, temps, temp) -> float:
+        index = bisect_right(temps, temp)
+        if index == 0:
+            return float(steps[0][1])
+        if index == len(steps):
+            return float(steps[-1][1])
+        (temp_low, duty_low), (temp_high, duty_high) = steps[index - 1:index + 1]
+        return duty_low + (duty_high - duty_low) * (
+            (temp - temp_low) / (temp_high - temp_low)
+        )
+
+    @classmethod
+    def _compile(cls, steps) -> tuple:
+        temps = [temp for temp, _ in steps]
+        return tuple(
+            cls._interpolate(steps, temps, temp)
+            for temp in range(cls.TABLE_TEMPS)
+        )
+
+    @property
+    def steps(self) -> tuple:
+        return self._steps
+
+    def duty_at(self, temp: float) -> float:
+        """Linear interpolation between steps, flat outside of them"""
+        if not 0 <= temp < self.TABLE_TEMPS - 1:
+            return self._interpolate(
+                self._steps, [step_temp for step_temp, _ in self._steps], temp
+            )
+        index = int(temp)
+        duty = self._table[index]
+        # steps are whole degrees, so the table is linear between entries
+        return duty + (self._table[index + 1] - duty) * (temp - index)
+
+    def liquidctl_profile(self) -> list:
+        """[(temperature, duty), ...] as set_speed_profile() expects it"""
+        return list(self._steps)
+
+
+class SoftwareCurve:
+    """
+    CompiledCurve applied by the host instead of the device
+    hysteresis: temperature drop (°C) needed before the duty is lowered
+    max_rate: fastest duty change (%/s), the same whatever the status
+    poll interval is (it's the time between ticks that counts)
+    """
+
+    __slots__ = (
+        "curve",
+        "hysteresis",
+        "max_rate",
+        "temp_source",
+        "last_temp",
+        "last_duty",
+        "last_changed",
+    )
+
+    def __init__(self, curve, hysteresis=2.0, max_rate=2.0, temp_source=None):
+        self.curve = curve
+        self.hysteresis = hysteresis
+        self.max_rate = max_rate
+        # (dev_index, hw_name) of the temperature, None until resolved
+        self.temp_source = temp_source
+        self.last_temp = None
+        self.last_duty = None  # last duty sent to the device
+        # time.monotonic() of the last duty change, the allowed change
+        # grows with the time since it (however many ticks there were)
+        self.last_changed = None
+
+    def target(self, temp: float, now: float = None) -> int:
+        """Duty which should be set for the temperature"""
+        if now is None:
+            now = time.monotonic()
+        if (
+            self.last_temp is not None
+            and self.last_temp - self.hysteresis < temp < self.last_temp
+        ):
+            # small drops don't lower the duty (no fan speed hunting)
+            temp = self.last_temp
+        else:
+            self.last_temp = temp
+        duty = self.curve.duty_at(temp)
+        if self.last_duty is not None and self.last_changed is not None:
+            # whole percents, fractions would be rounded up to a faster rate
+            max_step = int(self.max_rate * (now - self.last_changed) + 1e-9)
+            duty = min(
+                max(duty, self.last_duty - max_step),
+                self.last_duty + max_step
+            )
+        duty = int(round(duty))
+        if duty != self.last_duty:
+            self.last_changed = now
+        return duty
+
+
+class CurveEngine:
+    """
+    Applies SoftwareCurves of devices which don't support speed profiles
+    tick() is called with every parsed status (from the status engine)
+    and only curves using a temperature of that device are evaluated
+    set_fixed_speed() is only called when the duty actually changes,
+    through write_queue (WriteQueue) if there is one
+    a curve of a channel without fixed speeds either is dropped after its
+    first write, its on_unsupported() is called (from the write thread)
+    """
+
+    __slots__ = (
+        "liquidctl_api",
+        "latest",
+        "write_queue",
+        "curves",
+        "_by_source",
+        "_on_unsupported",
+        "_lock",
+    )
+
+    def __init__(self, liquidctl_api, latest=None, write_queue=None):
+        self.liquidctl_api = liquidctl_api
+        # latest(dev_index) -> last parsed status, used to find temperatures
+        self.latest = latest
+        self.write_queue = write_queue
+        self.curves = {}  # (dev_index, hw_name): SoftwareCurve
+        self._by_source = {}  # source dev_index: [(dev_index, hw_name)]
+        self._on_unsupported = {}  # (dev_index, hw_name): callback
+        self._lock = threading.Lock()
+
+    def set_curve(
+        self, dev_index, hw_name, curve, temp_source=None,
+        on_unsupported=None, **kwargs
+    ):
+        """curve is a CompiledCurve"""
+        curve = SoftwareCurve(curve, temp_source=temp_source, **kwargs)
+        with self._lock:
+            self._remove(dev_index, hw_name)
+            self.curves[(dev_index, hw_name)] = curve
+            if on_unsupported is not None:
+                self._on_unsupported[(dev_index, hw_name)] = on_unsupported
+            if temp_source is not None:
+                self._by_source.setdefault(temp_source[0], []).append(
+                    (dev_index, hw_name)
+                )
+
+    def temperature(self, dev_index, hw_name):
+        """(dev_index, hw_name) of the temperature a curve follows or None"""
+        curve = self.curves.get((dev_index, hw_name))
+        return None if curve is None else curve.temp_source
+
+    def remove_curve(self, dev_index, hw_name):
+        with self._lock:
+            self._remove(dev_index, hw_name)
+
+    def remove_device(self, dev_index):
+        """
+        Drops the curves of an unplugged device, curves which used its
+        temperature look for another one
+        """
+        with self._lock:
+            for key in [key for key in self.curves if key[0] == dev_index]:
+                self._remove(*key)
+            for key in self._by_source.pop(dev_index, ()):
+                self.curves[key].temp_source = None
+
+    def _remove(self, dev_index, hw_name):
+        self._on_unsupported.pop((dev_index, hw_name), None)
+        curve = self.curves.pop((dev_index, hw_name), None)
+        if curve is not None and curve.temp_source is not None:
+            self._by_source[curve.temp_source[0]].remove((dev_index, hw_name))
+
+    def _resolve(self, dev_index, dev_hw_info):
+        """
+        Gives unresolved curves a temperature of this device, curves of the
+        device itself first, other devices only if they have no temperature
+        """
+        temps = temperature_channels(dev_hw_info)
+        if not temps:
+            return
+        for (curve_dev_index, hw_name), curve in self.curves.items():
+            if curve.temp_source is not None:
+                continue
+            if curve_dev_index != dev_index:
+                own_status = self.latest and self.latest(curve_dev_index)
+                if own_status is None or temperature_channels(own_status):
+                    continue
+            curve.temp_source = (dev_index, temps[0])
+            self._by_source.setdefault(dev_index, []).append(
+                (curve_dev_index, hw_name)
+            )
+
+    def tick(self, dev_index, dev_hw_info):
+        with self._lock:
+            if not self.curves:
+                return
+            self._resolve(dev_index, dev_hw_info)
+            to_set = []
+            for key in self._by_source.get(dev_index, ()):
+                curve = self.curves[key]
+                temp_info = dev_hw_info.get(curve.temp_source[1])
+                if temp_info is None:
+                    continue
+                duty = curve.target(temp_info["Temperature"]["value"])
+                if duty != curve.last_duty:
+                    to_set.append((key, curve, duty))
+        for (curve_dev_index, hw_name), curve, duty in to_set:
+            self._set_duty(curve_dev_index, hw_name, curve, duty)
+
+    def _written(self, dev_index, hw_name, curve, duty, error):
+        if error is None:
+            curve.last_duty = duty
+            return
+        # pylint: disable=import-outside-toplevel
+        from liquidctl.error import NotSupportedByDevice
+
+        if not isinstance(error, NotSupportedByDevice):
+            return  # tried again on the next tick
+        # it would be tried again forever otherwise
+        with self._lock:
+            if self.curves.get((dev_index, hw_name)) is not curve:
+                return  # replaced or removed meanwhile
+            on_unsupported = self._on_unsupported.get((dev_index, hw_name))
+            self._remove(dev_index, hw_name)
+        if on_unsupported is not None:
+            on_unsupported()
+
+    def _set_duty(self, dev_index, hw_name, curve, duty):
+        if self.write_queue is not None:
+            self.write_queue.set_fixed_speed(
+                dev_index, hw_name, duty,
+                done=partial(self._written, dev_index, hw_name, curve, duty),
+            )
+            return
+        device = self.liquidctl_api.devices_list[dev_index]
+        try:
+            with self.liquidctl_api.device_locks[dev_index]:
+                device.set_fixed_speed(channel_name(hw_name), duty)
+        except Exception as error:  # pylint: disable=broad-except
+            self._written(dev_index, hw_name, curve, duty, error)
+            return
+        curve.last_duty = duty
+        self.liquidctl_api.status_cache.invalidate(dev_index)
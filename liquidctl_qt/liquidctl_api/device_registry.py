@@ -0,0 +1,148 @@
+from collections import namedtuple
+
+# what tells a device apart from every other one, even an identical model
+DeviceIdentity = namedtuple(
+    "DeviceIdentity",
+    ("vendor_id", "product_id", "serial_number", "bus", "address"),
+)
+
+# keys find() can look devices up by
+INDEXED_KEYS = DeviceIdentity._fields + ("description",)
+
+
+def device_identity(device) -> DeviceIdentity:
+    return DeviceIdentity(
+        device.vendor_id,
+        device.product_id,
+        device.serial_number,
+        device.bus,
+        str(device.address),
+    )
+
+
+def device_location(device) -> tuple:
+    """
+    Part of the identity which needs no I/O, serial_number can be a
+    read of the device (a USB string descriptor)
+    """
+    return device.vendor_id, device.product_id, device.bus, str(device.address)
+
+
+class DeviceRegistry:
+    """
+    Indexes devices (by dev_index) by their identity and by every part
+    of it, so a lookup by any key is a dict access instead of a scan
+    identical devices (same description, even same serial number) are
+    kept apart by bus/address
+    """
+
+    __slots__ = ("devices", "_identities", "_by_identity", "_by_key")
+
+    def __init__(self, devices_list=()):
+        self.devices = {}  # dev_index: device
+        self._identities = {}  # dev_index: DeviceIdentity
+        self._by_identity = {}  # DeviceIdentity: dev_index
+        # key: {value: [dev_index, ...]}
+        self._by_key = {key: {} for key in INDEXED_KEYS}
+        for dev_index, device in enumerate(devices_list):
+            self.add(dev_index, device)
+
+    def __len__(self):
+        return len(self.devices)
+
+    def _values(self, dev_index):
+        identity = self._identities[dev_index]
+        return zip(
+            INDEXED_KEYS,
+            identity + (self.devices[dev_index].description,)
+        )
+
+    def add(self, dev_index: int, device):
+        identity = device_identity(device)
+        if identity in self._by_identity:
+            raise ValueError(f"{identity} is registered already")
+        self.devices[dev_index] = device
+        self._identities[dev_index] = identity
+        self._by_identity[identity] = dev_index
+        for key, value in self._values(dev_index):
+            if value is not None:
+                self._by_key[key].setdefault(value, []).append(dev_index)
+
+    def remove(self, dev_index: int):
+        for key, value in self._values(dev_index):
+            indexes = self._by_key[key].get(value)
+            if indexes is None:
+                continue
+            indexes.remove(dev_index)
+            if not indexes:
+                del self._by_key[key][value]
+        del self._by_identity[self._identities.pop(dev_index)]
+        del self.devices[dev_index]
+
+    def identity(self, dev_index: int) -> DeviceIdentity:
+        return self._identities[dev_index]
+
+    def location(self, dev_index: int) -> tuple:
+        """device_location() of a registered device"""
+        identity = self._identities[dev_index]
+        return (
+            identity.vendor_id, identity.product_id,
+            identity.bus, identity.address,
+        )
+
+    def index_of(self, identity: DeviceIdentity):
+        """dev_index of exactly this device or None"""
+        return self._by_identity.get(identity)
+
+    def find(self, **keys) -> list:
+        """
+        dev_indexes of devices matching every key (INDEXED_KEYS), e.g.
+        find(vendor_id=0x1E71, product_id=0x2006)
+        """
+        candidates = None
+        # the shortest list first, the others are only checked against it
+        for indexes in sorted(
+            (self._by_key[key].get(value, ()) for key, value in keys.items()),
+            key=len,
+        ):
+            if candidates is None:
+                candidates = list(indexes)
+            else:
+                indexes = set(indexes)
+                candidates = [
+                    dev_index for dev_index in candidates
+                    if dev_index in indexes
+                ]
+            if not candidates:
+                return []
+        return sorted(candidates or ())
+
+    def profile_info(self, dev_index: int) -> dict:
+        """Info a profile is bound to (see match())"""
+        identity = self._identities[dev_index]
+        return {
+            "name": self.devices[dev_index].description,
+            "vendor_id": identity.vendor_id,
+            "product_id": identity.product_id,
+            "serial_number": identity.serial_number,
+        }
+
+    def match(self, profile_info: dict) -> list:
+        """
+        dev_indexes of devices a profile (its "device_info") is for, the
+        device with its serial number if there is one, otherwise every
+        device of the model (profiles saved before serials were stored)
+        """
+        serial_number = profile_info.get("serial_number")
+        if serial_number:
+            found = self.find(
+                vendor_id=profile_info.get("vendor_id"),
+                product_id=profile_info.get("product_id"),
+                serial_number=serial_number,
+            )
+            if found:
+                return found
+        return self.find(
+            vendor_id=profile_info.get("vendor_id"),
+            product_id=profile_info.get("product_id"),
+        )
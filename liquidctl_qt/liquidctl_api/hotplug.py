@@ -0,0 +1,182 @@
+import sys
+import threading
+
+from liquidctl_api.device_registry import device_location
+
+
+class PollingBackend:
+    """Reports a possible change every interval seconds"""
+
+    __slots__ = ("interval", "_closed")
+
+    def __init__(self, interval: float = 2):
+        self.interval = interval
+        self._closed = threading.Event()
+
+    def wait(self) -> bool:
+        """Blocks until devices might have changed, False once closed"""
+        return not self._closed.wait(self.interval)
+
+    def close(self):
+        self._closed.set()
+
+
+class UdevBackend:
+    """
+    Kernel (netlink) uevents of USB and hidraw devices through pyudev,
+    the events of a single plug in are reported as one change
+    """
+
+    __slots__ = ("_monitor", "_closed")
+
+    SUBSYSTEMS = ("usb", "hidraw")
+    POLL_TIMEOUT = 1  # how often close() is noticed
+    SETTLE_TIME = 0.5  # a plug in is a burst of events
+
+    def __init__(self):
+        import pyudev  # pylint: disable=import-outside-toplevel
+        self._monitor = pyudev.Monitor.from_netlink(pyudev.Context())
+        for subsystem in self.SUBSYSTEMS:
+            self._monitor.filter_by(subsystem)
+        self._monitor.start()
+        self._closed = threading.Event()
+
+    def wait(self) -> bool:
+        while not self._closed.is_set():
+            if self._monitor.poll(timeout=self.POLL_TIMEOUT) is None:
+                continue
+            while self._monitor.poll(timeout=self.SETTLE_TIME) is not None:
+                pass
+            return not self._closed.is_set()
+        return False
+
+    def close(self):
+        self._closed.set()
+
+
+class FakeBackend:
+    """Changes are reported by calling trigger() (tests, simulations)"""
+
+    __slots__ = ("_changed", "_closed")
+
+    def __init__(self):
+        self._changed = threading.Event()
+        self._closed = False
+
+    def trigger(self):
+        self._changed.set()
+
+    def wait(self) -> bool:
+        self._changed.wait()
+        self._changed.clear()
+        return not self._closed
+
+    def close(self):
+        self._closed = True
+        self._changed.set()
+
+
+def default_backend():
+    """udev on Linux if pyudev is installed, polling otherwise"""
+    if sys.platform.startswith("linux"):
+        try:
+            return UdevBackend()
+        except (ImportError, OSError):
+            pass
+    return PollingBackend()
+
+
+class HotplugWatcher:
+    """
+    Enumerates the devices again whenever the backend reports a change
+    and adds/removes the ones which appeared/disappeared (compared by
+    location, the serial numbers of new ones only) to/from the LiquidctlApi
+    only new devices are initialized, the others are left alone
+    on_added(dev_index) / on_removed(dev_index) are called from the
+    watcher thread, on_added before the device is initialized,
+    on_initialized(dev_index, error) when that's done (init thread)
+    """
+
+    __slots__ = (
+        "liquidctl_api",
+        "backend",
+        "on_added",
+        "on_removed",
+        "on_initialized",
+        "_thread",
+        "_lock",
+    )
+
+    def __init__(
+        self,
+        liquidctl_api,
+        backend=None,
+        on_added=None,
+        on_removed=None,
+        on_initialized=None,
+    ):
+        self.liquidctl_api = liquidctl_api
+        self.backend = backend
+        self.on_added = on_added
+        self.on_removed = on_removed
+        self.on_initialized = on_initialized
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def scan(self):
+        """Returns (added dev_indexes, removed dev_indexes)"""
+        with self._lock:
+            registry = self.liquidctl_api.registry
+            # compared by location first, only new devices are asked for
+            # their serial number (an enumeration is cheap, reads aren't)
+            found = {
+                device_location(device): device
+                for device in self.liquidctl_api.find_devices()
+            }
+            present = {
+                registry.location(dev_index): dev_index
+                for dev_index, _ in self.liquidctl_api.present()
+            }
+            removed = [
+                dev_index for location, dev_index in present.items()
+                if location not in found
+            ]
+            for dev_index in removed:
+                self.liquidctl_api.remove_device(dev_index)
+                if self.on_removed:
+                    self.on_removed(dev_index)
+            added = []
+            for location, device in found.items():
+                if location in present:
+                    continue
+                dev_index = self.liquidctl_api.add_device(device)
+                added.append(dev_index)
+                if self.on_added:
+                    self.on_added(dev_index)
+                self.liquidctl_api.initialize_device_async(
+                    dev_index, self.on_initialized
+                )
+            return added, removed
+
+    def _run(self):
+        while self.backend.wait():
+            try:
+                self.scan()
+            except (OSError, ValueError, RuntimeError) as error:
+                # tried again on the next change
+                print(f"Hot-plug scan failed: {error}", file=sys.stderr)
+
+    def start(self):
+        if self.backend is None:
+            self.backend = default_backend()
+        self._thread = threading.Thread(
+            target=self._run, name="HotplugWatcher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self.backend.close()
+        self._thread.join(timeout=1)
+        self._thread = None
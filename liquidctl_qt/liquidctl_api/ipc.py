@@ -0,0 +1,493 @@
+"""
+Local IPC over a Unix domain socket, one JSON object per line
+requests:  {"id": int, "op": str, ...arguments}
+responses: {"id": int, "result": ...} or {"id": int, "error": str}
+pushes:    {"event": "status", "dev_index": int, "status": dict}
+ops:
+    devices                                  -> [{device info}, ...]
+    status           dev_index               -> parsed status
+    subscribe                                -> pushes every new status
+    set_fixed_speed  dev_index, channel, duty
+    set_speed_profile dev_index, channel, profile ([[temp, duty], ...])
+"""
+from os import path, getpid, makedirs, remove, replace, umask
+import asyncio
+import collections
+import itertools
+import json
+import socket
+import sys
+import threading
+
+from liquidctl_api import hotplug, liquidctl_api
+
+SOCKET_PATH = path.join(
+    path.expanduser("~/.config/Liquidctl-Qt"), "liquidctl-qt.sock"
+)
+
+
+class IpcServer:
+    """
+    Serves the devices of a LiquidctlApi to many clients, statuses come
+    from the StatusEngine (one get_status() per device per interval no
+    matter how many clients ask), clients waiting for the first status of
+    a device share that read
+    """
+
+    __slots__ = (
+        "liquidctl_api",
+        "engine",
+        "socket_path",
+        "_loop",
+        "_server",
+        "_subscribers",
+        "_waiters",
+        "_clients",
+        "_stopped",
+    )
+
+    def __init__(self, liquidctl_api, engine, socket_path: str = SOCKET_PATH):
+        self.liquidctl_api = liquidctl_api
+        self.engine = engine
+        self.socket_path = socket_path
+        self._loop = None
+        self._server = None
+        self._subscribers = set()  # _Outbox of every subscriber
+        self._waiters = {}  # dev_index: future of the next status
+        self._clients = {}  # connection task: its writer
+        self._stopped = None
+
+    def publish(self, dev_index, parsed_info):
+        """Called (from an engine thread) with every new status"""
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(
+                self._publish, dev_index, parsed_info
+            )
+
+    def _publish(self, dev_index, parsed_info):
+        waiter = self._waiters.pop(dev_index, None)
+        if waiter is not None and not waiter.done():
+            waiter.set_result(parsed_info)
+        if not self._subscribers:
+            return
+        # encoded once for every subscriber
+        line = _encode({
+            "event": "status", "dev_index": dev_index, "status": parsed_info,
+        })
+        for subscriber in self._subscribers:
+            subscriber.push(line)
+
+    async def _status(self, dev_index):
+        status = self.engine.latest(dev_index)
+        if status is not None:
+            return status
+        if not self.liquidctl_api.ready[dev_index]:
+            raise RuntimeError("device isn't initialized yet")
+        waiter = self._waiters.get(dev_index)
+        if waiter is None:
+            waiter = self._waiters[dev_index] = self._loop.create_future()
+            self.engine.poll_now(dev_index)
+        return await waiter
+
+    def _devices(self):
+        return [
+            {
+                "description": device.description,
+                "vendor_id": device.vendor_id,
+                "product_id": device.product_id,
+                "serial_number": device.serial_number,
+                "bus": device.bus,
+                "address": str(device.address),
+                "ready": self.liquidctl_api.ready[dev_index],
+                "removed": dev_index in self.liquidctl_api.removed,
+            }
+            for dev_index, device in enumerate(self.liquidctl_api.devices_list)
+        ]
+
+    def _write(self, dev_index, method, *args):
+        """Runs in an executor, writes shouldn't block the event loop"""
+        device = self.liquidctl_api.devices_list[dev_index]
+        with self.liquidctl_api.device_locks[dev_index]:
+            getattr(device, method)(*args)
+        self.liquidctl_api.status_cache.invalidate(dev_index)
+
+    async def _handle(self, request, subscriber):
+        op = request.get("op")
+        if op == "devices":
+            return self._devices()
+        if op == "status":
+            return await self._status(request["dev_index"])
+        if op == "subscribe":
+            self._subscribers.add(subscriber)
+            return True
+        if op == "set_fixed_speed":
+            await self._loop.run_in_executor(
+                None, self._write, request["dev_index"], "set_fixed_speed",
+                request["channel"], request["duty"],
+            )
+            return True
+        if op == "set_speed_profile":
+            await self._loop.run_in_executor(
+                None, self._write, request["dev_index"], "set_speed_profile",
+                request["channel"], [tuple(step) for step in request["profile"]],
+            )
+            return True
+        raise ValueError(f"unknown op: {op}")
+
+    async def _respond(self, request, subscriber):
+        response = {"id": request.get("id")}
+        try:
+            response["result"] = await self._handle(request, subscriber)
+        except Exception as error:  # pylint: disable=broad-except
+            response["error"] = f"{type(error).__name__}: {error}"
+        subscriber.respond(_encode(response))
+
+    async def _writer(self, subscriber, writer):
+        while True:
+            line = await subscriber.get()
+            writer.write(line)
+            await writer.drain()
+
+    async def _client(self, reader, writer):
+        # responses and pushes of a client go through one outbox
+        subscriber = _Outbox()
+        writer_task = self._loop.create_task(self._writer(subscriber, writer))
+        self._clients[asyncio.current_task()] = writer
+        tasks = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    continue
+                task = self._loop.create_task(
+                    self._respond(request, subscriber)
+                )
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except ConnectionError:
+            pass
+        finally:
+            del self._clients[asyncio.current_task()]
+            self._subscribers.discard(subscriber)
+            for task in tasks:
+                task.cancel()
+            writer_task.cancel()
+            writer.close()
+
+    async def serve(self):
+        self._loop = asyncio.get_running_loop()
+        makedirs(path.dirname(self.socket_path), exist_ok=True)
+        # bound and listening before it's renamed to socket_path (over
+        # one left behind by a killed server), clients never find a socket
+        # which refuses them
+        bound_path = f"{self.socket_path}.{getpid()}"
+        if path.exists(bound_path):
+            remove(bound_path)
+        server_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # clients can change fan speeds, only the user may connect, the
+        # socket is created 0600 (not chmod-ed after it could be reached)
+        old_umask = umask(0o177)
+        try:
+            server_socket.bind(bound_path)
+        finally:
+            umask(old_umask)
+        self._server = await asyncio.start_unix_server(
+            self._client, sock=server_socket, limit=1024 * 1024,
+            backlog=1024,  # many clients connect at once (daemon start)
+        )
+        replace(bound_path, self.socket_path)
+        self._stopped = self._loop.create_future()
+        async with self._server:
+            await self._stopped
+            # closed connections end their handlers (EOF)
+            for writer in self._clients.values():
+                writer.close()
+            await asyncio.gather(*self._clients)
+
+    def _stop(self):
+        if not self._stopped.done():
+            self._stopped.set_result(None)
+
+    def run_in_thread(self):
+        """Serves from a background thread, for Daemon"""
+        thread = threading.Thread(
+            target=asyncio.run, args=(self.serve(),), name="IpcServer",
+            daemon=True,
+        )
+        thread.start()
+        return thread
+
+    def close(self):
+        if self._loop is not None and self._stopped is not None:
+            self._loop.call_soon_threadsafe(self._stop)
+        if path.exists(self.socket_path):
+            remove(self.socket_path)
+
+
+def _encode(message) -> bytes:
+    return json.dumps(message).encode() + b"\n"
+
+
+class _Outbox:
+    """
+    Lines waiting to be sent to a client, the oldest status pushes are
+    dropped when a slow client has MAX_EVENTS of them waiting, responses
+    to its requests never are (and are sent first)
+    """
+
+    __slots__ = ("responses", "events", "_ready")
+
+    MAX_EVENTS = 256
+
+    def __init__(self):
+        self.responses = collections.deque()
+        self.events = collections.deque(maxlen=self.MAX_EVENTS)
+        self._ready = asyncio.Event()
+
+    def respond(self, line):
+        self.responses.append(line)
+        self._ready.set()
+
+    def push(self, line):
+        self.events.append(line)
+        self._ready.set()
+
+    async def get(self):
+        while not (self.responses or self.events):
+            self._ready.clear()
+            await self._ready.wait()
+        return (self.responses or self.events).popleft()
+
+
+class IpcError(RuntimeError):
+    """Error of a request, kind is the name of the server side exception"""
+
+    def __init__(self, message: str):
+        self.kind = message.split(":", 1)[0]
+        super().__init__(message)
+
+
+class IpcClient:
+    """
+    Blocking client of an IpcServer, pushes of a subscription are passed
+    to on_status(dev_index, parsed_info) from the reader thread
+    """
+
+    __slots__ = (
+        "on_status", "_socket", "_file", "_ids", "_pending", "_lock",
+        "_thread",
+    )
+
+    def __init__(self, socket_path: str = SOCKET_PATH, on_status=None):
+        self.on_status = on_status
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.connect(socket_path)
+        self._file = self._socket.makefile("rb")
+        self._ids = itertools.count()
+        self._pending = {}  # request id: [threading.Event, response]
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(
+            target=self._read, name="IpcClient", daemon=True
+        )
+        self._thread.start()
+
+    def _read(self):
+        for line in self._file:
+            message = json.loads(line)
+            if "event" in message:
+                if self.on_status is not None:
+                    self.on_status(message["dev_index"], message["status"])
+                continue
+            pending = self._pending.pop(message.get("id"), None)
+            if pending is not None:
+                pending[1] = message
+                pending[0].set()
+        # connection closed, don't leave callers waiting
+        for pending in list(self._pending.values()):
+            pending[1] = {"error": "ConnectionError: server went away"}
+            pending[0].set()
+
+    def request(self, op: str, timeout: float = 10, **arguments):
+        request_id = next(self._ids)
+        pending = self._pending[request_id] = [threading.Event(), None]
+        with self._lock:
+            self._socket.sendall(
+                _encode(dict(arguments, id=request_id, op=op))
+            )
+        if not pending[0].wait(timeout):
+            self._pending.pop(request_id, None)
+            raise TimeoutError(f"{op} timed out")
+        response = pending[1]
+        if "error" in response:
+            raise IpcError(response["error"])
+        return response["result"]
+
+    def close(self):
+        self._socket.close()
+
+
+class RemoteDevice:
+    """
+    Device of a server, has the parts of a liquidctl driver the GUI uses
+    so it can be used in a RemoteLiquidctlApi
+    """
+
+    __slots__ = (
+        "client", "dev_index", "description", "vendor_id", "product_id",
+        "serial_number", "bus", "address",
+    )
+
+    def __init__(self, client, dev_index, device_info):
+        self.client = client
+        self.dev_index = dev_index
+        self.description = device_info["description"]
+        self.vendor_id = device_info["vendor_id"]
+        self.product_id = device_info["product_id"]
+        self.serial_number = device_info["serial_number"]
+        self.bus = device_info["bus"]
+        self.address = device_info["address"]
+
+    # the server owns (connects, initializes) the real device
+    def connect(self, **kwargs):
+        return self
+
+    def disconnect(self, **kwargs):
+        pass
+
+    def initialize(self, **kwargs):
+        return []
+
+    def get_status(self, **kwargs):
+        """Already parsed by the server (see RemoteLiquidctlApi)"""
+        return self.client.request("status", dev_index=self.dev_index)
+
+    def set_fixed_speed(self, channel, duty, **kwargs):
+        self.client.request(
+            "set_fixed_speed", dev_index=self.dev_index,
+            channel=channel, duty=duty,
+        )
+
+    def set_speed_profile(self, channel, profile, **kwargs):
+        try:
+            self.client.request(
+                "set_speed_profile", dev_index=self.dev_index,
+                channel=channel, profile=[list(step) for step in profile],
+            )
+        except IpcError as error:
+            if error.kind != "NotSupportedByDevice":
+                raise
+            # callers fall back to a software curve on this one
+            # pylint: disable=import-outside-toplevel
+            from liquidctl.error import NotSupportedByDevice
+            raise NotSupportedByDevice() from error
+
+
+def find_remote_devices(client):
+    """Returns a find_devices function for LiquidctlApi"""
+    def find_devices():
+        return [
+            RemoteDevice(client, dev_index, device_info)
+            for dev_index, device_info in enumerate(client.request("devices"))
+        ]
+    return find_devices
+
+
+class RemoteLiquidctlApi(liquidctl_api.LiquidctlApi):
+    """
+    LiquidctlApi of the devices of a server (liquidctl_qt --attach),
+    statuses are parsed by the server already
+    the server initializes its devices and sees them plugged in/out,
+    sync() mirrors its ready/removed flags (RemoteHotplugWatcher), a
+    device is ready only once the server says so
+    """
+
+    __slots__ = ("client",)
+
+    def __init__(self, client, initialize: bool = True):
+        self.client = client
+        super().__init__(
+            initialize=initialize, find_devices=find_remote_devices(client)
+        )
+
+    def _initialize_connect(self):
+        self.sync()
+
+    def initialize_async(self, callback=None):
+        """Nothing to initialize, sync() reports devices which are ready"""
+
+    def initialize_device_async(self, dev_index: int, callback=None):
+        """Nothing to initialize, sync() reports devices which are ready"""
+
+    def _set_ready(self, dev_index):
+        self.ready[dev_index] = True
+        self._ready_events[dev_index].set()
+
+    def sync(self, on_added=None, on_removed=None, on_initialized=None):
+        """
+        Asks the server for its devices, adds the new ones and marks the
+        ones which became ready/were removed, dev_indexes are the server's
+        (it never reuses them), callbacks are called like HotplugWatcher
+        calls them, returns (added dev_indexes, removed dev_indexes)
+        """
+        added = []
+        removed = []
+        for dev_index, device_info in enumerate(self.client.request("devices")):
+            if dev_index == len(self.devices_list):
+                self.add_device(RemoteDevice(self.client, dev_index, device_info))
+                added.append(dev_index)
+                if on_added:
+                    on_added(dev_index)
+            if device_info["removed"]:
+                if dev_index not in self.removed:
+                    self.remove_device(dev_index)
+                    removed.append(dev_index)
+                    if on_removed:
+                        on_removed(dev_index)
+            elif device_info["ready"] and not self.ready[dev_index]:
+                self._set_ready(dev_index)
+                if on_initialized:
+                    on_initialized(dev_index, None)
+        return added, removed
+
+    def to_dict(self, dev_status):
+        return dev_status
+
+    def on_quit(self):
+        self.client.close()
+
+
+class RemoteHotplugWatcher(hotplug.HotplugWatcher):
+    """
+    HotplugWatcher of a RemoteLiquidctlApi, polls the server's devices
+    (the server watches the hardware), the first sync() is done right
+    away so devices which are ready already are reported at once
+    """
+
+    __slots__ = ()
+
+    INTERVAL = 1
+
+    def scan(self):
+        with self._lock:
+            return self.liquidctl_api.sync(
+                self.on_added, self.on_removed, self.on_initialized
+            )
+
+    def _run(self):
+        while True:
+            try:
+                self.scan()
+            except (OSError, ValueError, RuntimeError) as error:
+                # tried again on the next poll
+                print(f"Syncing devices failed: {error}", file=sys.stderr)
+            if not self.backend.wait():
+                break
+
+    def start(self):
+        if self.backend is None:
+            self.backend = hotplug.PollingBackend(self.INTERVAL)
+        super().start()
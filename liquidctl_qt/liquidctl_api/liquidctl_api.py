@@ -1,53 +1,154 @@
-from liquidctl.driver import find_liquidctl_devices
+from concurrent.futures import ThreadPoolExecutor
+import threading
+from liquidctl_api import device_registry, status_cache, status_parser
 
 
 class LiquidctlApi:
-    """Simple "API" for accessing devices"""
+    """
+    Simple "API" for accessing devices
+    initialize=False leaves connecting and initializing the devices to
+    initialize_async() so the caller doesn't have to wait for it
+    find_devices replaces liquidctl's device discovery (fake devices)
+    registry looks devices up by identity (DeviceRegistry)
+    device_locks serialize access to a device handle between threads
+    status_ttl is how long a status read is shared (StatusCache), read
+    statuses through get_status() instead of device.get_status()
+    devices plugged in/out later are added/removed by add_device() and
+    remove_device() (HotplugWatcher), a dev_index is never reused, so
+    the entries of removed devices stay in the lists (see removed)
+    """
 
-    __slots__ = ("devices", "devices_list", "devices_dict")
+    __slots__ = (
+        "devices",
+        "devices_list",
+        "registry",
+        "ready",
+        "device_locks",
+        "status_parser",
+        "status_cache",
+        "removed",
+        "find_devices",
+        "_ready_events",
+    )
 
-    def __init__(self):
-        self.devices_list = self._devices_list()
-        self.devices_dict = self._devices_dict()
+    def __init__(
+        self,
+        initialize: bool = True,
+        find_devices=None,
+        status_ttl: float = 0.5,
+    ):
+        self.find_devices = self._find_devices(find_devices)
+        self.devices_list = list(self.find_devices())
+        self.registry = device_registry.DeviceRegistry(self.devices_list)
+        self.ready = [False for _ in self.devices_list]
+        self._ready_events = [threading.Event() for _ in self.devices_list]
+        self.device_locks = [threading.Lock() for _ in self.devices_list]
+        self.status_parser = status_parser.StatusParser()
+        self.status_cache = status_cache.StatusCache(self, ttl=status_ttl)
+        self.removed = set()  # dev_indexes of unplugged devices
+        if initialize:
+            self._initialize_connect()
 
-    def _devices_list(self):
-        return list(find_liquidctl_devices())
-
-    def _devices_dict(self):
-        self._initialize_connect()
-        devices_dict = {
-            dev_obj.description: [
-                dev_obj.serial_number,
-                dev_obj,
-            ]
-            for dev_obj in self.devices_list
-        }
-        return devices_dict
+    @staticmethod
+    def _find_devices(find_devices=None):
+        if find_devices is None:
+            # loads every liquidctl driver, so only when it's needed
+            # pylint: disable=import-outside-toplevel
+            from liquidctl.driver import find_liquidctl_devices
+            find_devices = find_liquidctl_devices
+        return find_devices
 
     def _initialize_connect(self):
-        for device in self.devices_list:
-            device.disconnect()
-            device.connect()
-            device.initialize()
-
-    def _in_str(self, in_str, checked_str):
-        if isinstance(in_str, str) and in_str in checked_str:
-            return True
-        elif isinstance(in_str, tuple):
-            for string in in_str:
-                if string in checked_str:
-                    return True
-        return False
+        for dev_index, _ in enumerate(self.devices_list):
+            self._initialize_device(dev_index)
+
+    def _initialize_device(self, dev_index):
+        device = self.devices_list[dev_index]
+        device.disconnect()
+        device.connect()
+        device.initialize()
+        self.ready[dev_index] = True
+        self._ready_events[dev_index].set()
+
+    def _initialize_task(self, dev_index, callback):
+        error = None
+        try:
+            self._initialize_device(dev_index)
+        except Exception as init_error:  # pylint: disable=broad-except
+            # one broken device mustn't take the others (or the GUI) down
+            error = init_error
+        if callback:
+            callback(dev_index, error)
+
+    def initialize_async(self, callback=None):
+        """
+        Connects and initializes all devices in parallel in the background
+        callback(dev_index, error) is called from a worker thread when
+        a device is done, error is None if it succeeded
+        """
+        if not self.devices_list:
+            return
+        pool = ThreadPoolExecutor(
+            max_workers=len(self.devices_list),
+            thread_name_prefix="DeviceInit",
+        )
+        for dev_index, _ in enumerate(self.devices_list):
+            pool.submit(self._initialize_task, dev_index, callback)
+        pool.shutdown(wait=False)
+
+    def add_device(self, device) -> int:
+        """Adds a newly plugged in device (not initialized yet)"""
+        dev_index = len(self.devices_list)
+        self.registry.add(dev_index, device)
+        self.ready.append(False)
+        self._ready_events.append(threading.Event())
+        self.device_locks.append(threading.Lock())
+        # appended last, readers check len(devices_list)
+        self.devices_list.append(device)
+        self.status_cache.add_device()
+        return dev_index
+
+    def initialize_device_async(self, dev_index: int, callback=None):
+        """initialize_async() of a single (newly added) device"""
+        threading.Thread(
+            target=self._initialize_task,
+            args=(dev_index, callback),
+            name="DeviceInit",
+            daemon=True,
+        ).start()
+
+    def remove_device(self, dev_index: int):
+        """The device was unplugged, its dev_index isn't used anymore"""
+        self.ready[dev_index] = False
+        self.removed.add(dev_index)
+        self.registry.remove(dev_index)
+        try:
+            with self.device_locks[dev_index]:
+                self.devices_list[dev_index].disconnect()
+        except Exception:  # pylint: disable=broad-except
+            pass  # the handle is gone with the device
+
+    def present(self):
+        """(dev_index, device) of every device that wasn't removed"""
+        return [
+            (dev_index, device)
+            for dev_index, device in enumerate(self.devices_list)
+            if dev_index not in self.removed
+        ]
+
+    def wait_ready(self, dev_index: int, timeout: float = None) -> bool:
+        return self._ready_events[dev_index].wait(timeout)
 
     def disconnect_devices(self):
-        for device in self.devices_list:
+        for _, device in self.present():
             device.disconnect()
 
     def get_devices(self, dev_id: str = None, dev_index: int = None):
+        """Devices with the serial number dev_id or the device dev_index"""
         if dev_id:
             return [
-                value[1] for value in self.devices_dict.values() if
-                value[0] == dev_id
+                self.devices_list[index]
+                for index in self.registry.find(serial_number=dev_id)
             ]
 
         if dev_index is not None:
@@ -57,33 +158,12 @@ class LiquidctlApi:
                 return []
         return []
 
+    def get_status(self, dev_index: int, max_age: float = None) -> dict:
+        """Parsed status, shared with other callers (see StatusCache.get)"""
+        return self.status_cache.get(dev_index, max_age)
+
     def to_dict(self, dev_status):
-        dev_hw_info = {}
-        curr_hw = ""
-        for line in dev_status:
-            line = list(line)
-            if (
-                ("Fan" in line[0])
-                and ("Noise" or "Firmware" not in line[0])
-                and (("—" not in str(line[1])) and "" == line[2])
-            ):
-                curr_hw, mode = line[0:2]
-                dev_hw_info[curr_hw] = {}
-                dev_hw_info[curr_hw]["Mode"] = {
-                    "value": mode, "measurement": ""}
-                continue
-            if (
-                curr_hw in line[0] and "Fan" in curr_hw
-            ):  # if "Fan x" is in current line so it gets the info about it
-                if self._in_str(("current", "speed", "voltage"), line[0]):
-                    new_info = line[0].replace(curr_hw, "").strip().capitalize()
-                    data, measurement = line[1:3]
-                    dev_hw_info[curr_hw][new_info] = {
-                        "value": round(data, 2),
-                        "measurement": measurement.upper(),
-                    }
-        return dev_hw_info
+        return self.status_parser.parse(dev_status)
 
     def on_quit(self):
-        for device in self.devices_list:
-            device.disconnect()
+        self.disconnect_devices()
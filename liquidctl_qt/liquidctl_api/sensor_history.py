@@ -0,0 +1,182 @@
+from array import array
+import math
+import threading
+import time
+
+
+class RingBuffer:
+    """
+    Fixed size buffer of (timestamp, value) samples, once it is full the
+    oldest sample is overwritten, timestamps have to be appended in order
+    samples less than min_spacing seconds after the newest one are
+    dropped, so capacity samples always cover capacity * min_spacing
+    seconds, however often the values are read
+    """
+
+    __slots__ = (
+        "capacity", "min_spacing", "timestamps", "values", "_head", "_count",
+    )
+
+    def __init__(self, capacity: int, min_spacing: float = 0):
+        self.capacity = capacity
+        self.min_spacing = min_spacing
+        self.timestamps = array("d", bytes(8 * capacity))
+        self.values = array("d", bytes(8 * capacity))
+        self._head = 0  # where the next sample goes
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def append(self, timestamp: float, value: float) -> bool:
+        """False if the sample was dropped (too close to the newest one)"""
+        if self._count and (
+            timestamp - self.timestamps[self._head - 1] < self.min_spacing
+        ):
+            return False
+        self.timestamps[self._head] = timestamp
+        self.values[self._head] = value
+        self._head = (self._head + 1) % self.capacity
+        if self._count < self.capacity:
+            self._count += 1
+        return True
+
+    def _slot(self, position: int) -> int:
+        """Array index of the n-th oldest sample"""
+        return (self._head - self._count + position) % self.capacity
+
+    def _first_position(self, since: float) -> int:
+        """Position of the oldest sample not older than since"""
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self.timestamps[self._slot(middle)] < since:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def latest(self):
+        """Returns the newest (timestamp, value) or None"""
+        if not self._count:
+            return None
+        slot = self._slot(self._count - 1)
+        return self.timestamps[slot], self.values[slot]
+
+    def _segments(self, seconds: float, now: float):
+        """
+        (start, end) array index ranges of the samples of the last
+        seconds, oldest first, at most two (the buffer wraps around)
+        """
+        if now is None:
+            now = time.time()
+        first = self._first_position(now - seconds)
+        if first == self._count:
+            return ()
+        start = self._slot(first)
+        end = self._slot(self._count - 1) + 1
+        if start < end:
+            return ((start, end),)
+        return ((start, self.capacity), (0, end))
+
+    def window(self, seconds: float, now: float = None):
+        """Returns (timestamps, values) arrays of the last seconds"""
+        timestamps, values = array("d"), array("d")
+        for start, end in self._segments(seconds, now):
+            timestamps += self.timestamps[start:end]
+            values += self.values[start:end]
+        return timestamps, values
+
+    def stats(self, seconds: float, now: float = None):
+        """
+        Returns (min, max, mean) of the last seconds or None, read in
+        place (nothing is copied)
+        """
+        segments = [
+            memoryview(self.values)[start:end]
+            for start, end in self._segments(seconds, now)
+        ]
+        if not segments:
+            return None
+        count = sum(len(segment) for segment in segments)
+        return (
+            min(min(segment) for segment in segments),
+            max(max(segment) for segment in segments),
+            math.fsum(math.fsum(segment) for segment in segments) / count,
+        )
+
+
+class SensorHistory:
+    """
+    History of every numeric value of every device, a fixed size
+    RingBuffer per (dev_index, hw_name, field) which holds retention
+    seconds of samples taken every interval seconds
+    extra reads (StatusEngine.poll_now) don't shorten the retention,
+    samples closer together than SPACING * interval are dropped
+    """
+
+    __slots__ = ("retention", "interval", "buffers", "_lock")
+
+    # the engine reads at a steady rate, a little early is still on time
+    SPACING = 0.9
+
+    def __init__(self, retention: float, interval: float):
+        self.retention = retention
+        self.interval = interval
+        self.buffers = {}
+        self._lock = threading.Lock()
+
+    @property
+    def min_spacing(self) -> float:
+        return self.interval * self.SPACING
+
+    @property
+    def capacity(self) -> int:
+        return math.ceil(self.retention / self.min_spacing) + 1
+
+    def record(self, dev_index: int, dev_hw_info: dict, timestamp: float = None):
+        """Appends the numeric values of a parsed status (StatusParser)"""
+        if timestamp is None:
+            timestamp = time.time()
+        with self._lock:
+            for hw_name, hw_info in dev_hw_info.items():
+                for field, field_info in hw_info.items():
+                    value = field_info["value"]
+                    if not isinstance(value, (int, float)):
+                        continue
+                    key = (dev_index, hw_name, field)
+                    buffer = self.buffers.get(key)
+                    if buffer is None:
+                        buffer = self.buffers[key] = RingBuffer(
+                            self.capacity, self.min_spacing
+                        )
+                    buffer.append(timestamp, value)
+
+    def series(self, dev_index: int = None) -> list:
+        """Returns the (dev_index, hw_name, field) keys with history"""
+        with self._lock:
+            return [
+                key for key in self.buffers
+                if dev_index is None or key[0] == dev_index
+            ]
+
+    def latest(self, dev_index: int, hw_name: str, field: str):
+        buffer = self.buffers.get((dev_index, hw_name, field))
+        if buffer is None:
+            return None
+        with self._lock:
+            return buffer.latest()
+
+    def window(self, dev_index: int, hw_name: str, field: str, seconds: float):
+        buffer = self.buffers.get((dev_index, hw_name, field))
+        if buffer is None:
+            return [], []
+        with self._lock:
+            return buffer.window(seconds)
+
+    def stats(self, dev_index: int, hw_name: str, field: str, seconds: float):
+        buffer = self.buffers.get((dev_index, hw_name, field))
+        if buffer is None:
+            return None
+        with self._lock:
+            return buffer.stats(seconds)
@@ -0,0 +1,316 @@
+from os import path, makedirs, listdir, remove
+import json
+import mmap
+import queue
+import struct
+import threading
+import time
+
+import utils
+
+# bucket start, series id, min, max, sum, sample count
+RECORD = struct.Struct("<dIdddI")
+# resolution name: bucket length in seconds
+RESOLUTIONS = {"1s": 1, "1m": 60, "1h": 60 * 60}
+# resolution: seconds its segments are kept
+RETENTION = {"1s": 24 * 60 * 60, "1m": 30 * 24 * 60 * 60, "1h": 365 * 24 * 60 * 60}
+SEGMENT_SUFFIX = ".seg"
+
+
+def segment_paths(root: str) -> list:
+    """Segment files of a resolution directory, oldest first"""
+    if not path.isdir(root):
+        return []
+    return [
+        path.join(root, file_name)
+        for file_name in sorted(listdir(root))
+        if file_name.endswith(SEGMENT_SUFFIX)
+    ]
+
+
+def remove_segments_older(root: str, before: float):
+    """Deletes segments created before the timestamp, except the newest"""
+    for segment_path in segment_paths(root)[:-1]:
+        created = float(path.basename(segment_path)[:-len(SEGMENT_SUFFIX)])
+        if created < before:
+            remove(segment_path)
+
+
+class _Bucket:
+    __slots__ = ("start", "minimum", "maximum", "total", "count")
+
+    def __init__(self, start: float, value: float):
+        self.start = start
+        self.minimum = value
+        self.maximum = value
+        self.total = value
+        self.count = 1
+
+    def add(self, value: float):
+        self.minimum = min(self.minimum, value)
+        self.maximum = max(self.maximum, value)
+        self.total += value
+        self.count += 1
+
+    def pack(self, series_id: int) -> bytes:
+        return RECORD.pack(
+            self.start, series_id,
+            self.minimum, self.maximum, self.total, self.count,
+        )
+
+
+class _Segments:
+    """
+    Append only segment files of a single resolution, segments older
+    than retention seconds are deleted whenever a new one is started
+    ages are wall clock ones, not the (possibly old) bucket timestamps
+    """
+
+    __slots__ = (
+        "root", "max_bytes", "max_age", "retention", "_file", "_created",
+        "_size",
+    )
+
+    def __init__(
+        self, root: str, max_bytes: int, max_age: float, retention: float
+    ):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.retention = retention
+        self._file = None
+        self._created = 0
+        self._size = 0
+        makedirs(root, exist_ok=True)
+
+    def _rotate(self):
+        self.close()
+        now = time.time()
+        # timestamp in the name keeps segments sorted by age
+        file_path = path.join(self.root, f"{now:017.6f}{SEGMENT_SUFFIX}")
+        self._file = open(file_path, "ab")
+        self._created = now
+        self._size = 0
+        remove_segments_older(self.root, now - self.retention)
+
+    def write(self, data: bytes):
+        if (
+            self._file is None
+            or self._size + len(data) > self.max_bytes
+            or time.time() - self._created > self.max_age
+        ):
+            self._rotate()
+        self._file.write(data)
+        self._size += len(data)
+
+    def flush(self):
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class SensorLogger:
+    """
+    Logs parsed statuses (StatusParser) into fixed size binary records
+    every resolution (1s/1m/1h) has its own rollups (min, max, sum, count
+    of a bucket) in segment files rotated by size and age, under:
+        root/<resolution>/<created timestamp>.seg
+    Samples are only queued by log(), aggregating and writing is done in
+    batches by a background thread
+    a bucket is written once, samples arriving after it was written
+    (older than the open bucket) are dropped
+    """
+
+    __slots__ = (
+        "root",
+        "flush_interval",
+        "series_ids",
+        "_series_path",
+        "_segments",
+        "_buckets",
+        "_written",
+        "_queue",
+        "_thread",
+    )
+
+    def __init__(
+        self,
+        root: str,
+        max_segment_bytes: int = 4 * 1024 * 1024,
+        max_segment_age: float = 24 * 60 * 60,
+        flush_interval: float = 5,
+        retention: dict = None,
+    ):
+        self.root = root
+        self.flush_interval = flush_interval
+        self._series_path = path.join(root, "series.json")
+        self.series_ids = self._load_series_ids()
+        retention = {**RETENTION, **(retention or {})}
+        self._segments = {
+            resolution: _Segments(
+                path.join(root, resolution),
+                max_segment_bytes,
+                max_segment_age,
+                retention[resolution],
+            )
+            for resolution in RESOLUTIONS
+        }
+        self._buckets = {resolution: {} for resolution in RESOLUTIONS}
+        # resolution: {series_id: start of the last written bucket}
+        self._written = {resolution: {} for resolution in RESOLUTIONS}
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+
+    def _load_series_ids(self) -> dict:
+        if not path.exists(self._series_path):
+            return {}
+        with open(self._series_path, "r", encoding="utf-8") as series_file:
+            return json.loads(series_file.read())
+
+    def _save_series_ids(self):
+        # a crash mustn't leave a truncated index of every series
+        utils.atomic_write(self._series_path, json.dumps(self.series_ids))
+
+    def _series_id(self, series: str) -> int:
+        series_id = self.series_ids.get(series)
+        if series_id is None:
+            series_id = self.series_ids[series] = len(self.series_ids)
+            self._save_series_ids()
+        return series_id
+
+    def log(self, device_name: str, dev_hw_info: dict, timestamp: float = None):
+        """Queues the numeric values of a parsed status, never blocks"""
+        if timestamp is None:
+            timestamp = time.time()
+        self._queue.put((device_name, dev_hw_info, timestamp))
+
+    def _aggregate(self, device_name, dev_hw_info, timestamp):
+        for hw_name, hw_info in dev_hw_info.items():
+            for field, field_info in hw_info.items():
+                value = field_info["value"]
+                if not isinstance(value, (int, float)):
+                    continue
+                series_id = self._series_id(
+                    f"{device_name}/{hw_name}/{field}"
+                )
+                for resolution, seconds in RESOLUTIONS.items():
+                    self._add(resolution, seconds, series_id, timestamp, value)
+
+    def _write(self, resolution, series_id, bucket):
+        self._segments[resolution].write(bucket.pack(series_id))
+        self._written[resolution][series_id] = bucket.start
+
+    def _add(self, resolution, seconds, series_id, timestamp, value):
+        buckets = self._buckets[resolution]
+        start = timestamp - timestamp % seconds
+        bucket = buckets.get(series_id)
+        if bucket is not None and bucket.start == start:
+            bucket.add(value)
+            return
+        written = self._written[resolution].get(series_id)
+        if (bucket is not None and start < bucket.start) or (
+            written is not None and start <= written
+        ):
+            return  # late, its bucket was written already
+        if bucket is not None:  # the bucket is complete
+            self._write(resolution, series_id, bucket)
+        buckets[series_id] = _Bucket(start, value)
+
+    def _flush_buckets(self, force=False):
+        """Writes buckets which are done (or all of them when closing)"""
+        now = time.time()
+        for resolution, seconds in RESOLUTIONS.items():
+            buckets = self._buckets[resolution]
+            for series_id, bucket in list(buckets.items()):
+                if force or bucket.start + seconds <= now:
+                    self._write(resolution, series_id, bucket)
+                    del buckets[series_id]
+            self._segments[resolution].flush()
+
+    def _run(self):
+        while True:
+            deadline = time.monotonic() + self.flush_interval
+            # collect a batch, then write it in one go
+            while True:
+                timeout = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=max(timeout, 0))
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._flush_buckets(force=True)
+                    return
+                self._aggregate(*item)
+            self._flush_buckets()
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._run, name="SensorLogger", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+        for segments in self._segments.values():
+            segments.close()
+
+
+class SensorLogReader:
+    """Reads SensorLogger segment files through memory mapping"""
+
+    __slots__ = ("root", "series_ids")
+
+    def __init__(self, root: str):
+        self.root = root
+        with open(
+            path.join(root, "series.json"), "r", encoding="utf-8"
+        ) as series_file:
+            self.series_ids = json.loads(series_file.read())
+
+    def segments(self, resolution: str) -> list:
+        return segment_paths(path.join(self.root, resolution))
+
+    def read(
+        self,
+        series: str,
+        resolution: str = "1m",
+        start: float = 0,
+        end: float = float("inf"),
+    ):
+        """
+        Yields (bucket start, min, max, mean) of series
+        ("device name/hw name/field") between start and end
+        """
+        series_id = self.series_ids.get(series)
+        if series_id is None:
+            return
+        for segment_path in self.segments(resolution):
+            if path.getsize(segment_path) < RECORD.size:
+                continue
+            with open(segment_path, "rb") as segment_file, mmap.mmap(
+                segment_file.fileno(), 0, access=mmap.ACCESS_READ
+            ) as mapped:
+                # a record can be half written by a running logger
+                usable = len(mapped) - len(mapped) % RECORD.size
+                with memoryview(mapped) as view, view[:usable] as records:
+                    for record in RECORD.iter_unpack(records):
+                        bucket_start, record_id, minimum, maximum, total, count = (
+                            record
+                        )
+                        if (
+                            record_id == series_id
+                            and start <= bucket_start <= end
+                        ):
+                            yield bucket_start, minimum, maximum, total / count
+
+    def remove_older(self, resolution: str, before: float):
+        """Deletes segments created before the timestamp"""
+        remove_segments_older(path.join(self.root, resolution), before)
@@ -0,0 +1,222 @@
+"""
+Simulated devices (liquidctl_qt --simulate N), they behave like liquidctl
+drivers so everything above LiquidctlApi can be run and benchmarked
+without hardware
+"""
+from bisect import bisect_right
+import math
+import random
+import threading
+import time
+
+
+class ThermalModel:
+    """
+    Liquid temperature of a loop, heated by a slowly changing load and
+    cooled more the higher the (average) fan duty is
+    the temperature moves towards the steady state temperature of the
+    current load and duty with time_constant seconds
+    """
+
+    __slots__ = (
+        "ambient",
+        "heat",
+        "conductance",
+        "fan_conductance",
+        "time_constant",
+        "load_period",
+        "temperature",
+        "_started",
+    )
+
+    def __init__(
+        self,
+        ambient: float = 25,
+        heat: float = 250,
+        conductance: float = 10,
+        fan_conductance: float = 30,
+        time_constant: float = 20,
+        load_period: float = 120,
+    ):
+        self.ambient = ambient
+        self.heat = heat  # W at full load
+        self.conductance = conductance  # W/°C with the fans stopped
+        self.fan_conductance = fan_conductance  # extra W/°C at 100 % duty
+        self.time_constant = time_constant
+        self.load_period = load_period  # seconds between load peaks
+        self.temperature = ambient
+        self._started = time.monotonic()
+
+    def load(self, now: float) -> float:
+        """0.3 - 1, so there is always something for curves to react to"""
+        phase = 2 * math.pi * (now - self._started) / self.load_period
+        return 0.65 + 0.35 * math.sin(phase)
+
+    def advance(self, elapsed: float, duty: float, now: float) -> float:
+        steady = self.ambient + self.heat * self.load(now) / (
+            self.conductance + self.fan_conductance * duty / 100
+        )
+        self.temperature += (steady - self.temperature) * (
+            1 - math.exp(-elapsed / self.time_constant)
+        )
+        return self.temperature
+
+
+class SimulatedDevice:
+    """
+    Has the parts of a liquidctl driver the app uses
+    fans: number of fan channels ("fan1", "fan2", ...)
+    latency, jitter: seconds every call takes (latency +- jitter)
+    error_rate: probability of a call failing with an OSError
+    supports_profiles: False raises NotSupportedByDevice from
+    set_speed_profile() like devices which only take fixed duties
+    supports_fixed_speeds: the same for set_fixed_speed()
+    """
+
+    MAX_RPM = 2000
+    DEFAULT_DUTY = 50
+
+    def __init__(
+        self,
+        index: int,
+        fans: int = 3,
+        latency: float = 0,
+        jitter: float = 0,
+        error_rate: float = 0,
+        supports_profiles: bool = True,
+        supports_fixed_speeds: bool = True,
+        thermal_model: ThermalModel = None,
+        seed=None,
+    ):
+        self.description = f"Simulated Controller #{index}"
+        self.vendor_id = 0xFFFF
+        self.product_id = 0x0001 if supports_profiles else 0x0002
+        self.serial_number = f"SIM{index:08d}"
+        self.bus = "virtual"
+        self.address = f"sim:{index}"
+        self.fans = fans
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.supports_profiles = supports_profiles
+        self.supports_fixed_speeds = supports_fixed_speeds
+        self.thermal_model = thermal_model or ThermalModel()
+        self._random = random.Random(seed if seed is not None else index)
+        # channel: fixed duty (int) or profile ([(temp, duty), ...])
+        self._settings = {
+            f"fan{fan}": self.DEFAULT_DUTY for fan in range(1, fans + 1)
+        }
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()  # calls can come from any thread
+
+    def _call(self):
+        """Latency and error injection of every call"""
+        delay = self.latency + self._random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+        if self.error_rate and self._random.random() < self.error_rate:
+            raise OSError(f"{self.description}: simulated I/O error")
+
+    @staticmethod
+    def _profile_duty(profile, temp) -> float:
+        temps = [step_temp for step_temp, _ in profile]
+        index = bisect_right(temps, temp)
+        if index == 0:
+            return profile[0][1]
+        if index == len(profile):
+            return profile[-1][1]
+        (temp_low, duty_low), (temp_high, duty_high) = profile[index - 1:index + 1]
+        return duty_low + (duty_high - duty_low) * (
+            (temp - temp_low) / (temp_high - temp_low)
+        )
+
+    def _duties(self, temp) -> dict:
+        return {
+            channel: (
+                setting if isinstance(setting, int)
+                else self._profile_duty(setting, temp)
+            )
+            for channel, setting in self._settings.items()
+        }
+
+    def _channels(self, channel: str) -> list:
+        if channel == "fan":  # every fan, like liquidctl's drivers
+            return list(self._settings)
+        if channel not in self._settings:
+            raise ValueError(f"unknown channel: {channel}")
+        return [channel]
+
+    def connect(self, **kwargs):
+        self._call()
+        return self
+
+    def disconnect(self, **kwargs):
+        pass
+
+    def initialize(self, **kwargs):
+        self._call()
+        return [("Firmware version", "0.0.0-sim", "")]
+
+    def get_status(self, **kwargs):
+        self._call()
+        now = time.monotonic()
+        with self._lock:
+            model = self.thermal_model
+            duties = self._duties(model.temperature)
+            temp = model.advance(
+                now - self._updated, sum(duties.values()) / len(duties), now
+            )
+            self._updated = now
+        status = [("Liquid temperature", temp, "°C")]
+        for fan, duty in enumerate(duties.values(), start=1):
+            rpm = duty / 100 * self.MAX_RPM * self._random.uniform(0.98, 1.02)
+            status += [
+                (f"Fan {fan}", "PWM", ""),
+                (f"Fan {fan} duty", round(duty), "%"),
+                (f"Fan {fan} speed", int(rpm), "rpm"),
+            ]
+        return status
+
+    def set_fixed_speed(self, channel, duty, **kwargs):
+        if not self.supports_fixed_speeds:
+            # pylint: disable=import-outside-toplevel
+            from liquidctl.error import NotSupportedByDevice
+            raise NotSupportedByDevice()
+        self._call()
+        with self._lock:
+            for name in self._channels(channel):
+                self._settings[name] = int(max(0, min(100, duty)))
+
+    def set_speed_profile(self, channel, profile, **kwargs):
+        if not self.supports_profiles:
+            # pylint: disable=import-outside-toplevel
+            from liquidctl.error import NotSupportedByDevice
+            raise NotSupportedByDevice()
+        self._call()
+        profile = sorted((int(temp), int(duty)) for temp, duty in profile)
+        with self._lock:
+            for name in self._channels(channel):
+                self._settings[name] = profile
+
+
+def simulated_devices(count: int, supports_profiles=None, **kwargs):
+    """
+    Returns a find_devices function for LiquidctlApi, every second device
+    doesn't support speed profiles (so software curves are used too)
+    the same devices are found every time (hot-plug scans)
+    """
+    devices = [
+        SimulatedDevice(
+            index,
+            supports_profiles=(
+                index % 2 == 0 if supports_profiles is None
+                else supports_profiles
+            ),
+            **kwargs,
+        )
+        for index in range(count)
+    ]
+
+    def find_devices():
+        return list(devices)
+    return find_devices
@@ -0,0 +1,109 @@
+import threading
+import time
+
+
+class _Flight:
+    """A status read in progress, shared by everyone who asked for it"""
+
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class _Entry:
+    __slots__ = ("value", "read_at", "flight")
+
+    def __init__(self):
+        self.value = None  # last parsed status
+        self.read_at = float("-inf")
+        self.flight = None
+
+
+class StatusCache:
+    """
+    Parsed status of every device of a LiquidctlApi, kept for ttl seconds
+    get() returns a status younger than ttl (or max_age), reading the
+    device only if there is none, callers asking while a read is already
+    in progress wait for that read instead of starting their own
+    """
+
+    __slots__ = (
+        "liquidctl_api",
+        "ttl",
+        "reads",
+        "hits",
+        "coalesced",
+        "_entries",
+        "_lock",
+    )
+
+    def __init__(self, liquidctl_api, ttl: float = 0.5):
+        self.liquidctl_api = liquidctl_api
+        self.ttl = ttl
+        # device reads, requests answered from the cache, requests which
+        # waited for somebody else's read
+        self.reads = 0
+        self.hits = 0
+        self.coalesced = 0
+        self._entries = [_Entry() for _ in liquidctl_api.devices_list]
+        self._lock = threading.Lock()
+
+    def _fresh(self, entry, max_age, now) -> bool:
+        return entry.value is not None and now - entry.read_at <= max_age
+
+    def _read(self, dev_index, entry, flight):
+        """Reads the device and finishes the flight, called by its leader"""
+        device = self.liquidctl_api.devices_list[dev_index]
+        try:
+            with self.liquidctl_api.device_locks[dev_index]:
+                dev_status = device.get_status()
+            flight.value = self.liquidctl_api.to_dict(dev_status)
+        except Exception as error:  # pylint: disable=broad-except
+            # passed on to every waiter, the old status is kept
+            flight.error = error
+        with self._lock:
+            self.reads += 1
+            if flight.error is None:
+                entry.value = flight.value
+                entry.read_at = time.monotonic()
+            entry.flight = None
+        flight.done.set()
+
+    def _join(self, entry):
+        """Returns (flight, True if the caller has to do the read)"""
+        if entry.flight is not None:
+            self.coalesced += 1
+            return entry.flight, False
+        entry.flight = _Flight()
+        return entry.flight, True
+
+    def get(self, dev_index: int, max_age: float = None) -> dict:
+        """Parsed status at most max_age (default: ttl) seconds old"""
+        if max_age is None:
+            max_age = self.ttl
+        entry = self._entries[dev_index]
+        with self._lock:
+            if self._fresh(entry, max_age, time.monotonic()):
+                self.hits += 1
+                return entry.value
+            flight, leader = self._join(entry)
+        if leader:
+            self._read(dev_index, entry, flight)
+        else:
+            flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.value
+
+    def add_device(self):
+        """Entry of a device appended to devices_list (hot-plug)"""
+        with self._lock:
+            self._entries.append(_Entry())
+
+    def invalidate(self, dev_index: int):
+        """Next get() reads the device (e.g. after a write)"""
+        with self._lock:
+            self._entries[dev_index].read_at = float("-inf")
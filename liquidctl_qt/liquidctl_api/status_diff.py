@@ -0,0 +1,57 @@
+class StatusDiffer:
+    """
+    Compares parsed statuses (StatusParser) of devices with the last ones
+    that were passed on and returns only the values which changed
+    deadbands = {measurement: threshold}, e.g. {"RPM": 10, "V": 0.02},
+    numeric values closer than the threshold to the last passed on value
+    don't count as changed
+    """
+
+    __slots__ = ("deadbands", "_last")
+
+    def __init__(self, deadbands: dict = None):
+        self.deadbands = deadbands or {}
+        self._last = {}  # dev_index: {hw_name: {field: value}}
+
+    def _changed(self, last_value, value, measurement) -> bool:
+        if last_value == value:
+            return False
+        deadband = self.deadbands.get(measurement)
+        if (
+            deadband
+            and isinstance(value, (int, float))
+            and isinstance(last_value, (int, float))
+        ):
+            return abs(value - last_value) >= deadband
+        return True
+
+    def diff(self, dev_index: int, dev_hw_info: dict) -> dict:
+        """
+        Returns {hw_name: {field: {"value", "measurement"}}} with only the
+        changed fields of changed hardware (empty if nothing changed)
+        """
+        last_dev = self._last.setdefault(dev_index, {})
+        changed_dev = {}
+        for hw_name, hw_info in dev_hw_info.items():
+            last_hw = last_dev.get(hw_name)
+            if last_hw is None:
+                last_hw = last_dev[hw_name] = {}
+            changed_hw = None
+            for field, field_info in hw_info.items():
+                value = field_info["value"]
+                if field in last_hw and not self._changed(
+                    last_hw[field], value, field_info["measurement"]
+                ):
+                    continue
+                last_hw[field] = value
+                if changed_hw is None:
+                    changed_hw = changed_dev[hw_name] = {}
+                changed_hw[field] = field_info
+        return changed_dev
+
+    def reset(self, dev_index: int = None):
+        """Forgets the last values, so the next diff has everything"""
+        if dev_index is None:
+            self._last.clear()
+        else:
+            self._last.pop(dev_index, None)
@@ -0,0 +1,217 @@
+from concurrent.futures import ThreadPoolExecutor
+import heapq
+import threading
+import time
+
+
+class _Schedule:
+    """Polling schedule of a single device"""
+
+    __slots__ = ("dev_index", "interval", "deadline", "in_flight", "removed")
+
+    def __init__(self, dev_index: int, interval: float, deadline: float):
+        self.dev_index = dev_index
+        self.interval = interval
+        self.deadline = deadline
+        self.in_flight = False
+        self.removed = False
+
+
+class StatusEngine:
+    """
+    Single long-lived poller which owns every device of a LiquidctlApi
+    object, reads device status on a per device interval and keeps the
+    latest parsed snapshot of every device
+    callback(dev_index, parsed_info) is called from the engine thread
+    (or a worker thread) after every successful read
+    workers > 1 reads different devices concurrently, so a sweep over all
+    devices takes as long as the slowest device instead of the sum
+    worker threads are only started when reads overlap, so workers can be
+    MAX_WORKERS whatever the device count (hot-plugged devices included)
+    """
+
+    __slots__ = (
+        "liquidctl_api",
+        "callback",
+        "schedules",
+        "snapshots",
+        "_heap",
+        "_cond",
+        "_stop",
+        "_thread",
+        "_workers",
+        "_pool",
+        "_interval",
+    )
+
+    MAX_WORKERS = 16
+
+    def __init__(
+        self,
+        liquidctl_api,
+        interval: float = 1.0,
+        callback=None,
+        workers: int = 1,
+    ):
+        self.liquidctl_api = liquidctl_api
+        self.callback = callback
+        self._workers = workers
+        self._variables(interval)
+
+    def _variables(self, interval):
+        now = time.monotonic()
+        self._interval = interval  # of devices added later
+        self.schedules = [
+            _Schedule(dev_index, interval, now)
+            for dev_index, _ in enumerate(self.liquidctl_api.devices_list)
+        ]
+        self.snapshots = [None for _ in self.schedules]
+        self._heap = [
+            (schedule.deadline, schedule.dev_index)
+            for schedule in self.schedules
+        ]
+        heapq.heapify(self._heap)
+        self._cond = threading.Condition()
+        self._stop = False
+        self._thread = None
+        self._pool = None
+
+    def _next_due(self):
+        """
+        Waits until a device is due and returns its schedule,
+        returns None when the engine is stopped
+        """
+        with self._cond:
+            while not self._stop:
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                deadline, dev_index = self._heap[0]
+                schedule = self.schedules[dev_index]
+                if (
+                    deadline != schedule.deadline
+                    or schedule.in_flight
+                    or schedule.removed
+                ):
+                    # stale entry left behind by poll_now/set_interval
+                    # (or of an unplugged device)
+                    heapq.heappop(self._heap)
+                    continue
+                timeout = deadline - time.monotonic()
+                if timeout > 0:
+                    self._cond.wait(timeout)
+                    continue
+                heapq.heappop(self._heap)
+                schedule.in_flight = True
+                return schedule
+        return None
+
+    def _reschedule(self, schedule):
+        """Puts the device back in the queue after its read finished"""
+        now = time.monotonic()
+        with self._cond:
+            schedule.in_flight = False
+            # keep a steady rate, but don't try to catch up missed reads
+            schedule.deadline = max(schedule.deadline + schedule.interval, now)
+            heapq.heappush(self._heap, (schedule.deadline, schedule.dev_index))
+            self._cond.notify()
+
+    def _read(self, schedule):
+        dev_index = schedule.dev_index
+        if not self.liquidctl_api.ready[dev_index]:
+            # still being initialized, poll_now() it when it is ready
+            self._reschedule(schedule)
+            return
+        try:
+            # shared with other readers of the device (StatusCache)
+            parsed_info = self.liquidctl_api.get_status(dev_index)
+        except (OSError, ValueError, RuntimeError):
+            # device is busy or was unplugged, try again on the next tick
+            return
+        finally:
+            self._reschedule(schedule)
+        if parsed_info and not schedule.removed:
+            self.snapshots[dev_index] = parsed_info
+            if self.callback:
+                self.callback(dev_index, parsed_info)
+
+    def _run(self):
+        while True:
+            schedule = self._next_due()
+            if schedule is None:
+                return
+            if self._pool is None:
+                self._read(schedule)
+            else:
+                # in_flight is already set, so a slow device is never
+                # handed to a second worker while the first one is reading
+                self._pool.submit(self._read, schedule)
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._cond:
+            self._stop = False
+        if self._workers > 1:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self._workers,
+                thread_name_prefix="StatusEngineWorker",
+            )
+        self._thread = threading.Thread(
+            target=self._run, name="StatusEngine", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = None):
+        with self._cond:
+            self._stop = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        if self._pool is not None:
+            # reads already in progress can't be interrupted
+            self._pool.shutdown(wait=False)
+            self._pool = None
+
+    def _set_deadline(self, schedule, deadline):
+        """Caller must hold self._cond"""
+        schedule.deadline = deadline
+        if not schedule.in_flight:
+            heapq.heappush(self._heap, (deadline, schedule.dev_index))
+        self._cond.notify()
+
+    def poll_now(self, dev_index: int):
+        """Reads the device as soon as possible (e.g. when it is selected)"""
+        with self._cond:
+            self._set_deadline(self.schedules[dev_index], time.monotonic())
+
+    def set_interval(self, dev_index: int, interval: float):
+        with self._cond:
+            schedule = self.schedules[dev_index]
+            schedule.interval = interval
+            self._set_deadline(
+                schedule,
+                min(schedule.deadline, time.monotonic() + interval)
+            )
+
+    def add_device(self, dev_index: int, interval: float = None):
+        """Starts polling a device appended to devices_list (hot-plug)"""
+        with self._cond:
+            if interval is None:
+                interval = self._interval
+            schedule = _Schedule(dev_index, interval, time.monotonic())
+            self.schedules.append(schedule)
+            self.snapshots.append(None)
+            heapq.heappush(self._heap, (schedule.deadline, dev_index))
+            self._cond.notify()
+
+    def remove_device(self, dev_index: int):
+        """Stops polling an unplugged device"""
+        with self._cond:
+            self.schedules[dev_index].removed = True
+            self.snapshots[dev_index] = None
+
+    def latest(self, dev_index: int):
+        """Returns the latest parsed status of a device or None"""
+        return self.snapshots[dev_index]
@@ -0,0 +1,114 @@
+import re
+
+# value of a channel (e.g. "Fan 3") with nothing connected to it
+DISCONNECTED = "—"
+
+# "Fan 1" / "Pump" lines hold the mode of the channel, "Fan 1 speed" /
+# "Pump duty" lines a value of the channel
+_FAN_PUMP = re.compile(r"^((?:Fan|Pump)(?: \d+)?)(?: (.+))?$")
+# "Liquid temperature", "Temperature 1", "Water temperature"
+_TEMPERATURE = re.compile(r"^(.*temperature(?: \d+)?)$", re.IGNORECASE)
+# "LED accessories", "LED 1 count"
+_LED = re.compile(r"^(LED(?: \d+)?)(?: (.+))?$")
+
+
+class _Channel:
+    """Where the values of a single channel are in a status list"""
+
+    __slots__ = ("name", "mode_slot", "fields")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.mode_slot = None
+        self.fields = []  # [(slot, field name, measurement), ...]
+
+
+class StatusParser:
+    """
+    Converts device.get_status() lists into dicts
+    {
+        "Fan 1": {
+            "Mode": {"value": "PWM", "measurement": ""},
+            "Speed": {"value": 686, "measurement": "RPM"},
+            ...
+        },
+        "Liquid temperature": {
+            "Temperature": {"value": 30.1, "measurement": "°C"},
+        },
+        ...
+    }
+    The layout of a status list is learned once per set of status keys
+    (so once per device model), after that a status list is only
+    indexed, without any string processing
+    """
+
+    __slots__ = ("_layouts",)
+
+    def __init__(self):
+        self._layouts = {}  # status keys: tuple of _Channel objects
+
+    @staticmethod
+    def _classify(key: str, value, measurement: str):
+        """
+        Returns (channel name, field name) of a status line
+        field name is None for a mode line and the whole line is None
+        if it doesn't belong to a supported channel (firmware, noise...)
+        """
+        match = _FAN_PUMP.match(key)
+        if match:
+            channel, field = match.groups()
+            if field is None:
+                if isinstance(value, str) and not measurement:
+                    return channel, None
+                # e.g. ("Fan", 1200, "rpm") on single fan coolers
+                return channel, "Speed" if measurement == "rpm" else "Value"
+            return channel, field.capitalize()
+        match = _TEMPERATURE.match(key)
+        if match:
+            return match.group(1), "Temperature"
+        match = _LED.match(key)
+        if match:
+            channel, field = match.groups()
+            return channel, (field or "Value").capitalize()
+        return None
+
+    def _compile(self, keys: tuple, dev_status) -> tuple:
+        channels = {}
+        for slot, line in enumerate(dev_status):
+            key, value, measurement = line[0:3]
+            classified = self._classify(key, value, measurement)
+            if classified is None:
+                continue
+            name, field = classified
+            channel = channels.get(name)
+            if channel is None:
+                channel = channels[name] = _Channel(name)
+            if field is None:
+                channel.mode_slot = slot
+            else:
+                channel.fields.append((slot, field, measurement.upper()))
+        layout = tuple(channels.values())
+        self._layouts[keys] = layout
+        return layout
+
+    def parse(self, dev_status) -> dict:
+        keys = tuple([line[0] for line in dev_status])
+        layout = self._layouts.get(keys)
+        if layout is None:
+            layout = self._compile(keys, dev_status)
+
+        dev_hw_info = {}
+        for channel in layout:
+            hw_info = {}
+            if channel.mode_slot is not None:
+                mode = dev_status[channel.mode_slot][1]
+                if mode == DISCONNECTED:
+                    continue
+                hw_info["Mode"] = {"value": mode, "measurement": ""}
+            for slot, field, measurement in channel.fields:
+                value = dev_status[slot][1]
+                if value.__class__ is float:
+                    value = round(value, 2)
+                hw_info[field] = {"value": value, "measurement": measurement}
+            dev_hw_info[channel.name] = hw_info
+        return dev_hw_info
@@ -0,0 +1,157 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
+
+from liquidctl_api.curve_engine import channel_name
+
+FIXED_SPEED = "set_fixed_speed"
+SPEED_PROFILE = "set_speed_profile"
+
+
+class _Command:
+    __slots__ = ("method", "value", "done")
+
+    def __init__(self, method: str, value, done=None):
+        self.method = method
+        self.value = value
+        # done(error) of this command, not called if it's replaced
+        self.done = done
+
+    @property
+    def state(self):
+        return self.method, self.value
+
+
+class _DeviceQueue:
+    __slots__ = ("pending", "in_flight", "written", "scheduled")
+
+    def __init__(self):
+        self.pending = {}  # channel: _Command, in submission order
+        self.in_flight = {}  # channel: state being written
+        self.written = {}  # channel: last state written successfully
+        self.scheduled = False
+
+    def last_state(self, channel):
+        """State the channel has once the write in flight (if any) is done"""
+        if channel in self.in_flight:
+            return self.in_flight[channel]
+        return self.written.get(channel)
+
+
+class WriteQueue:
+    """
+    Writes speeds to devices in the background, one worker per device
+    at a time (in submission order of the channels)
+    a write to a channel which already has one waiting replaces it (last
+    write wins), a write of the state a channel already has (or is
+    being written) is skipped
+    callback(dev_index, channel, error) is called from a worker thread
+    after every write, error is None if it succeeded (or was skipped)
+    the pool has a fixed size, its threads are started as writes of
+    different devices overlap (devices added later get workers too)
+    """
+
+    __slots__ = (
+        "liquidctl_api",
+        "callback",
+        "writes",
+        "coalesced",
+        "skipped",
+        "_queues",
+        "_lock",
+        "_pool",
+    )
+
+    MAX_WORKERS = 16
+
+    def __init__(self, liquidctl_api, callback=None):
+        self.liquidctl_api = liquidctl_api
+        self.callback = callback
+        self.writes = 0
+        self.coalesced = 0
+        self.skipped = 0
+        self._queues = [_DeviceQueue() for _ in liquidctl_api.devices_list]
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.MAX_WORKERS,
+            thread_name_prefix="DeviceWrite",
+        )
+
+    def set_fixed_speed(self, dev_index: int, hw_name: str, duty, done=None):
+        self.submit(dev_index, hw_name, _Command(FIXED_SPEED, int(duty), done))
+
+    def set_speed_profile(self, dev_index: int, hw_name: str, profile, done=None):
+        """profile is [(temperature, duty), ...]"""
+        profile = tuple((int(temp), int(duty)) for temp, duty in profile)
+        self.submit(dev_index, hw_name, _Command(SPEED_PROFILE, profile, done))
+
+    def submit(self, dev_index: int, hw_name: str, command):
+        channel = channel_name(hw_name)
+        device_queue = self._queues[dev_index]
+        with self._lock:
+            if device_queue.pending.pop(channel, None) is not None:
+                # the waiting write is outdated, it's never sent
+                self.coalesced += 1
+            skip = device_queue.last_state(channel) == command.state
+            if skip:
+                self.skipped += 1
+            else:
+                device_queue.pending[channel] = command
+                if not device_queue.scheduled:
+                    device_queue.scheduled = True
+                    self._pool.submit(self._run, dev_index)
+        if skip:
+            self._done(dev_index, channel, command, None)
+
+    def add_device(self):
+        """Queue of a device appended to devices_list (hot-plug)"""
+        with self._lock:
+            self._queues.append(_DeviceQueue())
+
+    def forget(self, dev_index: int):
+        """
+        The state of the device is unknown again (reinitialized or
+        changed by someone else), nothing is skipped until it's written
+        """
+        with self._lock:
+            self._queues[dev_index].written.clear()
+
+    def _done(self, dev_index, channel, command, error):
+        try:
+            if command.done:
+                command.done(error)
+            if self.callback:
+                self.callback(dev_index, channel, error)
+        except Exception:  # pylint: disable=broad-except
+            # e.g. its dialog was closed, the queue has to keep going
+            pass
+
+    def _run(self, dev_index):
+        device_queue = self._queues[dev_index]
+        device = self.liquidctl_api.devices_list[dev_index]
+        while True:
+            with self._lock:
+                if not device_queue.pending:
+                    device_queue.scheduled = False
+                    return
+                channel = next(iter(device_queue.pending))
+                command = device_queue.pending.pop(channel)
+                device_queue.in_flight[channel] = command.state
+            error = None
+            try:
+                with self.liquidctl_api.device_locks[dev_index]:
+                    getattr(device, command.method)(
+                        channel,
+                        command.value if command.method == FIXED_SPEED
+                        else list(command.value),
+                    )
+            except Exception as write_error:  # pylint: disable=broad-except
+                error = write_error
+            with self._lock:
+                self.writes += 1
+                del device_queue.in_flight[channel]
+                if error is None:
+                    device_queue.written[channel] = command.state
+                else:
+                    device_queue.written.pop(channel, None)
+            self.liquidctl_api.status_cache.invalidate(dev_index)
+            self._done(dev_index, channel, command, error)
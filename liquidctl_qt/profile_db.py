@@ -0,0 +1,195 @@
+"""
+Duty profiles in one SQLite file (liquidctl_qt --profile-db FILE) instead
+of one JSON file per profile, for configs with thousands of profiles
+the profiles are the same dicts DutyProfiles.save_profile() takes, name
+and device identity (vendor_id/product_id) are indexed columns, the
+steps are packed (profile_format.pack_steps()) into their own column
+"""
+from collections import OrderedDict
+import json
+import sqlite3
+import threading
+
+import profile_format
+import utils
+
+_NOT_COMPILED = object()  # None is a valid curve (static duty profiles)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    name TEXT PRIMARY KEY,
+    vendor_id INTEGER,
+    product_id INTEGER,
+    serial_number TEXT,
+    settings TEXT NOT NULL,  -- the profile dict as JSON, without steps
+    steps BLOB  -- profile_format.pack_steps(), NULL for static duty
+);
+CREATE INDEX IF NOT EXISTS profiles_device
+    ON profiles (vendor_id, product_id);
+"""
+
+
+def _row(profile_settings: dict) -> tuple:
+    profile_settings = dict(profile_format.upgrade(profile_settings))
+    device_info = profile_settings.get("device_info") or {}
+    steps = profile_settings.pop("steps", None)
+    return (
+        profile_settings["name"],
+        device_info.get("vendor_id"),
+        device_info.get("product_id"),
+        device_info.get("serial_number"),
+        json.dumps(profile_settings),
+        None if steps is None else profile_format.pack_steps(steps),
+    )
+
+
+def _profile(settings: str, steps: bytes) -> dict:
+    profile_settings = json.loads(settings)
+    if steps is not None:
+        profile_settings["steps"] = profile_format.unpack_steps(steps)
+    # rows written before the steps column have a "data_frame"
+    return profile_format.upgrade(profile_settings)
+
+
+class DutyProfileDatabase(utils.DutyProfiles):
+    """
+    DutyProfiles stored in SQLite, every write is a transaction (a crash
+    leaves the previous state), bulk imports are a single one
+    parsed profiles and their curves are cached like ProfileIndex does,
+    until they are saved/removed through this object
+    """
+    __slots__ = ("db_path", "_connection", "_cache", "_lock")
+
+    CACHE_SIZE = 128
+
+    def __init__(self, db_path: str):
+        # pylint: disable=super-init-not-called
+        self.ROOT_PATH = None  # pylint: disable=invalid-name
+        self.profiles = {}
+        self.index = None  # nothing to watch
+        self.db_path = db_path
+        # the daemon applies profiles from several threads
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        self._connection.executescript(SCHEMA)
+        self._upgrade_schema()
+        self._cache = OrderedDict()  # name: [settings, curve or _NOT_COMPILED]
+        self._lock = threading.RLock()
+
+    def _upgrade_schema(self):
+        """Databases made before the steps column get it"""
+        columns = {
+            row[1] for row in
+            self._connection.execute("PRAGMA table_info(profiles)")
+        }
+        if "steps" not in columns:
+            with self._connection:
+                self._connection.execute(
+                    "ALTER TABLE profiles ADD COLUMN steps BLOB"
+                )
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def get_profiles(self):
+        with self._lock:
+            return [
+                name for name, in self._connection.execute(
+                    "SELECT name FROM profiles ORDER BY name"
+                )
+            ]
+
+    def profile_exists(self, profile_name: str) -> bool:
+        with self._lock:
+            return self._connection.execute(
+                "SELECT 1 FROM profiles WHERE name = ?", (profile_name,)
+            ).fetchone() is not None
+
+    def find(self, vendor_id, product_id) -> list:
+        """Names of the profiles saved for a device model"""
+        with self._lock:
+            return [
+                name for name, in self._connection.execute(
+                    "SELECT name FROM profiles"
+                    " WHERE vendor_id = ? AND product_id = ? ORDER BY name",
+                    (vendor_id, product_id),
+                )
+            ]
+
+    def _entry(self, profile_name) -> list:
+        with self._lock:
+            entry = self._cache.get(profile_name)
+            if entry is not None:
+                self._cache.move_to_end(profile_name)
+                return entry
+            row = self._connection.execute(
+                "SELECT settings, steps FROM profiles WHERE name = ?",
+                (profile_name,),
+            ).fetchone()
+            if row is None:
+                # what opening a missing profile file raised
+                raise FileNotFoundError(f"no profile named {profile_name!r}")
+            entry = [_profile(*row), _NOT_COMPILED]
+            self._cache[profile_name] = entry
+            while len(self._cache) > self.CACHE_SIZE:
+                self._cache.popitem(last=False)
+            return entry
+
+    def load_profile(self, profile_name: str):
+        """Cached, shared by every caller (don't modify it)"""
+        return self._entry(profile_name)[0]
+
+    def load_curve(self, profile_name: str):
+        entry = self._entry(profile_name)
+        if entry[1] is _NOT_COMPILED:
+            entry[1] = self._compile(entry[0])
+        return entry[1]
+
+    def save_profile(self, profile_settings: dict):
+        self.import_profiles((profile_settings,))
+
+    def remove_profile(self, profile_name: str):
+        with self._lock, self._connection:
+            self._connection.execute(
+                "DELETE FROM profiles WHERE name = ?", (profile_name,)
+            )
+            self._cache.pop(profile_name, None)
+
+    def import_profiles(self, profiles) -> int:
+        """
+        Saves (overwrites) profile dicts in one transaction, either all
+        of them are saved or none, returns how many
+        """
+        rows = [_row(profile_settings) for profile_settings in profiles]
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO profiles"
+                " (name, vendor_id, product_id, serial_number, settings, steps)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            for row in rows:
+                self._cache.pop(row[0], None)
+        return len(rows)
+
+    def export_profiles(self, names=None) -> list:
+        """Profile dicts (every one or the named ones) from one snapshot"""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT name, settings, steps FROM profiles ORDER BY name"
+            ).fetchall()
+        names = None if names is None else set(names)
+        return [
+            _profile(settings, steps) for name, settings, steps in rows
+            if names is None or name in names
+        ]
+
+
+def migrate(duty_profiles, database) -> int:
+    """
+    Copies every profile of a DutyProfiles directory into a database
+    (one transaction), the JSON files are left alone, returns how many
+    """
+    return database.import_profiles(
+        duty_profiles.load_profile(name) for name in duty_profiles.get_profiles()
+    )
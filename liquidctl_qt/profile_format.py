@@ -0,0 +1,68 @@
+"""
+Versions of the duty profile format
+    1 (no "version"): steps in "data_frame", a pandas CSV with ";" as
+      line separator, e.g. "Temperature,Duty;20,30;40,60;"
+    2: steps in "steps" as a JSON array, [[temperature, duty], ...]
+profiles are upgraded to the current version when they are loaded (the
+files only when they are saved again), nothing needs pandas
+"""
+from array import array
+
+VERSION = 2
+PACKED_VERSION = 1  # first byte of pack_steps()
+
+
+def steps_from_csv(data_frame_str: str) -> list:
+    """Steps of a version 1 "data_frame" string"""
+    lines = [line for line in data_frame_str.split(";") if line.strip()]
+    if not lines:
+        return []
+    header = [column.strip() for column in lines[0].split(",")]
+    try:
+        temp_column = header.index("Temperature")
+        duty_column = header.index("Duty")
+    except ValueError as error:
+        raise ValueError(f"not a profile data frame: {lines[0]!r}") from error
+    steps = []
+    for line in lines[1:]:
+        values = line.split(",")
+        # pandas wrote whole numbers as floats sometimes ("20.0")
+        steps.append(
+            (int(float(values[temp_column])), int(float(values[duty_column])))
+        )
+    return steps
+
+
+def upgrade(profile_settings: dict) -> dict:
+    """The profile in the current version (a new dict if it was older)"""
+    if profile_settings.get("version") == VERSION:
+        return profile_settings
+    profile_settings = dict(profile_settings)
+    data_frame = profile_settings.pop("data_frame", None)
+    steps = profile_settings.get("steps")  # a new, unversioned profile
+    if profile_settings.get("static_duty") is not None:
+        steps = None
+    elif data_frame is not None:
+        steps = steps_from_csv(data_frame)
+    profile_settings["steps"] = (
+        None if steps is None else [[temp, duty] for temp, duty in steps]
+    )
+    profile_settings["version"] = VERSION
+    return profile_settings
+
+
+def pack_steps(steps) -> bytes:
+    """
+    Steps in 1 + 2 * len(steps) bytes (DutyProfileDatabase), temperatures
+    and duties are 0 - 100 like TempDutyModel keeps them
+    """
+    packed = array("B", (PACKED_VERSION,))
+    for temp, duty in steps:
+        packed.extend((temp, duty))
+    return packed.tobytes()
+
+
+def unpack_steps(packed: bytes) -> list:
+    if packed[0] != PACKED_VERSION:
+        raise ValueError(f"unknown packed steps version: {packed[0]}")
+    return [[packed[i], packed[i + 1]] for i in range(1, len(packed), 2)]
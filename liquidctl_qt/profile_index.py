@@ -0,0 +1,137 @@
+from collections import OrderedDict
+import os
+import threading
+
+_NOT_COMPILED = object()  # None is a valid compiled profile (static duty)
+
+
+class ProfileIndex:
+    """
+    Names of the profiles in a directory, indexed once (and again only by
+    refresh()) instead of globbing it whenever they are listed
+    loaded profiles are kept in an LRU cache, parsed (load(name) is
+    parse(file content)) and compiled (compile(settings), curve()), an
+    entry is used as long as its file has the same (mtime, size), a
+    load() costs a stat() so files rewritten in place are noticed too
+    refresh() is meant to be called whenever the directory changes
+    (ProfileWatcher), it evicts only the entries of changed files
+    """
+
+    __slots__ = (
+        "root_path", "suffix", "parse", "compile", "capacity",
+        "_stats", "_names", "_cache", "_lock",
+    )
+
+    def __init__(self, root_path, suffix, parse, compile_, capacity=128):
+        self.root_path = root_path
+        self.suffix = suffix
+        self.parse = parse  # file content -> settings
+        self.compile = compile_  # settings -> compiled profile
+        self.capacity = capacity
+        self._stats = None  # name: (mtime_ns, size), None until indexed
+        self._names = None  # sorted names, None when they changed
+        # name: [(mtime_ns, size), settings, compiled (or _NOT_COMPILED)]
+        self._cache = OrderedDict()
+        self._lock = threading.RLock()  # the daemon loads from many threads
+
+    def _file_path(self, name):
+        return os.path.join(self.root_path, name + self.suffix)
+
+    @staticmethod
+    def _stat_key(file_stat):
+        return file_stat.st_mtime_ns, file_stat.st_size
+
+    def _scan(self) -> dict:
+        stats = {}
+        with os.scandir(self.root_path) as entries:
+            for entry in entries:
+                if entry.name.endswith(self.suffix) and entry.is_file():
+                    stats[entry.name[:-len(self.suffix)]] = self._stat_key(
+                        entry.stat()
+                    )
+        return stats
+
+    def _index(self) -> dict:
+        if self._stats is None:
+            self._stats = self._scan()
+        return self._stats
+
+    def refresh(self) -> set:
+        """
+        Indexes the directory again, drops only the cached profiles whose
+        files changed or are gone, returns the names which changed
+        """
+        with self._lock:
+            old_stats = self._stats or {}
+            self._stats = self._scan()
+            changed = {
+                name for name in old_stats.keys() | self._stats.keys()
+                if old_stats.get(name) != self._stats.get(name)
+            }
+            if changed:
+                self._names = None
+                for name in changed:
+                    self._cache.pop(name, None)
+            return changed
+
+    def names(self) -> list:
+        with self._lock:
+            if self._names is None:
+                self._names = sorted(self._index())
+            return list(self._names)
+
+    def __contains__(self, name):
+        with self._lock:
+            return name in self._index()
+
+    def _current_key(self, name):
+        # raises FileNotFoundError like open() did
+        key = self._stat_key(os.stat(self._file_path(name)))
+        if self._stats is not None and self._stats.get(name) != key:
+            self._stats[name] = key
+            self._names = None
+        return key
+
+    def _entry(self, name) -> list:
+        with self._lock:
+            key = self._current_key(name)
+            entry = self._cache.get(name)
+            if entry is not None and entry[0] == key:
+                self._cache.move_to_end(name)
+                return entry
+        with open(self._file_path(name), "r", encoding="utf-8") as profile_file:
+            settings = self.parse(profile_file.read())
+        entry = [key, settings, _NOT_COMPILED]
+        with self._lock:
+            self._cache[name] = entry
+            self._cache.move_to_end(name)
+            while len(self._cache) > self.capacity:
+                self._cache.popitem(last=False)
+        return entry
+
+    def load(self, name):
+        """The parsed profile, shared by every caller (don't modify it)"""
+        return self._entry(name)[1]
+
+    def curve(self, name):
+        """The compiled profile, compiled once per version of the file"""
+        entry = self._entry(name)
+        if entry[2] is _NOT_COMPILED:
+            entry[2] = self.compile(entry[1])
+        return entry[2]
+
+    def saved(self, name):
+        """Called after a profile was written (by this process)"""
+        with self._lock:
+            self._cache.pop(name, None)
+            if self._stats is not None:
+                self._stats[name] = self._stat_key(
+                    os.stat(self._file_path(name))
+                )
+                self._names = None
+
+    def removed(self, name):
+        with self._lock:
+            self._cache.pop(name, None)
+            if self._stats is not None and self._stats.pop(name, None):
+                self._names = None
@@ -0,0 +1,69 @@
+import builtins
+import sys
+import threading
+import time
+
+
+class StartupProfiler:
+    """
+    Measures how long startup takes, like python -X importtime it times
+    every first import of a module (cumulative and self time) and
+    records marks of startup phases (window built, first paint...)
+    """
+
+    __slots__ = ("start_time", "imports", "marks", "_stack", "_original_import")
+
+    def __init__(self):
+        self.start_time = time.perf_counter()
+        self.imports = {}  # module name: (cumulative, self) seconds
+        self.marks = []  # [(phase, seconds since start), ...]
+        self._stack = []  # time spent in nested imports
+        self._original_import = None
+
+    def install(self):
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._import
+
+    def uninstall(self):
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    # same signature as builtins.__import__
+    # pylint: disable=redefined-builtin
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if (
+            level
+            or name in sys.modules
+            or threading.current_thread() is not threading.main_thread()
+        ):
+            return self._original_import(name, globals, locals, fromlist, level)
+        start = time.perf_counter()
+        self._stack.append(0.0)
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - start
+            nested = self._stack.pop()
+            if self._stack:
+                self._stack[-1] += elapsed
+            self.imports[name] = (elapsed, elapsed - nested)
+
+    def mark(self, phase: str):
+        self.marks.append((phase, time.perf_counter() - self.start_time))
+
+    def report(self, limit: int = 20, file=None):
+        file = file or sys.stderr
+        print("Startup profile", file=file)
+        for phase, seconds in self.marks:
+            print(f"{seconds * 1000:10.1f} ms  {phase}", file=file)
+        print(f"\nSlowest imports (of {len(self.imports)})", file=file)
+        print(f"{'cumulative':>13} {'self':>10}  module", file=file)
+        slowest = sorted(
+            self.imports.items(), key=lambda item: item[1][0], reverse=True
+        )
+        for name, (cumulative, own) in slowest[:limit]:
+            print(
+                f"{cumulative * 1000:10.1f} ms {own * 1000:7.1f} ms  {name}",
+                file=file,
+            )
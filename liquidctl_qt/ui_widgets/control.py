@@ -1,23 +1,23 @@
 from PyQt5 import QtCore, QtWidgets
-from ui_widgets import main_widgets, profile_editor
+from ui_widgets import main_widgets
 
 
-class FanWidget(main_widgets.HardwareWidget):
-    """Fan widget which Displays basic info"""
+class SensorWidget(main_widgets.HardwareWidget):
+    """Widget which only displays info (temperatures, leds...)"""
 
     def __init__(
         self,
-        fan_name: str,
-        fan_info: list,
-        to_connect,
+        hw_name: str,
+        hw_info: dict,
         update_signal,
+        to_connect=None,
     ):
         super().__init__(
-            hw_name=fan_name,
-            hw_info=fan_info,
+            hw_name=hw_name,
+            hw_info=hw_info,
             settings_btn_to_cnct=to_connect,
         )
-        self.name = fan_name
+        self.name = hw_name
         update_signal.connect(self.on_update)
 
     @QtCore.pyqtSlot(dict)
@@ -27,6 +27,24 @@ class FanWidget(main_widgets.HardwareWidget):
             self.update_info(hw_info)
 
 
+class FanWidget(SensorWidget):
+    """Fan widget which Displays basic info"""
+
+    def __init__(
+        self,
+        fan_name: str,
+        fan_info: list,
+        to_connect,
+        update_signal,
+    ):
+        super().__init__(
+            hw_name=fan_name,
+            hw_info=fan_info,
+            update_signal=update_signal,
+            to_connect=to_connect,
+        )
+
+
 class ProfileEditorDialog(QtWidgets.QDialog):
     def __init__(self, name: str, curr_dev_dict: dict, main_window):
         super().__init__(parent=main_window)
@@ -36,6 +54,8 @@ class ProfileEditorDialog(QtWidgets.QDialog):
         self._connect()
 
     def _layout(self, name, curr_dev_dict):
+        # the editor (and what it imports) is loaded on first use
+        from ui_widgets import profile_editor  # pylint: disable=import-outside-toplevel
         layout = QtWidgets.QVBoxLayout()
         self._profile_editor = profile_editor.ProfileEditor(
             self, name, curr_dev_dict)
@@ -0,0 +1,95 @@
+from PyQt5 import QtCore, QtWidgets
+from ui_widgets import main_widgets
+
+
+class DebugPanel(main_widgets.Dialog):
+    """
+    Percentiles of the instrumentation (liquidctl_qt --instrument) per
+    metric and device, refreshed every second while it's shown
+    """
+
+    COLUMNS = ("Metric", "Device", "Count", "p50 ms", "p95 ms", "p99 ms", "Max ms")
+    REFRESH_INTERVAL = 1000  # ms
+
+    def __init__(self, instrumentation, devices_list, parent=None):
+        super().__init__("Instrumentation", parent)
+        self.instrumentation = instrumentation
+        self.devices_list = devices_list
+        self.table = QtWidgets.QTableWidget(0, len(self.COLUMNS))
+        self.timer = QtCore.QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+        self._init_()
+
+    def _init_(self):
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.table.verticalHeader().hide()
+        self.table.horizontalHeader().setSectionResizeMode(
+            QtWidgets.QHeaderView.ResizeToContents
+        )
+        vbox = main_widgets.VBox()
+        vbox.addWidgets((self.table, self._buttons_box()))
+        self.setLayout(vbox)
+        self.resize(720, 400)
+
+    def _buttons_box(self):
+        hbox = main_widgets.HBox()
+        hbox.addWidgets(
+            (
+                main_widgets.Button("Reset", to_connect=self.on_reset),
+                main_widgets.Button("Export...", to_connect=self.on_export),
+                main_widgets.Button("Close", to_connect=self.close),
+            )
+        )
+        buttons_box = QtWidgets.QWidget()
+        buttons_box.setLayout(hbox)
+        return buttons_box
+
+    def _device_name(self, dev_index):
+        if dev_index is None or dev_index >= len(self.devices_list):
+            return "-"
+        return f"{dev_index}: {self.devices_list[dev_index].description}"
+
+    @QtCore.pyqtSlot()
+    def refresh(self):
+        rows = [
+            (metric, dev_index, summary)
+            for metric, devices in self.instrumentation.summary().items()
+            for dev_index, summary in devices.items()
+            if summary["count"]
+        ]
+        self.table.setRowCount(len(rows))
+        for row, (metric, dev_index, summary) in enumerate(rows):
+            values = (
+                metric,
+                self._device_name(dev_index),
+                str(summary["count"]),
+                *(
+                    f"{summary[key]:.3f}"
+                    for key in ("p50_ms", "p95_ms", "p99_ms", "max_ms")
+                ),
+            )
+            for column, value in enumerate(values):
+                self.table.setItem(row, column, QtWidgets.QTableWidgetItem(value))
+
+    @QtCore.pyqtSlot()
+    def on_reset(self):
+        self.instrumentation.reset()
+        self.refresh()
+
+    @QtCore.pyqtSlot()
+    def on_export(self):
+        file_path, _ = QtWidgets.QFileDialog.getSaveFileName(
+            self, "Export instrumentation", "instrumentation.json", "JSON (*.json)"
+        )
+        if file_path:
+            self.instrumentation.export(file_path)
+
+    def showEvent(self, show_event):  # pylint: disable=invalid-name
+        self.refresh()
+        self.timer.start(self.REFRESH_INTERVAL)
+        super().showEvent(show_event)
+
+    def hideEvent(self, hide_event):  # pylint: disable=invalid-name
+        self.timer.stop()
+        super().hideEvent(hide_event)
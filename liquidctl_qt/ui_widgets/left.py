@@ -4,18 +4,75 @@ import utils
 
 
 class DeviceSelector(main_widgets.ComboBox):
-    """Allows selecting supported devices by Liquidctl"""
+    """
+    Allows selecting supported devices by Liquidctl
+    devices are disabled until they are initialized
+    items keep their dev_index (items of unplugged devices are removed),
+    to_connect is called with it
+    """
 
     def __init__(
         self,
         to_connect,
         items: tuple,
+        main_handler,
+        devices_list: list = (),
     ):
-        super().__init__(
-            items=items,
-            to_connect=to_connect,
+        super().__init__(items=items)
+        self.devices_list = devices_list  # descriptions of added devices
+        self.to_connect = to_connect
+        for dev_index, _ in enumerate(items):
+            self.setItemData(dev_index, dev_index)
+            self._disable_item(dev_index)
+        self.activated.connect(self.on_activated)
+        main_handler.device_ready_signal.connect(self.set_ready)
+        main_handler.device_init_failed_signal.connect(self.set_failed)
+        main_handler.device_added_signal.connect(self.add_device)
+        main_handler.device_removed_signal.connect(self.remove_device)
+
+    def _disable_item(self, row):
+        self.model().item(row).setEnabled(False)
+        self.setItemData(row, "Initializing...", QtCore.Qt.ToolTipRole)
+
+    @QtCore.pyqtSlot(int)
+    def on_activated(self, row):
+        self.to_connect(self.itemData(row))
+
+    @QtCore.pyqtSlot(int)
+    def set_ready(self, dev_index):
+        row = self.findData(dev_index)
+        if row == -1:  # unplugged meanwhile
+            return
+        self.model().item(row).setEnabled(True)
+        self.setItemData(row, None, QtCore.Qt.ToolTipRole)
+
+    @QtCore.pyqtSlot(int, str)
+    def set_failed(self, dev_index, error):
+        row = self.findData(dev_index)
+        if row == -1:
+            return
+        self.setItemData(
+            row,
+            f"Initialization failed: {error}",
+            QtCore.Qt.ToolTipRole,
         )
 
+    @QtCore.pyqtSlot(int)
+    def add_device(self, dev_index):
+        self.addItem(self.devices_list[dev_index].description, dev_index)
+        self._disable_item(self.count() - 1)
+
+    @QtCore.pyqtSlot(int)
+    def remove_device(self, dev_index):
+        row = self.findData(dev_index)
+        if row == -1:
+            return
+        was_current = row == self.currentIndex()
+        self.removeItem(row)
+        if was_current and self.count():
+            # another device is shown now, its page has to follow
+            self.to_connect(self.itemData(self.currentIndex()))
+
 
 class DeviceInfo(QtWidgets.QGridLayout):
     """Basic info about the currently selected device"""
@@ -85,7 +142,9 @@ class MainLeft(QtWidgets.QWidget):
             "device_selector",
             DeviceSelector(
                 self.info.main_handler.on_device_changed,
-                items=[device.description for device in self.info.DEVICES_LIST]
+                items=[device.description for device in self.info.DEVICES_LIST],
+                main_handler=self.info.main_handler,
+                devices_list=self.info.DEVICES_LIST,
             )
         )
         vbox.addSpacerItem(
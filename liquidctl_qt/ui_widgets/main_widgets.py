@@ -175,6 +175,7 @@ class HardwareWidget(QtWidgets.QFrame):
         class HwInfo(QtWidgets.QGridLayout):
             def __init__(self, hw_info):
                 super().__init__()
+                self.value_labels = {}  # field: value label
                 self.addItem(
                     Spacer(h_pol=QtWidgets.QSizePolicy.Minimum),
                     0,
@@ -204,17 +205,14 @@ class HardwareWidget(QtWidgets.QFrame):
                 self.addItem(Spacer(), 1, 3)
                 for i, info in enumerate(hw_info.keys()):
                     self.addWidget(Label(text=info), i, 1)
-                    self.addWidget(
-                        Label(
-                            text=str(hw_info.get(info).get("value")),
-                            alignment=(
-                                QtCore.Qt.AlignRight |
-                                QtCore.Qt.AlignVCenter
-                            )
-                        ),
-                        i,
-                        2,
+                    self.value_labels[info] = Label(
+                        text=str(hw_info.get(info).get("value")),
+                        alignment=(
+                            QtCore.Qt.AlignRight |
+                            QtCore.Qt.AlignVCenter
+                        )
                     )
+                    self.addWidget(self.value_labels[info], i, 2)
                     self.addWidget(
                         Label(
                             text=hw_info.get(info).get(("measurement")),
@@ -228,11 +226,11 @@ class HardwareWidget(QtWidgets.QFrame):
                     )
 
             def update_info(self, hw_info):
-                for i, info in enumerate(hw_info.keys()):
-                    self.itemAtPosition(i, 2).widget().setText(
-                        str(hw_info.get(info).get("value"))
-                    )
-                    pass
+                """hw_info can contain only the changed fields"""
+                for info, info_value in hw_info.items():
+                    value_label = self.value_labels.get(info)
+                    if value_label is not None:
+                        value_label.setText(str(info_value.get("value")))
 
         vbox = QtWidgets.QVBoxLayout()
         vbox.addItem(Top(hw_name, settings_btn_to_cnct))
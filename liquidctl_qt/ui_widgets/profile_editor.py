@@ -1,8 +1,9 @@
-from PyQt5 import QtWidgets, QtCore
+from PyQt5 import QtWidgets, QtCore, QtGui
 from ui_widgets import main_widgets, profile_widgets
-import pandas as pd
-import numpy as np
+from array import array
+from bisect import bisect_left, bisect_right
 import utils
+from liquidctl_api import curve_engine
 import exceptions
 from liquidctl.error import NotSupportedByDevice
 
@@ -52,6 +53,7 @@ class ProfileEditor(QtWidgets.QWidget):
     def _init(self, main_dialog, device_dict):
         self._variables(main_dialog, device_dict)
         self.setLayout(self._layout())
+        self._undo_shortcuts()
         self._load_first_profile()
 
     def _variables(self, main_dialog, device_dict):
@@ -95,6 +97,16 @@ class ProfileEditor(QtWidgets.QWidget):
         return hbox
 
 
+    def _undo_shortcuts(self):
+        undo_stack = self.profile_handler.undo_stack
+        for action, shortcut in (
+            (undo_stack.createUndoAction(self), QtGui.QKeySequence.Undo),
+            (undo_stack.createRedoAction(self), QtGui.QKeySequence.Redo),
+        ):
+            action.setShortcut(shortcut)
+            action.setShortcutContext(QtCore.Qt.WidgetWithChildrenShortcut)
+            self.addAction(action)
+
     def _load_first_profile(self):
         profile_name = self.profile_mode_chooser.curr_profile_name
         if profile_name:
@@ -119,12 +131,21 @@ class ProfileHandler(QtCore.QObject):
     # apply settings, reload the graph
     reload_graph_signal = QtCore.pyqtSignal()
     apply_settings_signal = QtCore.pyqtSignal()
+    # (curve or None, error or None) emitted from a device write thread
+    written_signal = QtCore.pyqtSignal(object, object)
+    # the software curve was dropped, no fixed speeds either
+    curve_unsupported_signal = QtCore.pyqtSignal()
 
     def __init__(self, profile_editor):
         super().__init__()
         self.profile_editor = profile_editor
-        self.profiles = utils.Profiles()
+        # the one Info keeps (indexed already), a new one without it
+        self.profiles = (
+            profile_editor.device_dict.get("profiles") or utils.Profiles()
+        )
         self.signals = Signals(self.mode_changed_signal)
+        # edits of the steps (StepsCommand, MoveStepCommand)
+        self.undo_stack = QtWidgets.QUndoStack(self)
         self._connect_signals()
 
     def _connect_signals(self):
@@ -132,20 +153,24 @@ class ProfileHandler(QtCore.QObject):
         self.delete_profile_signal.connect(self.delete_profile)
         self.apply_settings_signal.connect(self.apply_settings)
         self.reload_graph_signal.connect(self.reload_graph)
+        self.written_signal.connect(self.on_written)
+        self.curve_unsupported_signal.connect(self.on_curve_unsupported)
 
     @QtCore.pyqtSlot()
     def save_profile(self):
         """
         Saves profile settings
         profile = {
+            "version": int,  # profile_format.VERSION
             "name": str,
             "device_info": {
                 "name": str,  # device name
                 "vendor_id": str,  # device vendor id
                 "product_id": str,  # device product id
+                "serial_number": str,  # DeviceRegistry.match() binds to it
             },
             "static_duty": int,  # int from 0 to 100 ELSE None
-            "data_frame": pd.DataFrame, # DataFrame object ELSE None
+            "steps": [[int, int], ...],  # [temperature, duty] ELSE None
         }
         """
         self.profile_editor.hide_dialog_signal.emit()
@@ -154,8 +179,8 @@ class ProfileHandler(QtCore.QObject):
         )
         if name_dialog.exec_():
             profile_name = name_dialog.name
-            profile_name_exists = bool(
-                profile_name in self.profiles.duty_profiles.get_profiles()
+            profile_name_exists = self.profiles.duty_profiles.profile_exists(
+                profile_name
             )
             DIALOG_MSG = "Override profile ?"  # pylint: disable=invalid-name
             # if a profile with the same name exists ask to override
@@ -200,55 +225,118 @@ class ProfileHandler(QtCore.QObject):
             _, duty = self.profile_editor.control_sliders.get_values()
             return {
                 "name": name,
-                "device_info": self.profile_editor.device_info,
+                "device_info": self.profile_editor.device_dict.get("device_info"),
                 "static_duty": duty,
-                "data_frame": None,
+                "steps": None,
             }
         else:
-            str_df = self.profile_editor.steps_editor.model_to_str()
             return {
                 "name": name,
-                "device_info": self.profile_editor.device_info,
+                "device_info": self.profile_editor.device_dict.get("device_info"),
                 "static_duty": None,
-                "data_frame": str_df,
+                "steps": self.profile_editor.steps_editor.model().steps(),
             }
 
     @QtCore.pyqtSlot()
     def apply_settings(self):
-        device_obj = self.profile_editor.device_dict.get("device_obj")
+        """
+        Queues the write (WriteQueue), the dialog stays responsive and
+        the result comes back through on_written()
+        """
+        dev_index = self.profile_editor.device_dict.get("dev_index")
+        write_queue = self.profile_editor.device_dict.get("write_queue")
+        curve_engine_obj = self.profile_editor.device_dict.get("curve_engine")
         hw_name = self.profile_editor.objectName()
-        profile_df = self.profile_editor.steps_editor.model().df
+        steps_model = self.profile_editor.steps_editor.model()
 
         # static duty
         if self.profile_editor.profile_mode_chooser.current_mode:
             _, duty = self.profile_editor.control_sliders.get_values()
-            self.profiles.duty_profiles.set_duty(
-                device_obj,
-                hw_name,
-                static_duty=duty
+            # a software curve would overwrite the static duty
+            curve_engine_obj.remove_curve(dev_index, hw_name)
+            write_queue.set_fixed_speed(
+                dev_index, hw_name, duty,
+                done=lambda error: self.written_signal.emit(None, error),
             )
-        elif profile_df.empty:  # profile is empty
+        elif steps_model.empty:  # profile is empty
             profile_widgets.MsgDialog(
                 parent=self.profile_editor.main_dialog,
                 DIALOG_MSG="Profile is empty !"
             ).exec_()
 
         else:  # when the profile is not empty
-            try:
-                self.profiles.duty_profiles.set_duty(
-                    device_obj,
-                    hw_name,
-                    profile_df=profile_df
+            curve = steps_model.to_curve()
+            # its writes would replace the queued profile (last write wins)
+            curve_engine_obj.remove_curve(dev_index, hw_name)
+            write_queue.set_speed_profile(
+                dev_index, hw_name, curve.liquidctl_profile(),
+                done=lambda error: self.written_signal.emit(curve, error),
+            )
+
+    @QtCore.pyqtSlot(object, object)
+    def on_written(self, curve, error):
+        if error is None:
+            return
+        if curve is not None and isinstance(error, NotSupportedByDevice):
+            # the curve is applied by the host instead
+            self.profile_editor.device_dict.get("curve_engine").set_curve(
+                self.profile_editor.device_dict.get("dev_index"),
+                self.profile_editor.objectName(),
+                curve,
+                on_unsupported=self.curve_unsupported_signal.emit,
+            )
+            profile_widgets.MsgDialog(
+                parent=self.profile_editor.main_dialog,
+                DIALOG_MSG=(
+                    "Your device does not support profiles,\n" +
+                    "the profile is applied while Liquidctl-Qt is running."
                 )
-            except NotSupportedByDevice:
-                profile_widgets.MsgDialog(
-                    parent=self.profile_editor.main_dialog,
-                    DIALOG_MSG="Your device does not support profiles."
-                ).exec_()
+            ).exec_()
+        else:
+            profile_widgets.MsgDialog(
+                parent=self.profile_editor.main_dialog,
+                DIALOG_MSG=f"Couldn't apply the settings:\n{error}",
+            ).exec_()
 
-    QtCore.pyqtSlot()
+    @QtCore.pyqtSlot()
+    def on_curve_unsupported(self):
+        profile_widgets.MsgDialog(
+            parent=self.profile_editor.main_dialog,
+            DIALOG_MSG=(
+                "Your device supports neither profiles nor fixed speeds,\n" +
+                "the profile can't be applied."
+            )
+        ).exec_()
+
+    @QtCore.pyqtSlot()
     def reload_graph(self):
-        pass
+        """Plots the steps (or the fixed duty) being edited"""
+        graph_frame = getattr(self.profile_editor, "graph_frame", None)
+        if graph_frame is None:  # the steps editor is built before it
+            return
+        if self.profile_editor.profile_mode_chooser.current_mode:
+            _, duty = self.profile_editor.control_sliders.get_values()
+            graph_frame.set_steps(((0, duty), (100, duty)))
+        else:
+            graph_frame.set_steps(self.profile_editor.steps_editor.model().steps())
+
+    def drag_step(self, iloc, temp, duty):
+        """
+        A step dragged in the graph (coalesced by GraphFrame), temp is
+        kept between its neighbours so only its row changes
+        """
+        self.profile_editor.steps_editor.model().updateRow(
+            temp, duty, iloc_int=iloc
+        )
+
+    def step_dragged(self, iloc, before, after):
+        """The drag ended, before/after: (temp, duty)"""
+        if before != after:
+            self.undo_stack.push(
+                MoveStepCommand(
+                    self.profile_editor.steps_editor.model(), iloc, before, after
+                )
+            )
 
     def decision_dialog(self, DIALOG_MSG):  # pylint: disable=invalid-name
         self.profile_editor.hide_dialog_signal.emit()
@@ -351,6 +439,9 @@ class StepsViewEditor(QtWidgets.QTableView):
         self.profile_handler.remove_step_signal.connect(self.remove_step)
         self.profile_handler.update_step_signal.connect(self.update_step)
         self.profile_handler.add_step_signal.connect(self.add_step)
+        self.profile_handler.mode_changed_signal.connect(
+            lambda _: self.profile_handler.reload_graph_signal.emit()
+        )
 
     def _set_properties(self):
         """Sets widget properties"""
@@ -369,25 +460,57 @@ class StepsViewEditor(QtWidgets.QTableView):
         self.verticalHeader().setVisible(False)
 
     def _set_init_model(self):
-        model = TempDutyModel(
-            pd.DataFrame(
-                [[-1, -1]],
-                columns=["Temperature", "Duty"],
-                dtype=np.int8
+        self.setModel(TempDutyModel())
+
+    def setModel(self, model):  # pylint: disable=invalid-name
+        """
+        The graph follows every change of the steps, the edits of the
+        previous model can't be undone anymore
+        """
+        super().setModel(model)
+        self.profile_handler.undo_stack.clear()
+        for signal in (
+            model.dataChanged,
+            model.rowsInserted,
+            model.rowsRemoved,
+            model.modelReset,
+        ):
+            signal.connect(
+                lambda *_: self.profile_handler.reload_graph_signal.emit()
             )
-        )
-        self.setModel(model)
-        self.model().removeRow(0)
+        self.profile_handler.reload_graph_signal.emit()
 
     @QtCore.pyqtSlot(QtCore.QModelIndex, QtCore.QModelIndex)
     # pylint: disable=invalid-name, unused-argument
     def currentChanged(self, *args):
         self.update_sliders()
 
+    def _undoable(self, text, edit):
+        """Runs an edit of the steps, if it changed them it can be undone"""
+        model = self.model()
+        before = model.snapshot()
+        edit()
+        after = model.snapshot()
+        if after != before:
+            self.profile_handler.undo_stack.push(
+                StepsCommand(model, before, after, text)
+            )
+
     @QtCore.pyqtSlot()
     def add_step(self):
+        self._undoable("Add step", self._add_step)
+
+    @QtCore.pyqtSlot()
+    def update_step(self):
+        self._undoable("Update step", self._update_step)
+
+    @QtCore.pyqtSlot()
+    def remove_step(self):
+        self._undoable("Remove step", self._remove_step)
+
+    def _add_step(self):
         """Inserts step accordingly to temperature"""
-        temp, duty, df_new = self.get_info()
+        temp, duty = self.get_info()
         iloc_with_temp = self.model().get_iloc(temp)
         DIALOG_MSG = (  # pylint: disable=invalid-name
             "There is a step with the same temprature"
@@ -404,16 +527,14 @@ class StepsViewEditor(QtWidgets.QTableView):
             self.selectRow(iloc_with_temp)  # sets active row
 
         else:
-            iloc_for_row = self.model().get_iloc_for_row(temp)
-            self.model().addRow(iloc_for_row, df_new)  # adds the new row
+            iloc_for_row = self.model().addRow(temp, duty)  # adds the new row
             self.selectRow(iloc_for_row)  # sets active row
 
-    @QtCore.pyqtSlot()
-    def update_step(self):
+    def _update_step(self):
         """
         Updates currently selected step to values specified in sliders
         """
-        temp, duty, _ = self.get_info()
+        temp, duty = self.get_info()
         current_index = self.currentIndex()
         if current_index.isValid():
             current_row_iloc = current_index.row()
@@ -424,9 +545,6 @@ class StepsViewEditor(QtWidgets.QTableView):
             iloc_with_temp = self.model().get_iloc(temp)
             if current_row_iloc == iloc_with_temp:
                 self.model().updateRow(temp, duty, iloc_int=current_row_iloc)
-
-                # fixme: don't use this bs
-                self.update_displayed_value(current_row_iloc)
                 self.selectRow(current_row_iloc)  # sets active row
 
             elif (
@@ -437,150 +555,157 @@ class StepsViewEditor(QtWidgets.QTableView):
                     DIALOG_MSG
                 ).exec_()
             ):
-                # remove row with the same temp. value
+                # remove current row, the one with the same temp. is updated
                 self.model().removeRow(current_row_iloc)
-                # update current row
+                # removing the row could have moved it
+                iloc_with_temp = self.model().get_iloc(temp)
                 self.model().updateRow(temp, duty, iloc_int=iloc_with_temp)
-                self.update_displayed_value(iloc_with_temp)
                 self.selectRow(iloc_with_temp)  # sets active row
 
             elif iloc_with_temp is None:
-                self.model().updateRow(temp, duty, iloc_int=current_row_iloc)
-                # wont try to get the iloc before the row even exists
-                # pylint: disable=invalid-name
-                _iloc_with_temp = self.model().get_iloc(temp)
-                self.update_displayed_value(_iloc_with_temp)
-                self.selectRow(_iloc_with_temp)  # sets active row
+                # the row moves if its temp. passes another row
+                new_iloc = self.model().updateRow(
+                    temp, duty, iloc_int=current_row_iloc
+                )
+                self.selectRow(new_iloc)  # sets active row
 
             else:
                 raise Exception("Something is wrong !")
 
-    @QtCore.pyqtSlot()
-    def remove_step(self):
+    def _remove_step(self):
         """Removes currently selected step"""
         if self.currentIndex().isValid():
             self.model().removeRow(self.currentIndex().row())
             self.update_sliders()
 
     def get_info(self):
-        """
-        Returns temp, duty, and a new df for adding a new row
-        in the original df
-        """
-        temp, duty = self.profile_editor.control_sliders.get_values()
-        df_new = pd.DataFrame(
-            [[temp, duty]], columns=["Temperature", "Duty"], dtype=np.int8
-        )
-        return temp, duty, df_new
+        """Returns temp, duty set with the sliders"""
+        return self.profile_editor.control_sliders.get_values()
 
     def update_sliders(self):
         """
-        Updates sliders by getting data from the DataFrame object
+        Updates sliders by getting data from the current step
         """
         index_model = self.currentIndex()
         if index_model.isValid():
-            temp, duty = self.model().df.iloc[index_model.row()].to_list()
+            temp, duty = self.model().step(index_model.row())
             self.profile_handler.set_sliders_value_signal.emit(temp, duty)
 
-    def update_displayed_value(self, current_row_iloc):
-        """Stupid hack to instantly update the displayed value"""
-        self.selectRow(current_row_iloc + 1)
-        self.selectRow(current_row_iloc - 1)
-
-    def model_to_str(self):
-        return self.profile_handler.profiles.duty_profiles.frame_to_str(
-            self.model().df
-        )
-
     @QtCore.pyqtSlot(dict)
     def set_settings(self, profile_settings):
         if profile_settings.get("static_duty") is not None:
-            model = TempDutyModel(
-                pd.DataFrame(
-                    [[-1, -1]],
-                    columns=["Temperature", "Duty"],
-                    dtype=np.int8
-                )
-            )
-            model.removeRow(0)
+            model = TempDutyModel()
         elif profile_settings.get("static_duty") is None:
-            df = self.profile_handler.profiles.duty_profiles.str_to_frame(
-                profile_settings.get("data_frame")
-            )
-            model = TempDutyModel(df)
+            model = TempDutyModel(profile_settings.get("steps") or ())
         self.setModel(model)
 
 
 class TempDutyModel(QtCore.QAbstractTableModel):
     """
-    Model that is using pandas.DataFrame
+    Model of temperature/duty steps, kept sorted by temperature in two
+    arrays so cells are read in O(1) and rows are found with bisect
     """
 
-    __slots__ = ("df",)
+    __slots__ = ("temps", "duties")
+
+    HEADERS = ("Temperature", "Duty")
 
-    def __init__(self, df):
+    def __init__(self, steps=()):
         super().__init__()
-        self.df = df
+        steps = sorted(steps)
+        self.temps = array("B", [temp for temp, _ in steps])
+        self.duties = array("B", [duty for _, duty in steps])
 
     # pylint doesn't detect the arg is used, pylint: disable=unused-argument
     def data(self, index, role):
         if role == QtCore.Qt.DisplayRole:
-            value = self.df.iloc[index.row(), index.column()]
-            return str(int(value))  # i need to do this when updating a value
+            if index.column() == 0:
+                return str(self.temps[index.row()])
+            return str(self.duties[index.row()])
 
     def rowCount(self, *args):  # pylint: disable=invalid-name
-        return self.df.shape[0]
+        return len(self.temps)
 
     def columnCount(self, *args):  # pylint: disable=invalid-name
-        return self.df.shape[1]
+        return len(self.HEADERS)
 
     # pylint: disable=invalid-name
     def headerData(self, section, orientation, role):
         if role == QtCore.Qt.DisplayRole:
             if orientation == QtCore.Qt.Horizontal:
-                return str(self.df.columns[section])
+                return self.HEADERS[section]
             if orientation == QtCore.Qt.Vertical:
-                return str(self.df.index[section])
+                return str(section)
+
+    @property
+    def empty(self) -> bool:
+        return not self.temps
+
+    def step(self, iloc):
+        return self.temps[iloc], self.duties[iloc]
+
+    def steps(self) -> list:
+        return list(zip(self.temps, self.duties))
+
+    def to_curve(self):
+        return curve_engine.CompiledCurve(self.steps())
+
+    def snapshot(self) -> bytes:
+        """Every step in 2 bytes per step (StepsCommand)"""
+        return self.temps.tobytes() + self.duties.tobytes()
+
+    def restore(self, snapshot: bytes):
+        middle = len(snapshot) // 2
+        self.beginResetModel()
+        self.temps = array("B", snapshot[:middle])
+        self.duties = array("B", snapshot[middle:])
+        self.endResetModel()
 
     def removeRow(self, iloc):  # pylint: disable=invalid-name
-        parent = QtCore.QModelIndex()
-        self.beginRemoveRows(parent, iloc, iloc)
-        self.df = self.df.drop(self.df.index[iloc])
-        self.dataChanged.emit(parent, parent)
+        self.beginRemoveRows(QtCore.QModelIndex(), iloc, iloc)
+        del self.temps[iloc]
+        del self.duties[iloc]
         self.endRemoveRows()
 
-    def addRow(self, iloc, df_new):  # pylint: disable=invalid-name
+    def addRow(self, temp, duty):  # pylint: disable=invalid-name
+        """Inserts a step where its temp. belongs, returns its iloc"""
+        iloc = self.get_iloc_for_row(temp)
         self.beginInsertRows(QtCore.QModelIndex(), iloc, iloc)
-        self.df = self.df.append(df_new, ignore_index=True).sort_values(
-            by="Temperature"
-        )
+        self.temps.insert(iloc, temp)
+        self.duties.insert(iloc, duty)
         self.endInsertRows()
+        return iloc
 
     # pylint: disable=invalid-name
-    def updateRow(self, temp, duty, loc_int=None, iloc_int=None):
-        if loc_int is not None:
-            self.df.loc[loc_int] = [temp, duty]
-            self.df.sort_values(by="Temperature", inplace=True)
-        elif iloc_int is not None:
-            self.df.iloc[iloc_int] = [temp, duty]
-            self.df.sort_values(by="Temperature", inplace=True)
-
-    def get_loc(self, temp):
+    def updateRow(self, temp, duty, iloc_int):
         """
-        Returns loc (ID which multple rows can have) with a specific temp. value
+        Sets the values of a step and returns its (new) iloc,
+        the step is only moved if its temp. passes another step
         """
-        loc = self.df.index[self.df["Temperature"] == temp].to_list()
-        if loc:
-            return loc[0]
-        return None
+        in_order = (
+            (iloc_int == 0 or self.temps[iloc_int - 1] < temp)
+            and (
+                iloc_int == len(self.temps) - 1
+                or temp < self.temps[iloc_int + 1]
+            )
+        )
+        if not in_order:
+            self.removeRow(iloc_int)
+            return self.addRow(temp, duty)
+        self.temps[iloc_int] = temp
+        self.duties[iloc_int] = duty
+        self.dataChanged.emit(
+            self.index(iloc_int, 0), self.index(iloc_int, 1)
+        )
+        return iloc_int
 
     def get_iloc(self, temp):
         """
         Returns iloc (row number) with a specific temp. value
         """
-        iloc = self.df["Temperature"] == temp
-        if iloc.any():
-            return iloc.to_list().index(True)
+        iloc = bisect_left(self.temps, temp)
+        if iloc < len(self.temps) and self.temps[iloc] == temp:
+            return iloc
         return None
 
     def get_iloc_for_row(self, temp):
@@ -588,14 +713,54 @@ class TempDutyModel(QtCore.QAbstractTableModel):
         Gets iloc for not yet existing new row with a specific temp.
         It finds iloc where the row should be placed.
         """
-        # list of all temps. higher than temp (from function arg)
-        iloc_for_row_list = (self.df["Temperature"] > temp).to_list()
-        try:
-            return iloc_for_row_list.index(True)
-
-        # if True is not found it means the row needed to be added is last row
-        except ValueError:
-            return self.rowCount(None)
+        return bisect_right(self.temps, temp)
+
+
+class StepsCommand(QtWidgets.QUndoCommand):
+    """
+    Undoable add/update/remove of steps, the model is restored from a
+    snapshot (TempDutyModel.snapshot()), the edit was done already
+    """
+
+    def __init__(self, model, before: bytes, after: bytes, text: str):
+        super().__init__(text)
+        self.model = model
+        self.before = before
+        self.after = after
+        self._done = True  # QUndoStack.push() calls redo()
+
+    def redo(self):
+        if self._done:
+            self._done = False
+            return
+        self.model.restore(self.after)
+
+    def undo(self):
+        self.model.restore(self.before)
+
+
+class MoveStepCommand(QtWidgets.QUndoCommand):
+    """
+    Undoable drag of a step (GraphFrame), only its row changes so undo
+    and redo emit dataChanged for that row instead of a model reset
+    """
+
+    def __init__(self, model, iloc: int, before: tuple, after: tuple):
+        super().__init__("Move step")
+        self.model = model
+        self.iloc = iloc
+        self.before = before  # (temp, duty)
+        self.after = after
+        self._done = True  # QUndoStack.push() calls redo()
+
+    def redo(self):
+        if self._done:
+            self._done = False
+            return
+        self.model.updateRow(*self.after, iloc_int=self.iloc)
+
+    def undo(self):
+        self.model.updateRow(*self.before, iloc_int=self.iloc)
 
 
 class StepControl(main_widgets.VBox):
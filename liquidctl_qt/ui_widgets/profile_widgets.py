@@ -1,5 +1,6 @@
-from PyQt5 import QtWidgets, QtCore
+from PyQt5 import QtWidgets, QtCore, QtGui
 from ui_widgets import main_widgets
+from liquidctl_api import curve_engine
 import string
 
 
@@ -116,11 +117,23 @@ class ProfileControls(main_widgets.HBox):
         self._btns()
 
     def _btns(self):
+        undo_stack = self.profile_handler.undo_stack
+        for text, to_connect, can_signal, tooltip in (
+            ("Undo", undo_stack.undo, undo_stack.canUndoChanged,
+             "Undo the last change of the steps (Ctrl+Z)"),
+            ("Redo", undo_stack.redo, undo_stack.canRedoChanged,
+             "Redo the undone change of the steps"),
+        ):
+            button = main_widgets.Button(
+                text, to_connect, enabled=False, tooltip=tooltip
+            )
+            can_signal.connect(button.setEnabled)
+            self.addWidget(button)
         self.addWidget(
             main_widgets.Button(
                 "Reload Graph",
                 self.profile_handler.reload_graph_signal.emit,
-                enabled=False,
+                enabled=True,
                 tooltip="Recreates the graph from current settings"
             )
         )
@@ -135,9 +148,46 @@ class ProfileControls(main_widgets.HBox):
 
 
 class GraphFrame(QtWidgets.QFrame):
+    """
+    Temperature/duty plot of the edited curve with the fan's measured
+    duty (at the current temperature) and speed on top of it
+    the grid and the curve are painted once into a pixmap (again only
+    when the curve or the size changes), a refresh only repaints the
+    rects the live marker left and moved to
+    steps can be dragged, the model gets the position at most every
+    DRAG_INTERVAL (not with every mouse move) and one undoable command
+    when the drag ends
+    """
+
+    __slots__ = (
+        "profile_handler", "steps", "live", "_background", "_live_rect",
+        "_timer", "_drag", "_drag_timer",
+    )
+
+    REFRESH_INTERVAL = 100  # ms, 10 Hz
+    DRAG_INTERVAL = 50  # ms between model updates while dragging
+    GRAB_DISTANCE = 8  # px from a step it can be grabbed at
+    MARGINS = QtCore.QMargins(34, 10, 12, 24)  # left, top, right, bottom
+    MARKER_SIZE = 5
+    CURVE_COLOR = QtGui.QColor(0, 170, 255)
+    LIVE_COLOR = QtGui.QColor(255, 120, 0)
+
     def __init__(self, profile_handler):
         super().__init__()
         self.profile_handler = profile_handler
+        self.steps = ()  # ((temp, duty), ...) of the plotted curve
+        # (temp, duty, rpm, duty measured) of the fan, the duty is the
+        # curve's when the device doesn't report it
+        self.live = None
+        self._background = None  # QPixmap, None when it has to be repainted
+        self._live_rect = QtCore.QRect()
+        self._timer = QtCore.QTimer(self)
+        self._timer.timeout.connect(self.refresh_live)
+        # [iloc, (temp, duty) before, (temp, duty) now] of a dragged step
+        self._drag = None
+        self._drag_timer = QtCore.QTimer(self)
+        self._drag_timer.setSingleShot(True)
+        self._drag_timer.timeout.connect(self._flush_drag)
         self._style()
 
     def _style(self):
@@ -145,9 +195,279 @@ class GraphFrame(QtWidgets.QFrame):
             QtWidgets.QSizePolicy.Expanding,
             QtWidgets.QSizePolicy.Expanding
         )
+        self.setMinimumSize(240, 180)
         self.setFrameShape(QtWidgets.QFrame.StyledPanel)
         self.setFrameShadow(QtWidgets.QFrame.Sunken)
         self.setLineWidth(1)
+        # every pixel is painted, Qt doesn't have to clear the background
+        self.setAttribute(QtCore.Qt.WA_OpaquePaintEvent)
+        self.setMouseTracking(True)  # the cursor shows what can be dragged
+
+    def set_steps(self, steps):
+        steps = tuple(steps)
+        if steps != self.steps:
+            self.steps = steps
+            self._background = None
+            self.update()
+
+    def _plot_rect(self) -> QtCore.QRect:
+        return self.contentsRect().marginsRemoved(self.MARGINS)
+
+    def _point(self, temp, duty) -> QtCore.QPointF:
+        """Position of a temperature/duty (0 - 100) in the plot"""
+        rect = self._plot_rect()
+        return QtCore.QPointF(
+            rect.left() + rect.width() * min(max(temp, 0), 100) / 100,
+            rect.bottom() - rect.height() * min(max(duty, 0), 100) / 100,
+        )
+
+    def _value(self, pos) -> tuple:
+        """(temp, duty) at a position in the plot"""
+        rect = self._plot_rect()
+        return (
+            round(100 * (pos.x() - rect.left()) / max(rect.width(), 1)),
+            round(100 * (rect.bottom() - pos.y()) / max(rect.height(), 1)),
+        )
+
+    def _step_at(self, pos):
+        """iloc of the step at a position or None"""
+        for iloc, step in enumerate(self.steps):
+            distance = self._point(*step) - QtCore.QPointF(pos)
+            if distance.manhattanLength() <= self.GRAB_DISTANCE:
+                return iloc
+        return None
+
+    def _editable(self) -> bool:
+        """Steps can't be dragged in fixed mode"""
+        return not self.profile_handler.profile_editor.profile_mode_chooser.current_mode
+
+    def mousePressEvent(self, mouse_event):  # pylint: disable=invalid-name
+        iloc = self._step_at(mouse_event.pos())
+        if (
+            mouse_event.button() != QtCore.Qt.LeftButton
+            or iloc is None
+            or not self._editable()
+        ):
+            super().mousePressEvent(mouse_event)
+            return
+        self._drag = [iloc, self.steps[iloc], self.steps[iloc]]
+        self.profile_handler.profile_editor.steps_editor.selectRow(iloc)
+        self.setCursor(QtCore.Qt.ClosedHandCursor)
+
+    def mouseMoveEvent(self, mouse_event):  # pylint: disable=invalid-name
+        if self._drag is None:
+            self.setCursor(
+                QtCore.Qt.OpenHandCursor
+                if self._step_at(mouse_event.pos()) is not None
+                and self._editable()
+                else QtCore.Qt.ArrowCursor
+            )
+            return
+        iloc = self._drag[0]
+        temp, duty = self._value(mouse_event.pos())
+        # between its neighbours, so the step keeps its row
+        low = self.steps[iloc - 1][0] + 1 if iloc else 0
+        high = self.steps[iloc + 1][0] - 1 if iloc + 1 < len(self.steps) else 100
+        step = (min(max(temp, low), high), min(max(duty, 0), 100))
+        if step == self._drag[2]:
+            return
+        self._drag[2] = step
+        # the graph follows the mouse, the model (table) catches up
+        self.set_steps(self.steps[:iloc] + (step,) + self.steps[iloc + 1:])
+        if not self._drag_timer.isActive():
+            self._drag_timer.start(self.DRAG_INTERVAL)
+
+    def mouseReleaseEvent(self, mouse_event):  # pylint: disable=invalid-name
+        if self._drag is None:
+            super().mouseReleaseEvent(mouse_event)
+            return
+        self._drag_timer.stop()
+        self._flush_drag()
+        iloc, before, after = self._drag
+        self._drag = None
+        self.profile_handler.step_dragged(iloc, before, after)
+        self.setCursor(QtCore.Qt.OpenHandCursor)
+
+    @QtCore.pyqtSlot()
+    def _flush_drag(self):
+        if self._drag is not None:
+            iloc, _, (temp, duty) = self._drag
+            self.profile_handler.drag_step(iloc, temp, duty)
+
+    def _curve_path(self) -> QtGui.QPainterPath:
+        """Flat before the first and after the last step, like CompiledCurve"""
+        path = QtGui.QPainterPath()
+        if not self.steps:
+            return path
+        path.moveTo(self._point(0, self.steps[0][1]))
+        for temp, duty in self.steps:
+            path.lineTo(self._point(temp, duty))
+        path.lineTo(self._point(100, self.steps[-1][1]))
+        return path
+
+    def _paint_background(self):
+        self._background = QtGui.QPixmap(self.size())
+        self._background.fill(self.palette().color(QtGui.QPalette.Base))
+        painter = QtGui.QPainter(self._background)
+        rect = self._plot_rect()
+        text_color = self.palette().color(QtGui.QPalette.Text)
+        grid_color = QtGui.QColor(text_color)
+        grid_color.setAlpha(40)
+        for value in range(0, 101, 20):
+            painter.setPen(grid_color)
+            painter.drawLine(self._point(value, 0), self._point(value, 100))
+            painter.drawLine(self._point(0, value), self._point(100, value))
+            painter.setPen(text_color)
+            x_label = self._point(value, 0)
+            painter.drawText(
+                QtCore.QRectF(x_label.x() - 20, rect.bottom() + 2, 40, 18),
+                QtCore.Qt.AlignHCenter | QtCore.Qt.AlignTop,
+                f"{value}°",
+            )
+            y_label = self._point(0, value)
+            painter.drawText(
+                QtCore.QRectF(0, y_label.y() - 9, rect.left() - 4, 18),
+                QtCore.Qt.AlignRight | QtCore.Qt.AlignVCenter,
+                f"{value}%",
+            )
+        painter.setRenderHint(QtGui.QPainter.Antialiasing)
+        painter.setPen(QtGui.QPen(self.CURVE_COLOR, 2))
+        painter.drawPath(self._curve_path())
+        painter.setBrush(self.CURVE_COLOR)
+        for temp, duty in self.steps:
+            painter.drawEllipse(self._point(temp, duty), 3, 3)
+        painter.end()
+
+    def _live_text(self) -> str:
+        temp, duty, rpm, duty_measured = self.live
+        text = f"{temp:.1f}°C"
+        if duty_measured:
+            text += f"  {duty:.0f}%"
+        if rpm is not None:
+            text += f"  {rpm:.0f} RPM"
+        return text
+
+    def _live_bounds(self) -> QtCore.QRect:
+        """What the live marker and its text cover"""
+        if self.live is None:
+            return QtCore.QRect()
+        point = self._point(*self.live[:2]).toPoint()
+        size = self.MARKER_SIZE + 1
+        marker = QtCore.QRect(point, point).adjusted(-size, -size, size, size)
+        text = self.fontMetrics().boundingRect(self._live_text())
+        text.moveBottomLeft(point + QtCore.QPoint(size + 2, -size))
+        # kept inside the frame
+        text.moveRight(min(text.right(), self.contentsRect().right()))
+        text.moveTop(max(text.top(), self.contentsRect().top()))
+        return marker.united(text.adjusted(-2, -2, 2, 2))
+
+    def _paint_live(self, painter):
+        point = self._point(*self.live[:2])
+        painter.setRenderHint(QtGui.QPainter.Antialiasing)
+        painter.setPen(QtGui.QPen(self.LIVE_COLOR, 2))
+        painter.setBrush(QtCore.Qt.NoBrush)
+        painter.drawEllipse(point, self.MARKER_SIZE, self.MARKER_SIZE)
+        painter.setPen(self.palette().color(QtGui.QPalette.Text))
+        painter.drawText(
+            self._live_rect.adjusted(2, 2, -2, -2),
+            QtCore.Qt.AlignRight | QtCore.Qt.AlignTop,
+            self._live_text(),
+        )
+
+    def paintEvent(self, paint_event):  # pylint: disable=invalid-name
+        if self._background is None or self._background.size() != self.size():
+            self._paint_background()
+        painter = QtGui.QPainter(self)
+        dirty = paint_event.rect()
+        painter.drawPixmap(dirty, self._background, dirty)
+        if self.live is not None and dirty.intersects(self._live_rect):
+            self._paint_live(painter)
+        painter.end()
+        super().paintEvent(paint_event)  # the frame
+
+    def resizeEvent(self, resize_event):  # pylint: disable=invalid-name
+        self._background = None
+        self._live_rect = self._live_bounds()
+        super().resizeEvent(resize_event)
+
+    @staticmethod
+    def _field_value(hw_info, field, measurement):
+        """
+        Value of a field of a channel, or of its own label (e.g.
+        ("Fan 1", 40, "%")) if it is in measurement
+        """
+        field_info = hw_info.get(field)
+        if field_info is None:
+            field_info = hw_info.get("Value")
+            if field_info is None or field_info["measurement"] != measurement:
+                return None
+        return field_info["value"]
+
+    def _temperature(self, device_dict, dev_hw_info):
+        """The temperature a software curve follows, the device's otherwise"""
+        curves = device_dict.get("curve_engine")
+        source = curves and curves.temperature(
+            device_dict.get("dev_index"),
+            self.profile_handler.profile_editor.objectName(),
+        )
+        if source is not None:
+            source_info = device_dict["latest"](source[0])
+            temp_info = source_info and source_info.get(source[1])
+        else:
+            temps = curve_engine.temperature_channels(dev_hw_info)
+            temp_info = dev_hw_info[temps[0]] if temps else None
+        return temp_info and temp_info["Temperature"]["value"]
+
+    def _measured(self):
+        """
+        (temp, duty, rpm, duty measured) of the fan from the latest status,
+        None if it has none of the channel (or no temperature)
+        """
+        device_dict = self.profile_handler.profile_editor.device_dict
+        latest = device_dict.get("latest")
+        dev_hw_info = latest and latest(device_dict.get("dev_index"))
+        if not dev_hw_info:
+            return None
+        # found like the curve engine finds the channel it writes to
+        key = curve_engine.status_key(
+            dev_hw_info, self.profile_handler.profile_editor.objectName()
+        )
+        temp = self._temperature(device_dict, dev_hw_info)
+        if key is None or temp is None:
+            return None
+        fan_info = dev_hw_info[key]
+        duty = self._field_value(fan_info, "Duty", "%")
+        rpm = self._field_value(fan_info, "Speed", "RPM")
+        if duty is not None:
+            return temp, duty, rpm, True
+        if rpm is None or not self.steps:
+            return None
+        # speed only devices, the marker is where the curve drives the fan
+        return (
+            temp, curve_engine.CompiledCurve(self.steps).duty_at(temp), rpm,
+            False,
+        )
+
+    @QtCore.pyqtSlot()
+    def refresh_live(self):
+        live = self._measured()
+        if live == self.live:
+            return
+        self.live = live
+        old_rect, self._live_rect = self._live_rect, self._live_bounds()
+        self.update(old_rect)
+        if live is None:  # hidden, only where it was is repainted
+            return
+        self.update(self._live_rect)
+
+    def showEvent(self, show_event):  # pylint: disable=invalid-name
+        self.refresh_live()
+        self._timer.start(self.REFRESH_INTERVAL)
+        super().showEvent(show_event)
+
+    def hideEvent(self, hide_event):  # pylint: disable=invalid-name
+        self._timer.stop()
+        super().hideEvent(hide_event)
 
 
 class MsgDialog(main_widgets.Dialog):
@@ -29,19 +29,38 @@ class Stack(QtWidgets.QFrame):
     def _layout(self):
         box = main_widgets.VBox()
         self.stacked_widget = QtWidgets.QStackedWidget()
+        self.pages = {}  # dev_index: StackPage
         self._add_pages()
         box.addWidget(self.stacked_widget)
+        self.info.main_handler.device_added_signal.connect(self.add_page)
+        self.info.main_handler.device_removed_signal.connect(self.remove_page)
         return box
 
     def _add_pages(self):
-        for _ in self.info.DEVICES_LIST:
-            self.stacked_widget.addWidget(StackPage(self.info))
+        for dev_index, _ in enumerate(self.info.DEVICES_LIST):
+            self.add_page(dev_index)
+
+    def page(self, dev_index):
+        """StackPage of a device, None if it was unplugged"""
+        return self.pages.get(dev_index)
+
+    @QtCore.pyqtSlot(int)
+    def add_page(self, dev_index):
+        self.pages[dev_index] = StackPage(self.info, dev_index)
+        self.stacked_widget.addWidget(self.pages[dev_index])
+
+    @QtCore.pyqtSlot(int)
+    def remove_page(self, dev_index):
+        page = self.pages.pop(dev_index, None)
+        if page is not None:
+            self.stacked_widget.removeWidget(page)
+            page.deleteLater()
 
     @QtCore.pyqtSlot(dict)
     def set_page(self, info_dict):
-        self.stacked_widget.setCurrentIndex(
-            info_dict.get("device_index")
-        )
+        page = self.page(info_dict.get("device_index"))
+        if page is not None:
+            self.stacked_widget.setCurrentWidget(page)
 
 
 class StackPage(QtWidgets.QScrollArea):
@@ -49,9 +68,10 @@ class StackPage(QtWidgets.QScrollArea):
     add_widgets_signal = QtCore.pyqtSignal(dict)
     insert_widget_signal = QtCore.pyqtSignal(str, dict)
 
-    def __init__(self, info):
+    def __init__(self, info, dev_index):
         super().__init__()
         self.info = info
+        self.dev_index = dev_index
         self._init_()
 
     def _init_(self):
@@ -78,32 +98,37 @@ class StackPage(QtWidgets.QScrollArea):
     @QtCore.pyqtSlot(dict)
     def add_widgets(self, dev_hw_info):
         for hw_name in dev_hw_info.keys():
-            if "Fan" in hw_name:
-                self._vbox.addWidget(
-                    self.fan_widget(
-                        fan_name=hw_name,
-                        fan_info=dev_hw_info.get(hw_name),
-                    )
-                )
+            self._vbox.addWidget(
+                self.hw_widget(hw_name, dev_hw_info.get(hw_name))
+            )
         self._vbox.addSpacerItem(
             main_widgets.Spacer(v_pol=QtWidgets.QSizePolicy.Expanding)
         )
 
     @QtCore.pyqtSlot(str, dict)
     def insert_widget(self, hw_name, hw_info):
-        if "Fan" in hw_name:
-            self._vbox.insertWidget(
-                0,
-                self.fan_widget(
-                    hw_name,
-                    hw_info
-                )
-            )
+        self._vbox.insertWidget(0, self.hw_widget(hw_name, hw_info))
+
+    def hw_widget(self, hw_name, hw_info):
+        """Fans and pumps can be controlled, the rest is only displayed"""
+        if "Fan" in hw_name or "Pump" in hw_name:
+            return self.fan_widget(fan_name=hw_name, fan_info=hw_info)
+        return control.SensorWidget(
+            hw_name=hw_name,
+            hw_info=hw_info,
+            update_signal=self.update_dev_hw_signal,
+        )
 
     def fan_widget(self, fan_name, fan_info):
         device_dict = {
-            "device_obj": self.info.current_device_obj,
-            "device_info": self.info.profile_device_info
+            "device_obj": self.info.DEVICES_LIST[self.dev_index],
+            "device_info": self.info.device_profile_info(self.dev_index),
+            "dev_index": self.dev_index,
+            "curve_engine": self.info.curve_engine,
+            "write_queue": self.info.write_queue,
+            "profiles": self.info.profiles,
+            # latest(dev_index) -> last parsed status (live graph)
+            "latest": self.info.dev_info_updater.engine.latest,
         }
 
         def dialog(): return control.ProfileEditorDialog(
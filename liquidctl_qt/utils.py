@@ -1,13 +1,83 @@
+import os
 from os import path, makedirs, remove
 from glob import glob
-import pandas as pd
 import json
-from io import StringIO
+import stat
+import tempfile
+from liquidctl_api import curve_engine
+from profile_index import ProfileIndex
+import profile_format
+
+
+def _read_umask_once() -> int:
+    """Only while importing, os.umask() can't be read without setting it"""
+    umask = os.umask(0o022)
+    os.umask(umask)
+    return umask
+
+
+_IMPORT_UMASK = _read_umask_once()
+
+
+def _umask() -> int:
+    """
+    The current umask, read from /proc (setting it to read it races
+    with threads creating files), the one at import time without /proc
+    """
+    try:
+        with open("/proc/self/status", "r", encoding="utf-8") as status_file:
+            for line in status_file:
+                if line.startswith("Umask:"):
+                    return int(line.split()[1], 8)
+    except OSError:
+        pass
+    return _IMPORT_UMASK
+
+
+def _file_mode(file_path: str) -> int:
+    """Permissions of a file, or what open() would give a new one"""
+    try:
+        return stat.S_IMODE(os.stat(file_path).st_mode)
+    except FileNotFoundError:
+        return 0o666 & ~_umask()
+
+
+def atomic_write(file_path: str, text: str):
+    """
+    Replaces a file with text without ever leaving a partly written file:
+    it's written to a temporary file next to it, synced to the disk and
+    renamed over the file (a crash leaves the old or the new file)
+    the file keeps its permissions (a new one gets open()'s)
+    """
+    directory = path.dirname(file_path) or "."
+    # not *.json, ProfileIndex doesn't see it
+    file_descriptor, temp_path = tempfile.mkstemp(
+        dir=directory, prefix=".", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(file_descriptor, "w") as temp_file:
+            # mkstemp() makes it 0600, which the rename would keep
+            os.chmod(temp_path, _file_mode(file_path))
+            temp_file.write(text)
+            temp_file.flush()
+            os.fsync(temp_file.fileno())
+        os.replace(temp_path, file_path)
+    except BaseException:
+        remove(temp_path)
+        raise
+    # the rename itself survives a crash once the directory is synced
+    directory_descriptor = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(directory_descriptor)
+    finally:
+        os.close(directory_descriptor)
 
 
 class Profiles:
     """
     Main class for creating, deleting, editing profiles
+    database_path: duty profiles are kept in an SQLite file
+    (profile_db.py) instead of a JSON file each
     """
 
     __slots__ = (
@@ -17,13 +87,20 @@ class Profiles:
         "led_profiles",
     )
 
-    def __init__(self):
-        self._init()
+    def __init__(self, database_path=None):
+        self._init(database_path)
 
-    def _init(self):
+    def _init(self, database_path):
         # pylint: disable=invalid-name
         self.PROFILES_ROOT = path.expanduser("~/.config/Liquidctl-Qt/")
-        self.duty_profiles = DutyProfiles(self, self.DUTY_PATH)
+        if database_path:
+            # sqlite3 is only imported when it's used
+            import profile_db  # pylint: disable=import-outside-toplevel
+            self.duty_profiles = profile_db.DutyProfileDatabase(
+                path.expanduser(database_path)
+            )
+        else:
+            self.duty_profiles = DutyProfiles(self, self.DUTY_PATH)
         self.led_profiles = LedProfiles(self, self.LED_PATH)
 
     @property
@@ -51,84 +128,100 @@ class Profiles:
 
 class DutyProfiles:
     """Save, delete, edit duty profiles"""
-    __slots__ = ("ROOT_PATH", "profiles")
+    __slots__ = ("ROOT_PATH", "profiles", "index")
 
     def __init__(self, profiles_obj, profiles_path):
         self.ROOT_PATH = profiles_path  # pylint: disable=invalid-name
         self.profiles = {}
         profiles_obj.mkdirs(self.ROOT_PATH)
+        # parsed profiles and their CompiledCurves (None for static duty)
+        self.index = ProfileIndex(
+            self.ROOT_PATH, ".json", self.parse_profile, self._compile
+        )
+
+    @staticmethod
+    def parse_profile(profile_json: str) -> dict:
+        """Profiles of every version are loaded as the current one"""
+        return profile_format.upgrade(json.loads(profile_json))
 
-    def get_profiles(self):  # fixme: check if it works
-        profiles = []
-        for profile_file_path in glob(path.join(self.ROOT_PATH, "*.json")):
-            profiles.append(profile_file_path.split("/")[-1].split(".")[0])
-        return profiles
+    def get_profiles(self):
+        return self.index.names()
 
-    def load_profile(self, profile_name: str):  # fixme: check if it works
+    def profile_exists(self, profile_name: str) -> bool:
+        return profile_name in self.index
+
+    def load_profile(self, profile_name: str):
         """
-        Returns a dict obj representing profile settings
+        Returns a dict obj representing profile settings (cached, shared
+        by every caller, don't modify it)
         """
-        profile_file_name = profile_name + ".json"
-        with open(path.join(
-                self.ROOT_PATH, profile_file_name), "r") as profile_file:
-            return json.loads(profile_file.read())
+        return self.index.load(profile_name)
 
     def save_profile(self, profile_settings: dict):  # fixme: check if it works
         """
-        Saves profile settings
+        Saves profile settings (in the current profile_format version)
         profile = {
+            "version": int,  # profile_format.VERSION
             "name": str,
             "device_info": {
                 "name": str,  # device name
                 "vendor_id": str,  # device vendor id
                 "product_id": str,  # device product id
+                "serial_number": str,  # DeviceRegistry.match() binds to it
             },
             "static_duty": int,  # int from 0 to 100 ELSE None
-            "data_frame": pd.DataFrame, # DataFrame object ELSE None
+            "steps": [[int, int], ...],  # [temperature, duty] ELSE None
         }
         """
-        with open(
-            path.join(
-                self.ROOT_PATH, profile_settings.get("name") + ".json"), "w"
-        ) as profile_file:
-            profile_file.write(json.dumps(profile_settings))
+        profile_settings = profile_format.upgrade(profile_settings)
+        atomic_write(
+            path.join(self.ROOT_PATH, profile_settings.get("name") + ".json"),
+            json.dumps(profile_settings),
+        )
+        self.index.saved(profile_settings.get("name"))
 
     def remove_profile(self, profile_name: str):  # fixme: check if it works
         profile_file_name = profile_name + ".json"
         remove(path.join(self.ROOT_PATH, profile_file_name))
+        self.index.removed(profile_name)
 
-    def str_to_frame(self, data_frame_str: str):
+    def import_profiles(self, profiles) -> int:
         """
-        Converts a DataFrame saved in a string back into a DataFrame object
+        Saves (overwrites) profile dicts, every file is replaced atomically
+        but not the set of them (DutyProfileDatabase does that)
         """
-        return pd.read_csv(StringIO(data_frame_str.replace(";", "\n")))
-
-    def frame_to_str(self, df):
+        count = 0
+        for profile_settings in profiles:
+            self.save_profile(profile_settings)
+            count += 1
+        return count
+
+    def export_profiles(self, names=None) -> list:
+        """Profile dicts, every one or the named ones"""
+        return [
+            self.load_profile(name)
+            for name in (self.get_profiles() if names is None else names)
+        ]
+
+    def load_curve(self, profile_name: str):
         """
-        Converts numpy array from DataFrame to a single line dict string
+        Returns the CompiledCurve of a profile (None for static duty
+        profiles), it is only compiled again when the profile file changes
         """
-        str_df = df.to_csv(
-            header=["Temperature", "Duty"],
-            index=False,
-        ).replace("\n", ";")
-        if str_df[0] == ",":
-            return str_df[1:]
-        return str_df
-
-    def set_duty(self, device_obj, hw_name, static_duty=None, profile_df=None):
+        return self.index.curve(profile_name)
+
+    def _compile(self, profile_settings):
+        if profile_settings.get("static_duty") is not None:
+            return None
+        return curve_engine.CompiledCurve(profile_settings.get("steps"))
+
+    def set_duty(self, device_obj, hw_name, static_duty=None, curve=None):
         hw_name = hw_name.replace(" ", "").lower()
         if static_duty != None:
             device_obj.set_fixed_speed(hw_name, static_duty)
 
-        elif profile_df is not None:
-            liquidctl_format = self.to_liqidctl_profile(profile_df)
-            device_obj.set_speed_profile(hw_name, liquidctl_format)
-
-    def to_liqidctl_profile(self, profile_df):
-        liquidctl_format = ""
-        for tempduty in profile_df.to_csv(index=False, header=False).split():
-            liquidctl_format += tempduty.replace(",", " ")+ " "
-        return liquidctl_format
+        elif curve is not None:
+            device_obj.set_speed_profile(hw_name, curve.liquidctl_profile())
 
 
 class LedProfiles:
@@ -1,11 +1,21 @@
-from PyQt5 import QtCore, QtWidgets
+from os import path
+from PyQt5 import QtCore, QtGui, QtWidgets
+import utils
 from ui_widgets import (
     main_widgets,
     left,
     right
 )
-from liquidctl_api import liquidctl_api
-import threading
+from liquidctl_api import (
+    curve_engine,
+    hotplug,
+    liquidctl_api,
+    sensor_history,
+    sensor_log,
+    status_diff,
+    status_engine,
+    write_queue,
+)
 
 
 class Handler(QtCore.QObject):
@@ -13,6 +23,12 @@ class Handler(QtCore.QObject):
 
     # when user selects another device
     device_changed_signal = QtCore.pyqtSignal(dict)
+    # when a device finished initializing (in the background)
+    device_ready_signal = QtCore.pyqtSignal(int)
+    device_init_failed_signal = QtCore.pyqtSignal(int, str)
+    # when a device was plugged in/out (HotplugWatcher)
+    device_added_signal = QtCore.pyqtSignal(int)
+    device_removed_signal = QtCore.pyqtSignal(int)
 
     def __init__(self, window):
         super().__init__()
@@ -20,7 +36,6 @@ class Handler(QtCore.QObject):
 
     @QtCore.pyqtSlot(int)
     def on_device_changed(self, new_dev_index):
-        self.window.info.dev_info_updater.stop()
         self.window.info.current_dev_index = new_dev_index
         self.device_changed_signal.emit(
             {
@@ -28,20 +43,129 @@ class Handler(QtCore.QObject):
                 "device_index": new_dev_index
             }
         )
-        self.window.info.dev_info_updater.start()
+        self.window.info.dev_info_updater.select(new_dev_index)
 
+    @QtCore.pyqtSlot(int)
+    def on_device_ready(self, dev_index):
+        self.window.info.dev_info_updater.select(dev_index)
+
+    def device_initialized(self, dev_index, error):
+        """Called from a device init thread"""
+        if error is None:
+            self.device_ready_signal.emit(dev_index)
+        else:
+            self.device_init_failed_signal.emit(dev_index, str(error))
+
+    def device_added(self, dev_index):
+        """Called from the hot-plug watcher thread"""
+        info = self.window.info
+        info.control_device_widgets.append([])
+        info.write_queue.add_device()
+        info.dev_info_updater.engine.add_device(dev_index)
+        self.device_added_signal.emit(dev_index)
+
+    def device_removed(self, dev_index):
+        """Called from the hot-plug watcher thread"""
+        info = self.window.info
+        info.dev_info_updater.engine.remove_device(dev_index)
+        info.curve_engine.remove_device(dev_index)
+        self.device_removed_signal.emit(dev_index)
+
+
+class ProfileWatcher(QtCore.QObject):
+    """
+    Refreshes a ProfileIndex whenever its directory changes (inotify on
+    Linux), so profiles are listed without scanning the directory
+    """
+    __slots__ = ("index", "watcher")
+
+    def __init__(self, index, parent=None):
+        super().__init__(parent)
+        self.index = index
+        self.watcher = QtCore.QFileSystemWatcher([index.root_path], self)
+        self.watcher.directoryChanged.connect(self.on_changed)
+
+    @QtCore.pyqtSlot(str)
+    def on_changed(self, _):
+        self.index.refresh()
 
-class MainWindow(QtWidgets.QMainWindow):
-    __slots__ = ("handler", "info")
 
-    def __init__(self):
+class MainWindow(QtWidgets.QMainWindow):
+    """
+    The window is shown with a placeholder first, devices are searched
+    for and the widgets are built after the placeholder was painted
+    """
+    __slots__ = (
+        "handler", "info", "log_sensors", "attach", "find_devices",
+        "instrumentation", "debug_panel", "profile_db",
+    )
+
+    first_paint_signal = QtCore.pyqtSignal()
+    built_signal = QtCore.pyqtSignal()
+
+    def __init__(
+        self,
+        log_sensors: bool = False,
+        attach: str = None,
+        find_devices=None,
+        instrument: bool = False,
+        profile_db: str = None,
+    ):
         super().__init__()
-        self._init()
+        self.handler = Handler(self)
+        self.info = None
+        self.log_sensors = log_sensors
+        self.attach = attach  # IPC socket of a daemon
+        self.find_devices = find_devices  # e.g. simulated devices
+        self.profile_db = profile_db  # SQLite profiles instead of JSON files
+        self.instrumentation = None
+        self.debug_panel = None
+        if instrument:
+            # pylint: disable=import-outside-toplevel
+            from instrumentation import Instrumentation
+            self.instrumentation = Instrumentation()
+            # before any widget connects its on_update
+            self.instrumentation.enable_widgets()
+        placeholder = main_widgets.Label(
+            text="Searching for devices...",
+            alignment=QtCore.Qt.AlignCenter,
+        )
+        placeholder.installEventFilter(self)
+        self.setCentralWidget(placeholder)
+
+    def eventFilter(self, watched, event):  # pylint: disable=invalid-name
+        if event.type() == QtCore.QEvent.Paint:
+            watched.removeEventFilter(self)
+            self.first_paint_signal.emit()
+            QtCore.QTimer.singleShot(0, self._init)
+        return False
 
     def _init(self):
-        self.handler = Handler(self)
-        self.info = Info(self)
+        self.info = Info(
+            self,
+            log_sensors=self.log_sensors,
+            attach=self.attach,
+            find_devices=self.find_devices,
+            instrumentation=self.instrumentation,
+            profile_db=self.profile_db,
+        )
         self.setCentralWidget(self._layout())
+        if self.instrumentation is not None:
+            QtWidgets.QShortcut(
+                QtGui.QKeySequence("Ctrl+Shift+D"), self, self.show_debug_panel
+            )
+        self.built_signal.emit()
+
+    @QtCore.pyqtSlot()
+    def show_debug_panel(self):
+        if self.debug_panel is None:
+            # pylint: disable=import-outside-toplevel
+            from ui_widgets.debug_panel import DebugPanel
+            self.debug_panel = DebugPanel(
+                self.instrumentation, self.info.DEVICES_LIST, self
+            )
+        self.debug_panel.show()
+        self.debug_panel.raise_()
 
     def _layout(self):
         central_widget = QtWidgets.QWidget()
@@ -59,7 +183,10 @@ class MainWindow(QtWidgets.QMainWindow):
         dialog = main_widgets.DecisionDialog(self, DIALOG_MSG)
         self.hide()
         if dialog.exec_():
-            self.info.dev_info_updater.stop()
+            if self.info is not None:
+                if self.info.hotplug_watcher is not None:
+                    self.info.hotplug_watcher.stop()
+                self.info.dev_info_updater.stop()
             close_event.accept()
             self.close()
         else:
@@ -68,22 +195,74 @@ class MainWindow(QtWidgets.QMainWindow):
 
 
 class Info:
-    __slots__ = ("window", "liquidctl_api", "DEVICES_LIST", "control_device_widgets", "current_dev_index", "main_handler", "dev_info_updater", "main_left", "main_right", "dev_info_updater")
-    def __init__(self, window):
+    __slots__ = (
+        "window",
+        "liquidctl_api",
+        "DEVICES_LIST",
+        "control_device_widgets",
+        "current_dev_index",
+        "main_handler",
+        "dev_info_updater",
+        "main_left",
+        "main_right",
+        "log_sensors",
+        "curve_engine",
+        "write_queue",
+        "attach",
+        "hotplug_watcher",
+        "find_devices",
+        "instrumentation",
+        "profiles",
+        "profile_watcher",
+        "profile_db",
+    )
+
+    def __init__(
+        self,
+        window,
+        *,
+        log_sensors: bool = False,
+        attach: str = None,
+        find_devices=None,
+        instrumentation=None,
+        profile_db: str = None,
+    ):
         self.window = window
+        self.log_sensors = log_sensors
+        self.attach = attach
+        self.find_devices = find_devices
+        self.instrumentation = instrumentation
+        self.profile_db = profile_db
         self._init()
 
     def _init(self):
         self._liquidctl_api()
         self._variables()
         self._main()
+        if self.instrumentation is not None:
+            self.instrumentation.enable(
+                self.liquidctl_api, self.dev_info_updater
+            )
         self._left()
         self._right()
         # i have to do this (left.py, line: 44)
         self.main_left.set_layout()
+        self._initialize_devices()
 
     def _liquidctl_api(self):
-        self.liquidctl_api = liquidctl_api.LiquidctlApi()
+        # devices are initialized after the window is built
+        if self.attach:
+            # the daemon owns the devices, it is only asked for them
+            # imported only then, it isn't worth its import time otherwise
+            # pylint: disable=import-outside-toplevel
+            from liquidctl_api import ipc
+            self.liquidctl_api = ipc.RemoteLiquidctlApi(
+                ipc.IpcClient(self.attach), initialize=False
+            )
+        else:
+            self.liquidctl_api = liquidctl_api.LiquidctlApi(
+                initialize=False, find_devices=self.find_devices
+            )
         # pylint: disable=invalid-name
         self.DEVICES_LIST = self.liquidctl_api.devices_list
 
@@ -95,7 +274,24 @@ class Info:
 
     def _main(self):
         self.main_handler = self.window.handler
-        self.dev_info_updater = HwInfoUpdater(self, pause=6)
+        self.dev_info_updater = HwInfoUpdater(
+            self, pause=6, log_sensors=self.log_sensors
+        )
+        # speeds are written in the background, the GUI never waits for USB
+        self.write_queue = write_queue.WriteQueue(self.liquidctl_api)
+        # curves of devices which don't support profiles themselves
+        self.curve_engine = curve_engine.CurveEngine(
+            self.liquidctl_api,
+            latest=self.dev_info_updater.engine.latest,
+            write_queue=self.write_queue,
+        )
+        # shared by every profile editor, indexed once and kept up to date
+        self.profiles = utils.Profiles(self.profile_db)
+        self.profile_watcher = None
+        if self.profiles.duty_profiles.index is not None:  # not SQLite
+            self.profile_watcher = ProfileWatcher(
+                self.profiles.duty_profiles.index, self.window
+            )
 
     def _left(self):
         self.main_left = left.MainLeft(self)
@@ -104,12 +300,36 @@ class Info:
         self.main_right = right.MainRight(self)
         self.dev_info_updater.start()
 
+    def _initialize_devices(self):
+        self.main_handler.device_ready_signal.connect(
+            self.main_handler.on_device_ready
+        )
+        self.liquidctl_api.initialize_async(
+            callback=self.main_handler.device_initialized
+        )
+        watcher_class = hotplug.HotplugWatcher
+        if self.attach:
+            # the daemon watches its devices, its ready/removed flags are
+            # mirrored (a device is selectable once the daemon has it ready)
+            # pylint: disable=import-outside-toplevel
+            from liquidctl_api import ipc
+            watcher_class = ipc.RemoteHotplugWatcher
+        self.hotplug_watcher = watcher_class(
+            self.liquidctl_api,
+            on_added=self.main_handler.device_added,
+            on_removed=self.main_handler.device_removed,
+            on_initialized=self.main_handler.device_initialized,
+        )
+        self.hotplug_watcher.start()
+
     @property
     def current_device_obj(self):
         return self.DEVICES_LIST[self.current_dev_index]
 
     @property
     def current_device_info(self):
+        if not self.DEVICES_LIST:  # until a device is plugged in
+            return dict.fromkeys(("vendor_id", "product_id", "address", "bus"), "")
         return {
             "vendor_id": self.current_device_obj.vendor_id,
             "product_id": self.current_device_obj.product_id,
@@ -120,26 +340,56 @@ class Info:
     @property
     def profile_device_info(self):
         """Info used in a profile"""
-        return {
-            "name": self.current_device_obj.description,
-            "vendor_id": self.current_device_obj.vendor_id,
-            "product_id": self.current_device_obj.product_id
-        }
+        return self.device_profile_info(self.current_dev_index)
 
+    def device_profile_info(self, dev_index):
+        """Info used in a profile of a specific device"""
+        return self.liquidctl_api.registry.profile_info(dev_index)
 
-class HwInfoUpdater:
-    __slots__ = ("info", "main_handler", "pause", "do_update", "curr_active")
-    """Updater, creates hw widgets"""
-
-    def __init__(self, info, pause):
-        self._variables(info, pause)
 
-    def _variables(self, info, pause):
+class HwInfoUpdater:
+    """
+    Updater, creates hw widgets and updates them with the status read
+    by the status engine, every device is polled (concurrently) so
+    pages of non selected devices are up to date when selected
+    """
+    __slots__ = (
+        "info", "main_handler", "pause", "engine", "differ", "history",
+        "logger",
+    )
+
+    # changes smaller than these aren't worth a repaint
+    DEADBANDS = {"RPM": 10, "V": 0.02}
+    # seconds of sensor history kept in memory
+    HISTORY_RETENTION = 6 * 60 * 60
+    SENSOR_LOG_PATH = path.expanduser("~/.config/Liquidctl-Qt/SensorLog")
+
+    def __init__(self, info, pause, log_sensors=False):
+        self._variables(info, pause, log_sensors)
+
+    def _variables(self, info, pause, log_sensors):
         self.info = info
         self.main_handler = info.main_handler
         self.pause = pause
-        self.do_update = None
-        self.curr_active = [False for _ in self.info.DEVICES_LIST]
+        self.engine = status_engine.StatusEngine(
+            info.liquidctl_api,
+            interval=pause,
+            callback=self._on_status,
+            workers=status_engine.StatusEngine.MAX_WORKERS,
+        )
+        self.differ = status_diff.StatusDiffer(self.DEADBANDS)
+        self.history = sensor_history.SensorHistory(
+            retention=self.HISTORY_RETENTION,
+            interval=pause,
+        )
+        self.logger = None
+        if log_sensors:
+            self.logger = sensor_log.SensorLogger(self.SENSOR_LOG_PATH)
+
+    def _log_name(self, dev_index):
+        """Name of the device in the sensor log (stable between runs)"""
+        device_obj = self.info.DEVICES_LIST[dev_index]
+        return f"{device_obj.description} {device_obj.serial_number}"
 
     def _add_widgets(self, hw_name, dev_index):
         """
@@ -165,58 +415,49 @@ class HwInfoUpdater:
                 curr_page.insert_widget_signal.emit(hw_name, hw_info)
                 self._add_widgets(hw_name, dev_index)
 
-    def _init(self, curr_page, dev_obj, dev_index):
+    def _on_status(self, dev_index, parsed_info, timestamp=None):
         """
-        creates and adds hw widgets for current device
-        dev_obj = local current device object
+        Called from an engine thread, the widgets are only touched
+        through (queued) signals and only with the values that changed
+        timestamp (of the read, now by default) is for replays
+        returns True if an update was emitted (update_dev_hw_signal)
         """
-        parsed_info = None
-        self.curr_active[dev_index] = True
-        while not parsed_info:
-            self.do_update.wait(1)
-            parsed_info = self.info.liquidctl_api.to_dict(
-                dev_obj.get_status()
-            )
-        curr_page.add_widgets_signal.emit(parsed_info)
-        self._add_widgets(tuple(parsed_info.keys()), dev_index)
-        self.curr_active[dev_index] = False
-
-    def _start(self, loc_to_update):
+        dev_page = self.info.main_right.stack_frame.page(dev_index)
+        if dev_page is None:  # unplugged meanwhile
+            return False
+        self.history.record(dev_index, parsed_info, timestamp)
+        self.info.curve_engine.tick(dev_index, parsed_info)
+        if self.logger is not None:
+            self.logger.log(self._log_name(dev_index), parsed_info)
+        changed_info = self.differ.diff(dev_index, parsed_info)
+        if not self.info.control_device_widgets[dev_index]:
+            dev_page.add_widgets_signal.emit(parsed_info)
+            self._add_widgets(tuple(parsed_info.keys()), dev_index)
+            return False
+        self._add_unadded_widgets(parsed_info, dev_page, dev_index)
+        if not changed_info:
+            return False
+        dev_page.update_dev_hw_signal.emit(changed_info)
+        return True
+
+    def select(self, dev_index):
         """
-        updates hw info of currently selected device
-        loc_to_update = "local to update"
-        curr_page = "page that start() was started on"
+        Refreshes the newly selected device right away, the engine reads
+        it through the StatusCache (no new read if another reader did a
+        moment ago) and handles it like any other status, once
         """
-        curr_page = (
-            self.info.main_right.stack_frame.stacked_widget.currentWidget()
-        )
-        dev_obj = self.info.current_device_obj
-        dev_index = self.info.current_dev_index
-
-        if (
-            not self.info.control_device_widgets[dev_index] and
-            not self.curr_active[dev_index]
-        ):
-            self._init(curr_page, dev_obj, dev_index)
-        while not loc_to_update.is_set():
-            loc_to_update.wait(self.pause / 3)
-            if not self.curr_active[dev_index]:
-                parsed_info = self.info.liquidctl_api.to_dict(
-                    dev_obj.get_status()
-                )
-
-                self._add_unadded_widgets(parsed_info, curr_page, dev_index)
-                curr_page.update_dev_hw_signal.emit(parsed_info)
-            loc_to_update.wait(self.pause / 3)
-            loc_to_update.wait(self.pause / 3)
+        self.engine.poll_now(dev_index)
 
     def start(self):
-        do_update = threading.Event()
-        self.do_update = do_update
-        threading.Thread(target=self._start, args=(do_update,)).start()
+        if self.logger is not None:
+            self.logger.start()
+        self.engine.start()
 
     def stop(self):
-        self.do_update.set()
+        # don't hang the GUI on a device which stopped responding
+        self.engine.stop(timeout=1)
+        if self.logger is not None:
+            self.logger.stop()
 
     @staticmethod
     def checker(line: list):
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# the app is run from inside liquidctl_qt/ and imports its modules directly
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "liquidctl_qt")
+)
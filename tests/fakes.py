@@ -0,0 +1,27 @@
+"""Fake liquidctl devices of the tests (no hardware needed)"""
+from liquidctl_api.simulated import SimulatedDevice
+
+
+class FakeDevice(SimulatedDevice):
+    """
+    A simulated fan controller with one fan, without fixed speeds and/or
+    speed profiles, what was written to it is kept in fixed and profiles
+    """
+
+    def __init__(self, index=0, fixed_speeds=True, speed_profiles=True):
+        super().__init__(
+            index,
+            fans=1,
+            supports_profiles=speed_profiles,
+            supports_fixed_speeds=fixed_speeds,
+        )
+        self.fixed = {}
+        self.profiles = {}
+
+    def set_fixed_speed(self, channel, duty, **kwargs):
+        super().set_fixed_speed(channel, duty, **kwargs)
+        self.fixed[channel] = duty
+
+    def set_speed_profile(self, channel, profile, **kwargs):
+        super().set_speed_profile(channel, profile, **kwargs)
+        self.profiles[channel] = profile
@@ -0,0 +1,73 @@
+import threading
+
+import pytest
+
+from liquidctl_api import write_queue
+from liquidctl_api.curve_engine import (
+    CompiledCurve, CurveEngine, SoftwareCurve, status_key
+)
+from liquidctl_api.liquidctl_api import LiquidctlApi
+from fakes import FakeDevice
+
+# 0 % up to 30 °C, 100 % from 70 °C
+CURVE = CompiledCurve([(30, 0), (70, 100)])
+
+
+def _ramp(interval, seconds, max_rate=5.0):
+    """Duties a software curve sets when the temperature jumps to 70 °C"""
+    curve = SoftwareCurve(CURVE, max_rate=max_rate)
+    curve.last_duty = curve.target(30, now=0)
+    duties = []
+    for tick in range(1, round(seconds / interval) + 1):
+        now = tick * interval
+        duty = curve.target(70, now=now)
+        curve.last_duty = duty  # the write succeeded
+        duties.append((now, duty))
+    return duties
+
+
+@pytest.mark.parametrize("interval", [1, 6])
+def test_ramp_rate_doesnt_depend_on_the_poll_interval(interval):
+    for now, duty in _ramp(interval, 18):
+        assert duty == min(5 * now, 100)
+
+
+def test_extra_ticks_dont_speed_up_the_ramp():
+    duties = _ramp(0.1, 6)
+    assert all(duty <= 5 * now for now, duty in duties)
+    # small steps add up instead of being lost to rounding
+    assert duties[-1][1] == 30
+
+
+def test_no_limit_for_the_first_duty():
+    curve = SoftwareCurve(CURVE, max_rate=1)
+    assert curve.target(70, now=0) == 100
+
+
+def test_hysteresis():
+    curve = SoftwareCurve(CURVE, hysteresis=2, max_rate=1000)
+    curve.last_duty = curve.target(50, now=0)
+    assert curve.target(49, now=1) == 50  # small drop, kept
+    assert curve.target(47, now=2) == 42
+
+
+def test_status_key():
+    status = {"Fan 1": {}, "Pump": {}, "Liquid temperature": {}}
+    assert status_key(status, "Fan 1") == "Fan 1"
+    assert status_key(status, "fan1") == "Fan 1"
+    assert status_key(status, "Pump") == "Pump"
+    assert status_key(status, "Fan 2") is None
+
+
+@pytest.mark.parametrize("queued", [False, True])
+def test_curve_dropped_without_fixed_speeds(queued):
+    api = LiquidctlApi(
+        find_devices=lambda: [FakeDevice(fixed_speeds=False)], status_ttl=0
+    )
+    queue = write_queue.WriteQueue(api) if queued else None
+    engine = CurveEngine(api, write_queue=queue)
+    unsupported = threading.Event()
+    engine.set_curve(0, "Fan 1", CURVE, on_unsupported=unsupported.set)
+    engine.tick(0, {"Liquid": {"Temperature": {"value": 50, "measurement": "°C"}}})
+    assert unsupported.wait(timeout=2)
+    assert engine.curves == {}
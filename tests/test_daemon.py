@@ -0,0 +1,76 @@
+import os
+
+from liquidctl.error import ExpectationNotMet
+
+import daemon
+from fakes import FakeDevice
+
+
+def _daemon(tmp_path, device, profiles):
+    test_daemon = daemon.Daemon(
+        config_path=os.path.join(tmp_path, "daemon.json"),
+        find_devices=lambda: [device],
+        profile_db=os.path.join(tmp_path, "profiles.sqlite3"),
+    )
+    test_daemon.config["socket"] = None
+    test_daemon.config["profiles"] = [
+        {"device": 0, "hw_name": "Fan 1", "profile": profile["name"]}
+        for profile in profiles
+    ]
+    test_daemon._init()  # pylint: disable=protected-access
+    test_daemon.profiles.duty_profiles.import_profiles(profiles)
+    return test_daemon
+
+
+def _profile(name, static_duty=None, steps=None):
+    return {
+        "name": name,
+        "device_info": {"vendor_id": 0x1E71, "product_id": 0x2006},
+        "static_duty": static_duty,
+        "steps": steps,
+    }
+
+
+def test_static_duty(tmp_path):
+    device = FakeDevice()
+    _daemon(tmp_path, device, [_profile("quiet", 40)])._apply_profiles()
+    assert device.fixed == {"fan1": 40}
+
+
+def test_static_duty_without_fixed_speeds(tmp_path):
+    device = FakeDevice(fixed_speeds=False)
+    _daemon(tmp_path, device, [_profile("quiet", 40)])._apply_profiles()
+    assert device.profiles == {"fan1": [(0, 40), (100, 40)]}
+
+
+def test_static_duty_without_fixed_speeds_or_profiles(tmp_path, capsys):
+    device = FakeDevice(fixed_speeds=False, speed_profiles=False)
+    test_daemon = _daemon(tmp_path, device, [_profile("quiet", 40)])
+    test_daemon._apply_profiles()
+    assert "neither fixed speeds nor speed profiles" in capsys.readouterr().err
+    assert not test_daemon.curve_engine.curves
+
+
+def test_curve_in_software(tmp_path):
+    device = FakeDevice(speed_profiles=False)
+    test_daemon = _daemon(
+        tmp_path, device, [_profile("ramp", steps=[[30, 20], [70, 100]])]
+    )
+    test_daemon._apply_profiles()
+    assert (0, "Fan 1") in test_daemon.curve_engine.curves
+
+
+class FailingDevice(FakeDevice):
+    def set_fixed_speed(self, channel, duty, **kwargs):
+        raise ExpectationNotMet("no reply")
+
+
+def test_liquidctl_errors_dont_stop_other_profiles(tmp_path, capsys):
+    device = FailingDevice()
+    test_daemon = _daemon(
+        tmp_path, device,
+        [_profile("quiet", 40), _profile("ramp", steps=[[30, 20], [70, 100]])],
+    )
+    test_daemon._apply_profiles()
+    assert "Couldn't apply" in capsys.readouterr().err
+    assert device.profiles == {"fan1": [(30, 20), (70, 100)]}
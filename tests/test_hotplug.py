@@ -0,0 +1,47 @@
+from liquidctl_api import hotplug
+from liquidctl_api.liquidctl_api import LiquidctlApi
+from fakes import FakeDevice
+
+
+class UsbDevice(FakeDevice):
+    """serial_number is read from the device, like liquidctl's USB drivers"""
+
+    serial_reads = 0
+
+    def __init__(self, index=0, **kwargs):
+        super().__init__(index, **kwargs)
+        self.index = index
+
+    @property
+    def serial_number(self):
+        UsbDevice.serial_reads += 1
+        return f"SIM{self.index:08d}"
+
+    @serial_number.setter
+    def serial_number(self, value):
+        pass
+
+
+class Bus:
+    """What find_devices() finds, fresh driver objects every time"""
+
+    def __init__(self, *indexes):
+        self.indexes = list(indexes)
+
+    def find_devices(self):
+        return [UsbDevice(index) for index in self.indexes]
+
+
+def test_serial_numbers_are_only_read_for_new_devices():
+    bus = Bus(0, 1)
+    api = LiquidctlApi(initialize=False, find_devices=bus.find_devices)
+    watcher = hotplug.HotplugWatcher(api)
+    UsbDevice.serial_reads = 0
+    assert watcher.scan() == ([], [])
+    assert UsbDevice.serial_reads == 0
+
+    bus.indexes = [1, 2]
+    assert watcher.scan() == ([2], [0])
+    assert UsbDevice.serial_reads == 1
+    assert api.devices_list[2].serial_number == "SIM00000002"
+    assert [dev_index for dev_index, _ in api.present()] == [1, 2]
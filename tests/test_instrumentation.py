@@ -0,0 +1,53 @@
+from instrumentation import Instrumentation
+from liquidctl_api import status_cache, status_engine
+from liquidctl_api.liquidctl_api import LiquidctlApi
+from fakes import FakeDevice
+
+
+class Updater:
+    """The part of HwInfoUpdater instrumentation uses"""
+
+    def __init__(self, api):
+        self.emit = False
+        self.engine = status_engine.StatusEngine(api, callback=self.on_status)
+
+    def on_status(self, dev_index, parsed_info):
+        return self.emit
+
+
+def _enabled():
+    api = LiquidctlApi(find_devices=lambda: [FakeDevice()], status_ttl=0)
+    updater = Updater(api)
+    instrumentation = Instrumentation()
+    instrumentation.enable(api, updater)
+    return instrumentation, api, updater
+
+
+def test_disable_puts_the_originals_back():
+    read = status_cache.StatusCache._read  # pylint: disable=protected-access
+    to_dict = LiquidctlApi.to_dict
+    instrumentation, api, updater = _enabled()
+    assert instrumentation.enabled
+    api.get_status(0)
+    assert set(instrumentation.summary()) == {"get_status", "parse"}
+
+    instrumentation.disable()
+    assert not instrumentation.enabled
+    assert status_cache.StatusCache._read is read  # pylint: disable=protected-access
+    assert LiquidctlApi.to_dict is to_dict
+    assert updater.engine.callback == updater.on_status
+    instrumentation.reset()
+    api.get_status(0)
+    assert instrumentation.summary() == {}
+
+
+def test_only_emitted_updates_are_stamped():
+    instrumentation, api, updater = _enabled()
+    parsed_info = api.get_status(0)
+    updater.engine.callback(0, parsed_info)
+    assert instrumentation._emitted == {}  # pylint: disable=protected-access
+    updater.emit = True
+    updater.engine.callback(0, parsed_info)
+    assert list(instrumentation._emitted) == [0]  # pylint: disable=protected-access
+    assert instrumentation.summary()["pipeline"][0]["count"] == 2
+    instrumentation.disable()
@@ -0,0 +1,103 @@
+import asyncio
+import os
+import stat
+import time
+
+import pytest
+
+from liquidctl_api import ipc, status_engine
+from liquidctl_api.liquidctl_api import LiquidctlApi
+from fakes import FakeDevice
+
+
+@pytest.fixture
+def server_api(tmp_path):
+    """A server with 2 devices which aren't initialized, and its socket"""
+    api = LiquidctlApi(
+        initialize=False,
+        find_devices=lambda: [FakeDevice(0), FakeDevice(1)],
+    )
+    engine = status_engine.StatusEngine(api, interval=1, workers=2)
+    socket_path = os.path.join(tmp_path, "test.sock")
+    server = ipc.IpcServer(api, engine, socket_path)
+    server.run_in_thread()
+    while not os.path.exists(socket_path):
+        time.sleep(0.01)
+    yield api, socket_path
+    server.close()
+
+
+class Callbacks:
+    def __init__(self):
+        self.calls = []
+
+    def on_added(self, dev_index):
+        self.calls.append(("added", dev_index))
+
+    def on_removed(self, dev_index):
+        self.calls.append(("removed", dev_index))
+
+    def on_initialized(self, dev_index, error):
+        self.calls.append(("initialized", dev_index, error))
+
+    def sync(self, remote_api):
+        del self.calls[:]
+        return remote_api.sync(
+            self.on_added, self.on_removed, self.on_initialized
+        )
+
+
+def test_remote_devices_are_ready_when_the_server_says_so(server_api):
+    api, socket_path = server_api
+    remote_api = ipc.RemoteLiquidctlApi(
+        ipc.IpcClient(socket_path), initialize=False
+    )
+    remote_api.initialize_async()
+    assert remote_api.ready == [False, False]
+
+    callbacks = Callbacks()
+    api._initialize_device(1)  # pylint: disable=protected-access
+    assert callbacks.sync(remote_api) == ([], [])
+    assert callbacks.calls == [("initialized", 1, None)]
+    assert remote_api.ready == [False, True]
+    assert remote_api.wait_ready(1, timeout=0)
+    remote_api.on_quit()
+
+
+def test_remote_hotplug(server_api):
+    api, socket_path = server_api
+    remote_api = ipc.RemoteLiquidctlApi(ipc.IpcClient(socket_path))
+    callbacks = Callbacks()
+
+    api.remove_device(0)
+    api._initialize_device(api.add_device(FakeDevice(2)))  # pylint: disable=protected-access
+    assert callbacks.sync(remote_api) == ([2], [0])
+    assert callbacks.calls == [
+        ("removed", 0), ("added", 2), ("initialized", 2, None),
+    ]
+    assert remote_api.removed == {0}
+    assert [dev_index for dev_index, _ in remote_api.present()] == [1, 2]
+    assert remote_api.devices_list[2].serial_number == "SIM00000002"
+    # nothing changed
+    assert callbacks.sync(remote_api) == ([], [])
+    assert callbacks.calls == []
+    remote_api.on_quit()
+
+
+def test_socket_is_only_reachable_by_the_user(server_api):
+    _, socket_path = server_api
+    assert stat.S_IMODE(os.stat(socket_path).st_mode) == 0o600
+
+
+def test_slow_clients_lose_pushes_not_responses():
+    async def drain():
+        outbox = ipc._Outbox()  # pylint: disable=protected-access
+        outbox.respond(b"response 0\n")
+        for event in range(ipc._Outbox.MAX_EVENTS + 10):  # pylint: disable=protected-access
+            outbox.push(f"event {event}\n".encode())
+        outbox.respond(b"response 1\n")
+        return [await outbox.get() for _ in range(3)], len(outbox.events)
+
+    lines, events_left = asyncio.run(drain())
+    assert lines == [b"response 0\n", b"response 1\n", b"event 10\n"]
+    assert events_left == ipc._Outbox.MAX_EVENTS - 1  # pylint: disable=protected-access
@@ -0,0 +1,65 @@
+import os
+
+import pytest
+
+# the widgets are built without a display
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+from PyQt5 import QtCore, QtGui, QtTest, QtWidgets  # noqa: E402
+
+from ui_widgets import profile_editor  # noqa: E402
+
+STEPS = [(30, 20), (50, 40), (70, 100)]
+
+
+@pytest.fixture
+def editor(tmp_path, monkeypatch):
+    """A profile editor of "Fan 1" with STEPS in its table"""
+    monkeypatch.setenv("HOME", str(tmp_path))
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    dialog = QtWidgets.QDialog()
+    editor = profile_editor.ProfileEditor(dialog, "Fan 1", {})
+    editor.profile_mode_chooser.mode_chooser.setChecked(False)  # a curve
+    model = editor.steps_editor.model()
+    for temp, duty in STEPS:
+        model.addRow(temp, duty)
+    editor.profile_handler.reload_graph()
+    editor.graph_frame.resize(400, 300)
+    editor.graph_frame.show()
+    app.processEvents()
+    yield editor
+    editor.graph_frame.hide()
+    dialog.deleteLater()
+
+
+def _drag(graph_frame, step, to):
+    """Drags a step of the graph to (temp, duty) with the mouse"""
+    # pylint: disable=protected-access
+    start = graph_frame._point(*step).toPoint()
+    end = graph_frame._point(*to).toPoint()
+    QtTest.QTest.mousePress(graph_frame, QtCore.Qt.LeftButton, pos=start)
+    # QTest.mouseMove() moves the cursor, offscreen that's no mouse event
+    QtWidgets.QApplication.sendEvent(graph_frame, QtGui.QMouseEvent(
+        QtCore.QEvent.MouseMove, QtCore.QPointF(end), QtCore.Qt.NoButton,
+        QtCore.Qt.LeftButton, QtCore.Qt.NoModifier,
+    ))
+    QtTest.QTest.mouseRelease(graph_frame, QtCore.Qt.LeftButton, pos=end)
+
+
+def test_dragging_a_step_moves_it_within_its_neighbours(editor):
+    _drag(editor.graph_frame, (50, 40), (55, 60))
+    assert editor.steps_editor.model().steps() == [(30, 20), (55, 60), (70, 100)]
+    assert editor.graph_frame.steps == ((30, 20), (55, 60), (70, 100))
+
+    # a step doesn't get past the next one
+    _drag(editor.graph_frame, (55, 60), (90, 60))
+    assert editor.steps_editor.model().steps() == [(30, 20), (69, 60), (70, 100)]
+
+
+def test_a_drag_is_undone_and_redone_at_once(editor):
+    _drag(editor.graph_frame, (50, 40), (55, 60))
+    undo_stack = editor.profile_handler.undo_stack
+    assert undo_stack.count() == 1
+    undo_stack.undo()
+    assert editor.steps_editor.model().steps() == STEPS
+    undo_stack.redo()
+    assert editor.steps_editor.model().steps() == [(30, 20), (55, 60), (70, 100)]
@@ -0,0 +1,63 @@
+import time
+
+import pytest
+
+from liquidctl_api.sensor_history import RingBuffer, SensorHistory
+
+
+def _filled(capacity, count, min_spacing=0):
+    buffer = RingBuffer(capacity, min_spacing)
+    for second in range(count):
+        buffer.append(float(second), float(second * 10))
+    return buffer
+
+
+def test_ring_buffer_keeps_the_newest_samples():
+    buffer = _filled(4, 6)
+    assert len(buffer) == 4
+    assert buffer.latest() == (5.0, 50.0)
+    timestamps, values = buffer.window(10, now=5)
+    assert list(timestamps) == [2, 3, 4, 5]
+    assert list(values) == [20, 30, 40, 50]
+
+
+@pytest.mark.parametrize("count", [3, 4, 6, 7])
+def test_ring_buffer_window_and_stats(count):
+    """Whether or not the window wraps around the end of the arrays"""
+    buffer = _filled(4, count)
+    newest = count - 1
+    _, values = buffer.window(1, now=newest)
+    assert list(values) == [(newest - 1) * 10, newest * 10]
+    assert buffer.stats(1, now=newest) == (
+        (newest - 1) * 10, newest * 10, (newest - 0.5) * 10
+    )
+
+
+def test_ring_buffer_empty_window():
+    buffer = _filled(4, 3)
+    assert buffer.stats(1, now=100) is None
+    assert list(buffer.window(1, now=100)[0]) == []
+    assert RingBuffer(4).latest() is None
+
+
+def test_ring_buffer_drops_samples_too_close_together():
+    buffer = RingBuffer(4, min_spacing=0.9)
+    assert buffer.append(0, 1)
+    assert not buffer.append(0.5, 2)
+    assert buffer.append(0.95, 3)
+    assert list(buffer.window(10, now=1)[1]) == [1, 3]
+
+
+def test_extra_reads_dont_shorten_the_retention():
+    history = SensorHistory(retention=60, interval=6)
+    status = {"Fan 1": {"Speed": {"value": 600, "measurement": "RPM"}}}
+    start = time.time() - 120
+    for second in range(0, 121, 2):  # reads 3 times as often as the interval
+        history.record(0, status, timestamp=start + second)
+    timestamps, _ = history.window(0, "Fan 1", "Speed", 1000)
+    assert timestamps[-1] == start + 120
+    assert timestamps[0] <= start + 120 - 60
+    assert all(
+        later - earlier >= history.min_spacing
+        for earlier, later in zip(timestamps, timestamps[1:])
+    )
@@ -0,0 +1,26 @@
+from liquidctl_api import sensor_log
+
+# 2023-01-01, far older than any retention
+START = 1672531200.0
+
+
+def test_old_timestamps_dont_delete_the_segments_just_written(tmp_path):
+    logger = sensor_log.SensorLogger(
+        str(tmp_path), max_segment_bytes=sensor_log.RECORD.size,
+        flush_interval=0,
+    )
+    logger.start()
+    for second in range(5):
+        logger.log(
+            "Fake", {"Fan 1": {"Duty": {"value": second, "measurement": "%"}}},
+            timestamp=START + second,
+        )
+    logger.stop()
+
+    reader = sensor_log.SensorLogReader(str(tmp_path))
+    # a record per segment, every one of them kept
+    assert len(reader.segments("1s")) == 5
+    assert [
+        (bucket_start, mean)
+        for bucket_start, _, _, mean in reader.read("Fake/Fan 1/Duty", "1s")
+    ] == [(START + second, second) for second in range(5)]
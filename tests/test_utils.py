@@ -0,0 +1,40 @@
+import os
+
+import utils
+
+
+def test_atomic_write_keeps_the_mode(tmp_path):
+    file_path = os.path.join(tmp_path, "profile.json")
+    with open(file_path, "w") as profile_file:
+        profile_file.write("{}")
+    os.chmod(file_path, 0o640)
+    utils.atomic_write(file_path, '{"name": "quiet"}')
+    assert os.stat(file_path).st_mode & 0o777 == 0o640
+    with open(file_path) as profile_file:
+        assert profile_file.read() == '{"name": "quiet"}'
+
+
+def test_atomic_write_of_a_new_file_follows_the_umask(tmp_path):
+    file_path = os.path.join(tmp_path, "profile.json")
+    umask = os.umask(0o027)
+    try:
+        utils.atomic_write(file_path, "{}")
+    finally:
+        os.umask(umask)
+    assert os.stat(file_path).st_mode & 0o777 == 0o640
+    assert os.listdir(tmp_path) == ["profile.json"]
+
+
+def test_the_umask_is_read_without_setting_it(tmp_path, monkeypatch):
+    set_umask = os.umask
+    umask = set_umask(0o027)
+
+    def no_umask(mask):
+        raise AssertionError("other threads would create files with it")
+
+    monkeypatch.setattr(os, "umask", no_umask)
+    try:
+        mode = utils._file_mode(os.path.join(tmp_path, "new.json"))  # pylint: disable=protected-access
+    finally:
+        set_umask(umask)
+    assert mode == 0o640
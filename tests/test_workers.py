@@ -0,0 +1,108 @@
+import threading
+import time
+
+from liquidctl_api import status_engine, write_queue
+from liquidctl_api.liquidctl_api import LiquidctlApi
+from fakes import FakeDevice
+
+
+class SlowDevice(FakeDevice):
+    """Counts how many devices are read/written at the same time"""
+
+    lock = threading.Lock()
+    busy = 0
+    most_busy = 0
+
+    def _busy(self):
+        with SlowDevice.lock:
+            SlowDevice.busy += 1
+            SlowDevice.most_busy = max(SlowDevice.most_busy, SlowDevice.busy)
+        time.sleep(0.1)
+        with SlowDevice.lock:
+            SlowDevice.busy -= 1
+
+    def get_status(self, **kwargs):
+        self._busy()
+        return super().get_status(**kwargs)
+
+    def set_fixed_speed(self, channel, duty, **kwargs):
+        self._busy()
+        super().set_fixed_speed(channel, duty, **kwargs)
+
+
+def _plug_in(api, count):
+    """Devices plugged in after the api (and its users) were made"""
+    SlowDevice.most_busy = 0
+    added = [api.add_device(SlowDevice(index)) for index in range(count)]
+    for dev_index in added:
+        api._initialize_device(dev_index)  # pylint: disable=protected-access
+    return added
+
+
+def test_status_engine_reads_hot_plugged_devices_concurrently():
+    api = LiquidctlApi(initialize=False, find_devices=lambda: [])
+    reads = []
+    engine = status_engine.StatusEngine(
+        api, interval=10, callback=lambda dev_index, _: reads.append(dev_index),
+        workers=status_engine.StatusEngine.MAX_WORKERS,
+    )
+    engine.start()
+    for dev_index in _plug_in(api, 4):
+        engine.add_device(dev_index)
+    deadline = time.monotonic() + 2
+    while len(reads) < 4 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    engine.stop(timeout=1)
+    assert sorted(reads) == [0, 1, 2, 3]
+    assert SlowDevice.most_busy == 4
+
+
+def test_write_queue_writes_hot_plugged_devices_concurrently():
+    api = LiquidctlApi(initialize=False, find_devices=lambda: [])
+    queue = write_queue.WriteQueue(api)
+    done = threading.Semaphore(0)
+    for dev_index in _plug_in(api, 4):
+        queue.add_device()
+        queue.set_fixed_speed(
+            dev_index, "Fan 1", 50, done=lambda error: done.release()
+        )
+    for _ in range(4):
+        assert done.acquire(timeout=2)
+    assert [device.fixed for device in api.devices_list] == [{"fan1": 50}] * 4
+    assert SlowDevice.most_busy == 4
+
+
+class BlockingDevice(FakeDevice):
+    """Its writes wait until they're let through"""
+
+    def __init__(self, index=0, **kwargs):
+        super().__init__(index, **kwargs)
+        self.writing = threading.Event()
+        self.release = threading.Event()
+
+    def set_fixed_speed(self, channel, duty, **kwargs):
+        self.writing.set()
+        assert self.release.wait(timeout=2)
+        super().set_fixed_speed(channel, duty, **kwargs)
+
+
+def test_write_queue_doesnt_skip_the_state_a_write_in_flight_replaces():
+    device = BlockingDevice()
+    api = LiquidctlApi(find_devices=lambda: [device], status_ttl=0)
+    queue = write_queue.WriteQueue(api)
+    done = threading.Semaphore(0)
+    device.release.set()
+    queue.set_fixed_speed(0, "Fan 1", 50, done=lambda error: done.release())
+    assert done.acquire(timeout=2)
+
+    device.release.clear()
+    device.writing.clear()
+    queue.set_fixed_speed(0, "Fan 1", 70, done=lambda error: done.release())
+    assert device.writing.wait(timeout=2)
+    # 50 was written already, but 70 will have replaced it
+    queue.set_fixed_speed(0, "Fan 1", 50, done=lambda error: done.release())
+    device.release.set()
+    for _ in range(2):
+        assert done.acquire(timeout=2)
+    assert device.fixed == {"fan1": 50}
+    assert queue.skipped == 0